@@ -0,0 +1,390 @@
+from sqlalchemy import and_, bindparam, case, func, literal, or_, select, update
+from sqlalchemy.orm import Session
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+from functools import lru_cache
+from importlib import import_module
+from typing import Any, Callable, Dict, List, Set
+import asyncio
+import logging
+import os
+import unicodedata
+
+from . import models
+from .database import AsyncSessionLocal
+from .file_storage import get_file_by_uuid, iter_file_range
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Worker pool settings, per analysis-worker process
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", str(os.cpu_count() or 2)))
+ANALYSIS_POOL = os.getenv("ANALYSIS_POOL", "process")  # process (CPU-bound scorers) or thread (remote scorers)
+# Applications claimed, and results written, per transaction
+ANALYSIS_BATCH_SIZE = int(os.getenv("ANALYSIS_BATCH_SIZE", "20"))
+# Backpressure: applications claimed but not written back yet (their CVs are held in memory)
+ANALYSIS_MAX_IN_FLIGHT = int(os.getenv("ANALYSIS_MAX_IN_FLIGHT", "100"))
+# Delay (seconds) between polls of an empty queue
+ANALYSIS_POLL_INTERVAL = float(os.getenv("ANALYSIS_POLL_INTERVAL", "2"))
+# A claimed application not written back after this delay (seconds) is claimed again
+ANALYSIS_LEASE_SECONDS = int(os.getenv("ANALYSIS_LEASE_SECONDS", "600"))
+ANALYSIS_MAX_ATTEMPTS = int(os.getenv("ANALYSIS_MAX_ATTEMPTS", "3"))
+# Scorer called for each application, as "module:function"
+ANALYSIS_SCORER = os.getenv("ANALYSIS_SCORER", "app.analysis:keyword_scorer")
+# Bytes of a CV read for the analysis
+ANALYSIS_MAX_CV_BYTES = int(os.getenv("ANALYSIS_MAX_CV_BYTES", str(5 * 1024 * 1024)))
+
+# Minimum score of a qualified candidate for the keyword scorer
+QUALIFIED_SCORE = 60
+
+# Fields written back to job_applications from the scorer result
+RESULT_FIELDS = ("score", "observations", "qualified", "strengths", "weaknesses", "keywords_match")
+
+
+class AnalysisInputError(Exception):
+    """The application, its job or its CV cannot be read: retrying would not help."""
+
+
+def normalize_words(text: str) -> Set[str]:
+    """Lowercase, accent-free words of a text."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return {word for word in "".join(char if char.isalnum() or char in "+#" else " " for char in text).split()}
+
+
+def keyword_scorer(request: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Score a CV by the job requirements whose words all appear in it.
+
+    A CPU-only baseline: CV bytes are decoded as text, so it suits plain
+    text and text-based documents. Point ANALYSIS_SCORER at another function
+    with the same signature to use a model instead.
+
+    Args:
+        request: application_id, cv (bytes) and job (title, description, requirements)
+
+    Returns:
+        score (0-100), observations, qualified, strengths, weaknesses, keywords_match
+    """
+    cv_words = normalize_words(request["cv"].decode("utf-8", errors="ignore"))
+    job = request["job"]
+    requirements = [requirement for requirement in job["requirements"] or [] if normalize_words(requirement)]
+    if not requirements:
+        requirements = [job["title"]]
+
+    matched = [requirement for requirement in requirements if normalize_words(requirement) <= cv_words]
+    missing = [requirement for requirement in requirements if requirement not in matched]
+    score = round(100 * len(matched) / len(requirements))
+    return {
+        "score": score,
+        "observations": f"{len(matched)} of {len(requirements)} requirements found in the CV",
+        "qualified": score >= QUALIFIED_SCORE,
+        "strengths": "\n".join(matched),
+        "weaknesses": "\n".join(missing),
+        "keywords_match": ", ".join(matched),
+    }
+
+
+@lru_cache(maxsize=8)
+def load_scorer(path: str) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Import a scorer given as "module:function"."""
+    module, _, name = path.partition(":")
+    return getattr(import_module(module), name)
+
+
+def run_scorer(path: str, request: Dict[str, Any]) -> Dict[str, Any]:
+    """Score one application in a pool worker and validate the result."""
+    result = load_scorer(path)(request)
+    missing = [field for field in RESULT_FIELDS if field not in result]
+    if missing:
+        raise ValueError(f"Scorer result lacks {', '.join(missing)}")
+    result = {field: result[field] for field in RESULT_FIELDS}
+    result["score"] = max(0, min(100, int(result["score"])))
+    result["qualified"] = bool(result["qualified"])
+    return result
+
+
+def get_queue_stats(db: Session) -> Dict[str, int]:
+    """Number of analysis jobs in each status."""
+    counts = dict(
+        db.query(models.AnalysisJob.status, func.count())
+        .group_by(models.AnalysisJob.status)
+    )
+    return {status.value: counts.get(status, 0) for status in models.AnalysisJobStatus}
+
+
+class AnalysisWorkerPool:
+    """
+    Analyzes queued applications with a process or thread pool.
+
+    The dispatcher claims batches of analysis_jobs rows with FOR UPDATE
+    SKIP LOCKED in short transactions, reads the CV and job of each claimed
+    application, hands them to the pool, and writes the results of a batch
+    back in a single transaction. It stops claiming while max_in_flight
+    applications are being analyzed, so a slow scorer never makes it hold
+    an unbounded number of CVs. Several worker processes can share the queue.
+    """
+
+    def __init__(
+        self,
+        workers: int = ANALYSIS_WORKERS,
+        pool: str = ANALYSIS_POOL,
+        batch_size: int = ANALYSIS_BATCH_SIZE,
+        max_in_flight: int = ANALYSIS_MAX_IN_FLIGHT,
+        poll_interval: float = ANALYSIS_POLL_INTERVAL,
+        lease_seconds: int = ANALYSIS_LEASE_SECONDS,
+        max_attempts: int = ANALYSIS_MAX_ATTEMPTS,
+        scorer: str = ANALYSIS_SCORER,
+    ):
+        if pool not in ("process", "thread"):
+            raise ValueError(f"Unknown analysis pool '{pool}': use process or thread")
+        self.workers = workers
+        self.pool = pool
+        self.batch_size = batch_size
+        self.max_in_flight = max(max_in_flight, batch_size)
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.scorer = scorer
+        self.stats = {"analyzed": 0, "failed": 0, "retried": 0}
+
+    def _create_executor(self) -> Executor:
+        if self.pool == "process":
+            return ProcessPoolExecutor(max_workers=self.workers)
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="analysis")
+
+    async def claim(self, limit: int) -> List[Any]:
+        """
+        Claim up to limit queued jobs, and jobs whose lease expired.
+
+        An expired job is claimed again only if it has attempts left: jobs
+        whose worker died during their last attempt are marked failed, so a
+        CV that crashes the scorer isn't retried forever. Both statements
+        skip the rows other workers have locked.
+
+        Returns:
+            Claimed rows (id, application_id, attempts)
+        """
+        jobs = models.AnalysisJob
+        expired = func.now() - timedelta(seconds=self.lease_seconds)
+        claimable = (
+            select(jobs.id)
+            .where(or_(
+                jobs.status == models.AnalysisJobStatus.queued,
+                and_(
+                    jobs.status == models.AnalysisJobStatus.running,
+                    jobs.locked_at < expired,
+                    jobs.attempts < self.max_attempts
+                )
+            ))
+            .order_by(jobs.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        exhausted = (
+            select(jobs.id)
+            .where(
+                jobs.status == models.AnalysisJobStatus.running,
+                jobs.locked_at < expired,
+                jobs.attempts >= self.max_attempts
+            )
+            .with_for_update(skip_locked=True)
+        )
+        async with AsyncSessionLocal() as db:
+            abandoned = (await db.execute(
+                update(jobs.__table__)
+                .where(jobs.__table__.c.id.in_(exhausted))
+                .values(
+                    status=models.AnalysisJobStatus.failed,
+                    last_error=f"Lease expired after {self.max_attempts} attempts",
+                    locked_at=None,
+                    updated_at=func.now()
+                )
+                .returning(jobs.__table__.c.application_id)
+            )).all()
+            rows = (await db.execute(
+                update(jobs.__table__)
+                .where(jobs.__table__.c.id.in_(claimable))
+                .values(
+                    status=models.AnalysisJobStatus.running,
+                    locked_at=func.now(),
+                    attempts=jobs.__table__.c.attempts + 1,
+                    updated_at=func.now()
+                )
+                .returning(jobs.__table__.c.id, jobs.__table__.c.application_id, jobs.__table__.c.attempts)
+            )).all()
+            await db.commit()
+        for job in abandoned:
+            self.stats["failed"] += 1
+            logger.warning(f"Analysis of application {job.application_id} failed: lease expired after {self.max_attempts} attempts")
+        return sorted(rows, key=lambda row: row.id)
+
+    async def load_requests(self, claimed: List[Any]) -> Dict[int, Any]:
+        """
+        Scorer request of each claimed job, or the error preventing its analysis.
+
+        Only the first ANALYSIS_MAX_CV_BYTES of a CV are read.
+        """
+        application_ids = [job.application_id for job in claimed]
+        requests: Dict[int, Any] = {}
+        async with AsyncSessionLocal() as db:
+            rows = {
+                row.id: row
+                for row in (await db.execute(
+                    select(
+                        models.JobApplication.id,
+                        models.JobApplication.cv_url,
+                        models.Job.title,
+                        models.Job.description,
+                        models.Job.requirements
+                    )
+                    .join(models.Job, models.Job.id == models.JobApplication.job_id)
+                    .where(models.JobApplication.id.in_(application_ids))
+                ))
+            }
+            for job in claimed:
+                row = rows.get(job.application_id)
+                if row is None:
+                    requests[job.id] = AnalysisInputError("Application or job not found")
+                    continue
+                db_file = await get_file_by_uuid(row.cv_url.rstrip("/").rsplit("/", 1)[-1], db)
+                if db_file is None:
+                    requests[job.id] = AnalysisInputError(f"CV file not found: {row.cv_url}")
+                    continue
+
+                cv = bytearray()
+                if db_file.file_size:
+                    end = min(db_file.file_size, ANALYSIS_MAX_CV_BYTES) - 1
+                    async for part in iter_file_range(db_file, db, 0, end):
+                        cv.extend(part)
+                requests[job.id] = {
+                    "application_id": row.id,
+                    "cv": bytes(cv),
+                    "job": {"title": row.title, "description": row.description, "requirements": row.requirements},
+                }
+        return requests
+
+    async def write_results(self, claimed: List[Any], results: Dict[int, Any]) -> None:
+        """
+        Write the results of a batch back in one transaction.
+
+        Analyzed applications still pending move to the analyzed status.
+        Failed jobs are queued again until they reach max_attempts.
+        """
+        applications = models.JobApplication.__table__
+        jobs = models.AnalysisJob.__table__
+
+        analyzed = [
+            {"application_id": job.application_id, **{f"result_{field}": results[job.id][field] for field in RESULT_FIELDS}}
+            for job in claimed
+            if not isinstance(results[job.id], Exception)
+        ]
+        outcomes = []
+        for job in claimed:
+            result = results[job.id]
+            if not isinstance(result, Exception):
+                outcomes.append({"job_id": job.id, "job_status": models.AnalysisJobStatus.done, "error": None})
+                continue
+            retry = job.attempts < self.max_attempts and not isinstance(result, AnalysisInputError)
+            outcomes.append({
+                "job_id": job.id,
+                "job_status": models.AnalysisJobStatus.queued if retry else models.AnalysisJobStatus.failed,
+                "error": f"{type(result).__name__}: {result}"[:2000],
+            })
+            self.stats["retried" if retry else "failed"] += 1
+            logger.warning(f"Analysis of application {job.application_id} failed (attempt {job.attempts}): {result}")
+
+        async with AsyncSessionLocal() as db:
+            if analyzed:
+                await db.execute(
+                    update(applications)
+                    .where(applications.c.id == bindparam("application_id"))
+                    .values(
+                        **{field: bindparam(f"result_{field}") for field in RESULT_FIELDS},
+                        analyzed_at=func.now(),
+                        status=case(
+                            (
+                                applications.c.status == models.ApplicationStatus.pending,
+                                literal(models.ApplicationStatus.analyzed, applications.c.status.type)
+                            ),
+                            else_=applications.c.status
+                        )
+                    ),
+                    analyzed
+                )
+            await db.execute(
+                update(jobs)
+                .where(jobs.c.id == bindparam("job_id"))
+                .values(status=bindparam("job_status"), last_error=bindparam("error"), locked_at=None, updated_at=func.now()),
+                outcomes
+            )
+            await db.commit()
+        self.stats["analyzed"] += len(analyzed)
+
+    async def process_batch(self, executor: Executor, claimed: List[Any]) -> None:
+        """Load, score and write back one claimed batch."""
+        loop = asyncio.get_running_loop()
+        try:
+            requests = await self.load_requests(claimed)
+            pending = {
+                job_id: loop.run_in_executor(executor, run_scorer, self.scorer, request)
+                for job_id, request in requests.items()
+                if not isinstance(request, Exception)
+            }
+            scored = await asyncio.gather(*pending.values(), return_exceptions=True)
+            results = {**requests, **dict(zip(pending, scored))}
+            await self.write_results(claimed, results)
+        except Exception as e:
+            logger.error(f"Analysis batch of {len(claimed)} applications failed: {str(e)}")
+            # Release the jobs now instead of when their lease expires: queued again while attempts are left
+            try:
+                await self.write_results(claimed, {job.id: e for job in claimed})
+            except Exception as release_error:
+                logger.error(f"Analysis jobs of the failed batch are retried once their lease expires: {str(release_error)}")
+
+    async def run(self, once: bool = False) -> Dict[str, int]:
+        """
+        Analyze queued applications until cancelled.
+
+        Args:
+            once: Stop when the queue is empty instead of polling it
+
+        Returns:
+            Number of analyzed, failed and retried applications
+        """
+        in_flight: Dict[asyncio.Task, int] = {}
+        executor = self._create_executor()
+        logger.info(
+            f"Analysis pool started: {self.workers} {self.pool} workers, batches of {self.batch_size}, "
+            f"at most {self.max_in_flight} applications in flight"
+        )
+        try:
+            while True:
+                claimed = []
+                capacity = self.max_in_flight - sum(in_flight.values())
+                if capacity > 0:
+                    claimed = await self.claim(min(self.batch_size, capacity))
+                if claimed:
+                    task = asyncio.create_task(self.process_batch(executor, claimed))
+                    in_flight[task] = len(claimed)
+                    continue
+
+                if not in_flight:
+                    if once:
+                        break
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+
+                # Full, or nothing to claim: wait for a batch to be written back
+                done, _ = await asyncio.wait(
+                    in_flight, timeout=None if capacity <= 0 else self.poll_interval,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    del in_flight[task]
+        finally:
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+            executor.shutdown(wait=True)
+        return dict(self.stats)
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+import os
+import secrets
+import logging
+
+import jwt
+
+from . import schemas
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Key signing the access tokens, shared by every worker of the API
+JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
+JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+# Lifetime of an access token
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
+
+if not JWT_SECRET_KEY:
+    JWT_SECRET_KEY = secrets.token_hex(32)
+    logger.warning(
+        "JWT_SECRET_KEY is not set: using a random key, tokens won't survive a restart "
+        "nor be accepted by other workers"
+    )
+
+
+class InvalidTokenError(Exception):
+    """Raised when an access token is malformed, badly signed or expired"""
+
+
+def create_access_token(user_id: int, role: schemas.UserRole) -> str:
+    """
+    Create a signed access token for a user.
+
+    Args:
+        user_id: ID of the authenticated user
+        role: Role of the user, checked by handlers without loading the user
+
+    Returns:
+        Encoded JWT
+    """
+    now = datetime.now(timezone.utc)
+    payload = {
+        "sub": str(user_id),
+        "role": schemas.UserRole(role).value,
+        "iat": now,
+        "exp": now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    }
+    return jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+
+
+def decode_access_token(token: str) -> schemas.TokenData:
+    """
+    Verify an access token and return its claims.
+
+    Only the signature and the expiry are checked: no database access.
+
+    Args:
+        token: Encoded JWT
+
+    Returns:
+        ID and role of the user
+
+    Raises:
+        InvalidTokenError: If the token is invalid or expired
+    """
+    try:
+        payload = jwt.decode(
+            token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM],
+            options={"require": ["sub", "role", "exp"]}
+        )
+        return schemas.TokenData(id=int(payload["sub"]), role=payload["role"])
+    except (jwt.PyJWTError, ValueError) as e:
+        raise InvalidTokenError(str(e)) from e
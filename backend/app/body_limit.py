@@ -0,0 +1,50 @@
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from typing import Tuple
+
+
+class BodySizeLimitMiddleware:
+    """
+    Reject requests to some paths whose body grows past max_body_size.
+
+    Starlette reads and spools a whole multipart body before the endpoint
+    runs, so a size limit checked by the endpoint only applies once the
+    upload has been fully received. This middleware answers 413 right away
+    when the declared Content-Length is over the limit, and otherwise counts
+    the body as it is received and aborts at the first chunk past the limit.
+    """
+
+    def __init__(self, app, paths: Tuple[str, ...], max_body_size: int, detail: str = "Request body is too large"):
+        self.app = app
+        self.paths = paths
+        self.max_body_size = max_body_size
+        self.detail = detail
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > self.max_body_size:
+            response = JSONResponse(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                content={"detail": self.detail},
+                headers={"Connection": "close"},
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # Raised while the form is parsed: FastAPI passes HTTPExceptions through as responses
+                    raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=self.detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,213 @@
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, ValidationError
+from fastapi import HTTPException, status
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Type
+import codecs
+import csv
+import json
+import logging
+
+from . import models, schemas
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Rows inserted per INSERT statement (one transaction each)
+BATCH_SIZE = 1000
+
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines"}
+CSV_MEDIA_TYPES = {"text/csv", "application/csv"}
+
+
+def get_import_format(content_type: Optional[str]) -> str:
+    """
+    Resolve the format of an import from the request Content-Type.
+
+    Raises:
+        HTTPException: 415 if the media type is neither NDJSON nor CSV
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in NDJSON_MEDIA_TYPES:
+        return "ndjson"
+    if media_type in CSV_MEDIA_TYPES:
+        return "csv"
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail="Import must be sent as NDJSON (application/x-ndjson) or CSV (text/csv)"
+    )
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a streamed UTF-8 body into lines, without reading it all in memory."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_ndjson_rows(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield (row number, parsed object) for each non-empty NDJSON line."""
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            yield row, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row, ValueError(f"Invalid JSON: {e.msg}")
+
+
+def parse_csv_value(field: str, value: str, list_fields: set) -> Any:
+    """Empty cells are missing values; list cells hold a JSON array or '|' separated items."""
+    if value == "":
+        return None
+    if field in list_fields:
+        if value.lstrip().startswith("["):
+            return json.loads(value)
+        return [item.strip() for item in value.split("|") if item.strip()]
+    return value
+
+
+async def iter_csv_rows(lines: AsyncIterator[str], list_fields: set) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield (row number, dict) for each CSV record, the first record being the header."""
+    header = None
+    row = 0
+    record = ""
+    async for line in lines:
+        record = f"{record}\n{line}" if record else line
+        # A quoted field may contain line breaks: wait for the closing quote
+        if record.count('"') % 2:
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+
+        row += 1
+        if len(values) != len(header):
+            yield row, ValueError(f"Expected {len(header)} columns, got {len(values)}")
+            continue
+        try:
+            data = {name: parse_csv_value(name, value, list_fields) for name, value in zip(header, values)}
+        except json.JSONDecodeError as e:
+            yield row, ValueError(f"Invalid JSON array: {e.msg}")
+            continue
+        yield row, {name: value for name, value in data.items() if value is not None}
+
+    if record:
+        row += 1
+        yield row, ValueError("Unterminated quoted field")
+
+
+def format_errors(error: Exception) -> List[Dict[str, Any]]:
+    """JSON-serializable description of why a row was rejected."""
+    if isinstance(error, ValidationError):
+        return [
+            {"field": ".".join(str(part) for part in e["loc"]) or None, "message": e["msg"]}
+            for e in error.errors()
+        ]
+    return [{"field": None, "message": str(error)}]
+
+
+async def insert_batch(db: AsyncSession, table, batch: List[Tuple[int, Dict[str, Any]]], errors: list) -> int:
+    """
+    Insert a batch with one multi-row INSERT and commit it.
+
+    If the statement fails, rows are inserted one by one in savepoints so a
+    single bad row only rejects itself.
+
+    Returns:
+        Number of inserted rows
+    """
+    try:
+        await db.execute(insert(table).values([values for _, values in batch]))
+        await db.commit()
+        return len(batch)
+    except Exception as e:
+        await db.rollback()
+        logger.warning(f"Batch insert failed, retrying row by row: {str(e)}")
+
+    inserted = 0
+    for row, values in batch:
+        try:
+            async with db.begin_nested():
+                await db.execute(insert(table).values(values))
+            inserted += 1
+        except Exception as e:
+            errors.append({"row": row, "errors": [{"field": None, "message": str(getattr(e, "orig", e))}]})
+    await db.commit()
+    return inserted
+
+
+async def import_rows(
+    rows: AsyncIterator[Tuple[int, Any]],
+    schema: Type[BaseModel],
+    model,
+    db: AsyncSession,
+    batch_size: int = BATCH_SIZE
+) -> Dict[str, Any]:
+    """
+    Validate rows against a schema and insert the valid ones in batches.
+
+    Invalid rows are reported and skipped; they never abort the import.
+
+    Args:
+        rows: (row number, object or parse error) pairs
+        schema: Pydantic model validating each row
+        model: ORM model of the destination table
+        db: Async database session
+        batch_size: Rows per INSERT statement
+
+    Returns:
+        Counts of inserted and rejected rows with the errors of each rejected row
+    """
+    table = model.__table__
+    errors: List[Dict[str, Any]] = []
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+    inserted = 0
+    total = 0
+
+    async for row, data in rows:
+        total += 1
+        try:
+            if isinstance(data, Exception):
+                raise data
+            # Every row has all the columns, as a multi-row INSERT requires
+            batch.append((row, schema.model_validate(data).model_dump()))
+        except (ValidationError, ValueError) as e:
+            errors.append({"row": row, "errors": format_errors(e)})
+            continue
+
+        if len(batch) >= batch_size:
+            inserted += await insert_batch(db, table, batch, errors)
+            batch = []
+
+    if batch:
+        inserted += await insert_batch(db, table, batch, errors)
+
+    errors.sort(key=lambda error: error["row"])
+    return {"total": total, "inserted": inserted, "failed": len(errors), "errors": errors}
+
+
+async def import_jobs(chunks: AsyncIterator[bytes], content_type: Optional[str], db: AsyncSession) -> Dict[str, Any]:
+    """Import jobs from a streamed NDJSON or CSV body."""
+    import_format = get_import_format(content_type)
+    lines = iter_lines(chunks)
+    if import_format == "ndjson":
+        rows = iter_ndjson_rows(lines)
+    else:
+        rows = iter_csv_rows(lines, {"responsibilities", "requirements", "benefits"})
+    return await import_rows(rows, schemas.JobCreate, models.Job, db)
@@ -0,0 +1,227 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+import hashlib
+import threading
+import time
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Small thread-safe in-process cache with a per-entry time to live.
+
+    Entries expire `ttl` seconds after they were stored. When `maxsize` is
+    set, the least recently used entry is evicted once the cache is full.
+    Hit and miss counters are kept so the cache efficiency can be exposed.
+    Like ResponseCache, a generation counter keeps values computed before an
+    invalidation from being stored after it.
+    """
+
+    def __init__(self, name: str, ttl: float, maxsize: Optional[int] = None):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Bumped by every invalidation, see set()
+        self.generation = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """
+        Store value under key for the cache TTL.
+
+        Pass the generation read before loading the value: if an invalidation
+        happened meanwhile, the value may be stale and is not stored.
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and storing it on a miss."""
+        missing = object()
+        generation = self.generation
+        value = self.get(key, missing)
+        if value is missing:
+            value = factory()
+            self.set(key, value, generation)
+        return value
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one entry, or the whole cache when no key is given."""
+        with self._lock:
+            self.generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the cache counters and hit ratio."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class CachedResponse(NamedTuple):
+    """Serialized response body with its strong ETag and extra headers"""
+    body: bytes
+    etag: str
+    headers: Dict[str, str]
+    meta: Any
+    size: int
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache of serialized responses, capped in bytes.
+
+    Each entry keeps its JSON body, a strong ETag computed from the body and
+    caller-defined metadata used by invalidate_where to drop precisely the
+    entries a write affects. Entries also expire after `ttl` seconds.
+    """
+
+    # Approximate bookkeeping cost of an entry, on top of its body
+    ENTRY_OVERHEAD = 256
+
+    def __init__(self, name: str, max_bytes: int, ttl: float):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # Bumped by every invalidation, see set()
+        self.generation = 0
+
+    def _drop(self, key: Hashable) -> None:
+        _, entry = self._entries.pop(key)
+        self.size -= entry.size
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        """Return the cached response for key, or None if absent or expired."""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return item[1]
+            if item is not None:
+                self._drop(key)
+            self.misses += 1
+            return None
+
+    def set(
+        self,
+        key: Hashable,
+        body: bytes,
+        headers: Optional[Dict[str, str]] = None,
+        meta: Any = None,
+        generation: Optional[int] = None
+    ) -> CachedResponse:
+        """
+        Store a serialized body under key and return the entry, evicting the least recently used ones.
+
+        Pass the generation read before querying the data: if an invalidation
+        happened meanwhile, the body may be stale and is returned without being stored.
+        """
+        headers = headers or {}
+        entry = CachedResponse(
+            body=body,
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            headers=headers,
+            meta=meta,
+            size=len(body) + sum(len(k) + len(v) for k, v in headers.items()) + self.ENTRY_OVERHEAD,
+        )
+        # Larger than the whole cache: serve it without storing it
+        if entry.size > self.max_bytes:
+            return entry
+
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return entry
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, entry)
+            self.size += entry.size
+            while self.size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+        return entry
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one entry, or the whole cache when no key is given."""
+        with self._lock:
+            self.generation += 1
+            if key is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                self.size = 0
+            elif key in self._entries:
+                self._drop(key)
+                self.invalidations += 1
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Drop the entries for which predicate(key, meta) is true and return how many were dropped."""
+        with self._lock:
+            self.generation += 1
+            keys = [key for key, (_, entry) in self._entries.items() if predicate(key, entry.meta)]
+            for key in keys:
+                self._drop(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the cache counters, memory use and hit ratio."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
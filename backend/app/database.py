@@ -1,9 +1,14 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 import os
 import time
 import logging
+import threading
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.sql import text
 
@@ -18,6 +23,13 @@ DB_HOST = os.getenv("POSTGRES_HOST", "db")
 DB_PORT = os.getenv("POSTGRES_PORT", "5432")
 DB_NAME = os.getenv("POSTGRES_DB", "fastapi_db")
 
+# Connection pool settings, per engine and per worker process
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Connections older than this (seconds) are replaced on checkout
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
 # Construct database URL with proper escaping
 # Use urllib.parse to properly escape special characters in password
 from urllib.parse import quote_plus
@@ -55,6 +67,77 @@ else:
     logger.info(f"Database URL format unexpected: {SQLALCHEMY_DATABASE_URL.split(':')[0]}")
 
 
+class PoolMetricsMixin:
+    """
+    Records how long checkouts wait for a free connection.
+
+    Waits happen when pool_size + max_overflow connections are all checked
+    out; timeouts count the checkouts that gave up after pool_timeout.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._metrics_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._metrics_lock:
+                self.checkouts += 1
+                self.wait_time_total += waited
+                self.wait_time_max = max(self.wait_time_max, waited)
+
+    def stats(self):
+        """Return the live pool usage and the checkout wait counters."""
+        with self._metrics_lock:
+            return {
+                "pool_size": self.size(),
+                "max_overflow": self._max_overflow,
+                "timeout": self._timeout,
+                "recycle": self._recycle,
+                "checked_out": self.checkedout(),
+                "checked_in": self.checkedin(),
+                "overflow": max(self.overflow(), 0),
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_time_total": round(self.wait_time_total, 6),
+                "wait_time_avg": round(self.wait_time_total / self.checkouts, 6) if self.checkouts else 0.0,
+                "wait_time_max": round(self.wait_time_max, 6),
+            }
+
+
+class InstrumentedQueuePool(PoolMetricsMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(PoolMetricsMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def get_pool_options(poolclass):
+    """Engine keyword arguments of the configured connection pool."""
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        # Connections dropped by a Postgres restart are detected and replaced on checkout
+        "pool_pre_ping": True,
+    }
+
+
 # Create engine with retry logic
 def get_engine(url, max_retries=10, retry_interval=5):
     retries = 0
@@ -76,7 +159,7 @@ def get_engine(url, max_retries=10, retry_interval=5):
     while retries < max_retries:
         try:
             # Create engine with SQLAlchemy 1.4 syntax
-            engine = create_engine(url)
+            engine = create_engine(url, **get_pool_options(InstrumentedQueuePool))
             
             # Test connection
             connection = engine.connect()
@@ -168,4 +251,26 @@ with engine.connect() as connection:
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine on asyncpg for the async endpoints, so their queries don't block the event loop.
+# It connects lazily: the sync engine above has already checked that the database is reachable.
+ASYNC_SQLALCHEMY_DATABASE_URL = make_url(SQLALCHEMY_DATABASE_URL).set(drivername="postgresql+asyncpg")
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, **get_pool_options(InstrumentedAsyncQueuePool))
+
+AsyncSessionLocal = sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+
+def get_pool_stats():
+    """Return the connection pool statistics of both engines."""
+    return {
+        "sync": engine.pool.stats(),
+        "async": async_engine.sync_engine.pool.stats(),
+    }
+
+
 Base = declarative_base()
\ No newline at end of file
@@ -1,19 +1,31 @@
-from sqlalchemy import Column, Integer, String, LargeBinary, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, LargeBinary, DateTime, ForeignKey, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.sql import func
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, column_property, deferred
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import UploadFile, HTTPException, status
 import os
 import uuid
-from datetime import datetime
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 import logging
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 
 from .database import Base
+from .storage_backends import CHUNK_SIZE, StorageBackend, get_backend
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Uploads are read and written in CHUNK_SIZE parts, so the memory used by
+# an upload does not depend on the file size
+MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+
+# Room for the multipart boundaries and the other form fields of an upload request
+MULTIPART_OVERHEAD = 64 * 1024
+
 class FileStorage(Base):
     """Model for storing files in the database"""
     __tablename__ = "file_storage"
@@ -21,7 +33,9 @@ class FileStorage(Base):
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String, nullable=False)
     content_type = Column(String, nullable=False)
-    file_data = Column(LargeBinary, nullable=False)  # Stockage binaire du fichier
+    # Ancien stockage en un bloc (NULL si stocké dans un blob), jamais chargé par défaut
+    file_data = deferred(Column(LargeBinary, nullable=True))
+    blob_id = Column(Integer, ForeignKey("file_blobs.id"), nullable=True, index=True)  # Contenu partagé
     file_size = Column(Integer, nullable=False)
     file_uuid = Column(String, unique=True, index=True, nullable=False)
     candidate_id = Column(Integer, nullable=False)
@@ -29,24 +43,63 @@ class FileStorage(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # True for files stored before content-addressed blobs; checked without loading the content
+    is_inline = column_property(file_data.columns[0].isnot(None))
+
     def __repr__(self):
         return f"<FileStorage(id={self.id}, filename={self.filename}, file_type={self.file_type})>"
 
-async def store_file(file: UploadFile, file_type: str, candidate_id: int, db: Session) -> str:
+class FileBlob(Base):
+    """Model for a distinct file content, shared by every upload of the same bytes"""
+    __tablename__ = "file_blobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), unique=True, nullable=False)  # Empreinte du contenu
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=1)  # Nombre de FileStorage pointant sur ce blob
+    backend = Column(String, nullable=False, default="postgres")  # Backend où le contenu est stocké
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<FileBlob(id={self.id}, sha256={self.sha256}, ref_count={self.ref_count})>"
+
+# SHA-256 and storage backend of the content, loaded with the file metadata (NULL for inline files)
+FileStorage.content_sha256 = column_property(
+    select(FileBlob.sha256).where(FileBlob.id == FileStorage.blob_id).scalar_subquery()
+)
+FileStorage.content_backend = column_property(
+    select(FileBlob.backend).where(FileBlob.id == FileStorage.blob_id).scalar_subquery()
+)
+
+
+async def store_file(
+    file: UploadFile,
+    file_type: str,
+    candidate_id: int,
+    db: AsyncSession,
+    max_size: int = MAX_FILE_SIZE
+) -> str:
     """
     Store a file in the database and return a URL to access it.
     
+    The content is stored once per distinct SHA-256: a first pass hashes the
+    upload CHUNK_SIZE bytes at a time and aborts as soon as it grows past
+    max_size. If the same bytes were already stored, the new record just
+    references the existing blob; otherwise a second pass writes the chunks.
+    An upload never holds more than one chunk in memory.
+    
     Args:
         file: The uploaded file
         file_type: Type of file ('cv' or 'cover_letter')
         candidate_id: ID of the candidate
-        db: Database session
+        db: Async database session
+        max_size: Maximum accepted file size in bytes
         
     Returns:
         URL to access the file
         
     Raises:
-        HTTPException: If there's an error storing the file
+        HTTPException: If the file is invalid, too large or can't be stored
     """
     try:
         # Validate file type
@@ -55,73 +108,380 @@ async def store_file(file: UploadFile, file_type: str, candidate_id: int, db: Se
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid file type. Must be 'cv' or 'cover_letter'"
             )
+        
+        # Reject early when the declared size is already over the limit
+        if file.size is not None and file.size > max_size:
+            raise_file_too_large(max_size)
+        
+        # First pass: hash the content and enforce the size limit
+        digest = hashlib.sha256()
+        file_size = 0
+        while True:
+            chunk = await file.read(CHUNK_SIZE)
+            if not chunk:
+                break
             
-        # Read file content
-        file_content = await file.read()
-        file_size = len(file_content)
+            file_size += len(chunk)
+            if file_size > max_size:
+                raise_file_too_large(max_size)
+            digest.update(chunk)
+        
+        # Reference the existing blob, or create it if this content is new
+        backend = get_backend()
+        blob_id, created = await acquire_blob(db, digest.hexdigest(), file_size, backend)
+        
+        # Second pass: write the content of a new blob
+        if created:
+            await file.seek(0)
+            writer = await backend.open_writer(blob_id, digest.hexdigest(), db)
+            try:
+                while True:
+                    chunk = await file.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    await writer.write(chunk)
+                await writer.close()
+            except Exception:
+                await writer.abort()
+                raise
         
         # Generate a unique UUID for the file
         file_uuid = str(uuid.uuid4())
         
-        # Create a new file storage record
+        # Create a new file storage record pointing at the blob
         db_file = FileStorage(
             filename=file.filename,
             content_type=file.content_type,
-            file_data=file_content,
+            file_data=None,
+            blob_id=blob_id,
             file_size=file_size,
             file_uuid=file_uuid,
             candidate_id=candidate_id,
             file_type=file_type
         )
-        
-        # Add to database
         db.add(db_file)
-        db.commit()
-        db.refresh(db_file)
+        await db.commit()
         
         # Generate URL for accessing the file
         # This URL will be used by the frontend to retrieve the file
         file_url = f"/api/files/{file_uuid}"
         
-        logger.info(f"File stored successfully: {file.filename}, UUID: {file_uuid}")
+        if created:
+            logger.info(f"File stored successfully: {file.filename}, UUID: {file_uuid}, backend: {backend.name}")
+        else:
+            logger.info(f"File stored successfully: {file.filename}, UUID: {file_uuid}, deduplicated (blob {blob_id})")
         return file_url
         
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error storing file: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to store file: {str(e)}"
         )
 
-def get_file_by_uuid(file_uuid: str, db: Session) -> Optional[FileStorage]:
+async def acquire_blob(db: AsyncSession, sha256: str, size: int, backend: StorageBackend) -> Tuple[int, bool]:
+    """
+    Take a reference on the blob of a content, creating it if needed.
+    
+    Concurrent uploads of the same content serialize on the sha256 key. A
+    new blob is created on the given backend and its content must then be
+    written by the caller in the same transaction.
+    
+    Args:
+        db: Async database session
+        sha256: Hex SHA-256 of the content
+        size: Size of the content in bytes
+        backend: Backend storing the content of a new blob
+        
+    Returns:
+        (blob id, True if the blob was just created)
+    """
+    blobs = FileBlob.__table__
+    blob_id, created = (await db.execute(
+        pg_insert(blobs)
+        .values(sha256=sha256, size=size, ref_count=1, backend=backend.name)
+        .on_conflict_do_update(
+            index_elements=[blobs.c.sha256],
+            set_={"ref_count": blobs.c.ref_count + 1}
+        )
+        .returning(blobs.c.id, literal_column("xmax = 0"))
+    )).one()
+    return blob_id, created
+
+async def release_blob(db: AsyncSession, blob_id: int) -> None:
+    """
+    Drop a reference on a blob, deleting it with its content at the last one.
+    
+    Args:
+        db: Async database session
+        blob_id: ID of the blob
+    """
+    blobs = FileBlob.__table__
+    row = (await db.execute(
+        blobs.update()
+        .where(blobs.c.id == blob_id)
+        .values(ref_count=blobs.c.ref_count - 1)
+        .returning(blobs.c.ref_count, blobs.c.sha256, blobs.c.backend)
+    )).first()
+    if row is not None and row.ref_count <= 0:
+        await get_backend(row.backend).delete(blob_id, row.sha256, db)
+        await db.execute(blobs.delete().where(blobs.c.id == blob_id))
+
+def raise_file_too_large(max_size: int):
+    """Raise the 413 error returned for uploads over max_size bytes."""
+    raise HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File is too large. Maximum size is {max_size // (1024 * 1024)}MB"
+    )
+
+def parse_byte_range(range_header: Optional[str], file_size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range HTTP Range header.
+    
+    As RFC 9110 requires, a header that can't be used is ignored and the
+    whole file is served: bad syntax, multiple ranges or a unit other than bytes.
+    
+    Args:
+        range_header: Value of the Range header, if any
+        file_size: Size of the file in bytes
+        
+    Returns:
+        Inclusive (start, end) byte positions, or None to serve the whole file
+        
+    Raises:
+        HTTPException: 416 if a well-formed range starts past the end of the file
+    """
+    if not range_header:
+        return None
+    
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+    
+    first, separator, last = ranges.strip().partition("-")
+    if not separator or not (first.isdigit() or first == "") or not (last.isdigit() or last == ""):
+        return None
+    if first:
+        start = int(first)
+        end = int(last) if last else file_size - 1
+        if last and end < start:
+            return None
+    elif last:
+        # Suffix range: the last N bytes
+        suffix = int(last)
+        start = max(file_size - suffix, 0) if suffix else file_size
+        end = file_size - 1
+    else:
+        return None
+    
+    if start >= file_size:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{file_size}"}
+        )
+    
+    return start, min(end, file_size - 1)
+
+async def iter_file_range(db_file: FileStorage, db: AsyncSession, start: int, end: int) -> AsyncIterator[bytes]:
+    """
+    Yield bytes start..end (inclusive) of a stored file, at most CHUNK_SIZE at a time.
+    
+    Only the requested slice is read and never more than CHUNK_SIZE bytes
+    are held at once, so the full file is never loaded in memory.
+    
+    Args:
+        db_file: FileStorage record of the file
+        db: Async database session
+        start: First byte position
+        end: Last byte position
+        
+    Yields:
+        Successive parts of the requested range
+    """
+    if not db_file.is_inline:
+        backend = get_backend(db_file.content_backend)
+        async for part in backend.iter_range(db_file.blob_id, db_file.content_sha256, start, end, db):
+            yield part
+        return
+    
+    # Files stored before content-addressed blobs keep their content in a
+    # single column, sliced by Postgres with substring()
+    position = start
+    while position <= end:
+        length = min(CHUNK_SIZE, end - position + 1)
+        data = (await db.execute(
+            select(func.substring(FileStorage.file_data, position + 1, length)).where(
+                FileStorage.id == db_file.id
+            )
+        )).scalar()
+        
+        if not data:
+            logger.error(f"Missing data at byte {position} of file {db_file.file_uuid}")
+            return
+        
+        yield bytes(data)
+        position += len(data)
+
+def get_local_path(db_file: FileStorage) -> Optional[str]:
+    """
+    Filesystem path of a stored file content, if its backend keeps one.
+    
+    Args:
+        db_file: FileStorage record of the file
+        
+    Returns:
+        Path the content can be served from directly, or None
+    """
+    if db_file.is_inline:
+        return None
+    return get_backend(db_file.content_backend).get_path(db_file.blob_id, db_file.content_sha256)
+
+async def get_file_by_uuid(file_uuid: str, db: AsyncSession) -> Optional[FileStorage]:
     """
     Retrieve a file from the database by its UUID.
     
+    Only the metadata is loaded: the content is read with iter_file_range.
+    
     Args:
         file_uuid: UUID of the file
-        db: Database session
+        db: Async database session
         
     Returns:
         FileStorage object or None if not found
     """
-    return db.query(FileStorage).filter(FileStorage.file_uuid == file_uuid).first()
+    result = await db.execute(select(FileStorage).where(FileStorage.file_uuid == file_uuid))
+    return result.scalars().first()
+
+def get_etag(db_file: FileStorage) -> str:
+    """Strong ETag of a stored file: its content hash, or its UUID for inline files."""
+    return f'"{db_file.content_sha256 or db_file.file_uuid}"'
+
+def get_last_modified(db_file: FileStorage) -> Optional[datetime]:
+    """Last modification date of a stored file, truncated to HTTP date precision."""
+    modified = db_file.updated_at or db_file.created_at
+    if modified is None:
+        return None
+    if modified.tzinfo is None:
+        modified = modified.replace(tzinfo=timezone.utc)
+    return modified.astimezone(timezone.utc).replace(microsecond=0)
+
+def get_file_headers(db_file: FileStorage) -> Dict[str, str]:
+    """
+    Build the headers describing a stored file, shared by GET and HEAD.
+    
+    Args:
+        db_file: FileStorage record of the file
+        
+    Returns:
+        Content-Disposition, Accept-Ranges, ETag and Last-Modified headers
+    """
+    headers = {
+        "Content-Disposition": f"attachment; filename={db_file.filename}",
+        "Accept-Ranges": "bytes",
+        "ETag": get_etag(db_file)
+    }
+    last_modified = get_last_modified(db_file)
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match / If-Range header value against an ETag."""
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+def is_not_modified(
+    db_file: FileStorage,
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str]
+) -> bool:
+    """
+    Evaluate the conditional request headers of a GET.
+    
+    Args:
+        db_file: FileStorage record of the file
+        if_none_match: Value of the If-None-Match header
+        if_modified_since: Value of the If-Modified-Since header
+        
+    Returns:
+        True if the client copy is current and 304 should be returned
+    """
+    # If-None-Match takes precedence over If-Modified-Since
+    if if_none_match:
+        return etag_matches(if_none_match, get_etag(db_file))
+    
+    last_modified = get_last_modified(db_file)
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified <= since
+    
+    return False
 
-def delete_file(file_uuid: str, db: Session) -> bool:
+async def delete_file(file_uuid: str, db: AsyncSession) -> bool:
     """
     Delete a file from the database.
     
     Args:
         file_uuid: UUID of the file
-        db: Database session
+        db: Async database session
         
     Returns:
         True if file was deleted, False otherwise
     """
-    db_file = get_file_by_uuid(file_uuid, db)
+    db_file = await get_file_by_uuid(file_uuid, db)
     if db_file:
-        db.delete(db_file)
-        db.commit()
+        blob_id = db_file.blob_id
+        await db.delete(db_file)
+        
+        # Release the shared content, removing it with its last reference
+        if blob_id is not None:
+            await release_blob(db, blob_id)
+        
+        await db.commit()
         logger.info(f"File deleted: {db_file.filename}, UUID: {file_uuid}")
         return True
-    return False
\ No newline at end of file
+    return False
+
+def get_storage_stats(db: Session) -> Dict[str, Any]:
+    """
+    Compute deduplication statistics of the stored files.
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        Logical size (sum of every upload), physical size (bytes actually
+        stored) and their ratio
+    """
+    file_count, logical_bytes, inline_bytes = db.query(
+        func.count(FileStorage.id),
+        func.coalesce(func.sum(FileStorage.file_size), 0),
+        func.coalesce(func.sum(FileStorage.file_size).filter(FileStorage.blob_id.is_(None)), 0)
+    ).one()
+    blob_count, blob_bytes = db.query(
+        func.count(FileBlob.id),
+        func.coalesce(func.sum(FileBlob.size), 0)
+    ).one()
+    
+    physical_bytes = blob_bytes + inline_bytes
+    return {
+        "files": file_count,
+        "blobs": blob_count,
+        "logical_bytes": logical_bytes,
+        "physical_bytes": physical_bytes,
+        "dedup_ratio": round(logical_bytes / physical_bytes, 4) if physical_bytes else 1.0,
+    }
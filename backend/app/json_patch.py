@@ -0,0 +1,134 @@
+from sqlalchemy import Text, case, func, literal, null, update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from fastapi import HTTPException, status
+from typing import List, Tuple
+import re
+
+from . import schemas
+
+# Operations accepted in one patch: each one is an UPDATE statement
+MAX_PATCH_OPERATIONS = 100
+
+# Array index of a JSON pointer: no sign, no leading zero
+ARRAY_INDEX = re.compile(r"0|[1-9][0-9]*")
+
+
+def parse_pointer(pointer: str) -> List[str]:
+    """
+    Split a JSON pointer (RFC 6901) into its unescaped segments.
+
+    Raises:
+        HTTPException: 400 if the pointer does not start with '/'
+    """
+    if not pointer.startswith("/"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid JSON pointer '{pointer}': it must start with '/'"
+        )
+    return [segment.replace("~1", "/").replace("~0", "~") for segment in pointer[1:].split("/")]
+
+
+def text_path(segments: List[str]):
+    """Postgres text[] path of a JSONB element."""
+    return literal(segments, ARRAY(Text))
+
+
+def apply_operation(document, operation: schemas.JsonPatchOperation, path: List[str]):
+    """
+    SQL expressions of one patch operation on a JSONB document.
+
+    RFC 6902 requires the target of replace and remove, and the parent of
+    add, to exist. jsonb_set and #- silently leave the document unchanged
+    otherwise, so the operation comes with the condition under which it
+    applies.
+
+    Args:
+        document: JSONB expression of the document
+        operation: Patch operation
+        path: Segments of the operation path inside the document
+
+    Returns:
+        JSONB expression of the patched document, and the condition on the
+        current document (None when the operation always applies)
+    """
+    value = literal(operation.value, JSONB)
+
+    # The path designates the whole document
+    if not path:
+        return (null() if operation.op == "remove" else value), None
+
+    target_exists = document.op("#>")(text_path(path)).isnot(None)
+    if operation.op == "remove":
+        return document.op("#-")(text_path(path)), target_exists
+
+    if operation.op == "replace":
+        return func.jsonb_set(document, text_path(path), value, False), target_exists
+
+    # add: insert into arrays, set object members
+    parent_type = func.jsonb_typeof(document.op("#>")(text_path(path[:-1])))
+    if path[-1] == "-":
+        # Append to the end of the array
+        return func.jsonb_insert(document, text_path(path[:-1] + ["-1"]), value, True), parent_type == "array"
+
+    if ARRAY_INDEX.fullmatch(path[-1]):
+        # Insert before the index, at most the array length
+        index_in_array = literal(int(path[-1])) <= func.jsonb_array_length(document.op("#>")(text_path(path[:-1])))
+    else:
+        index_in_array = literal(False)
+    patched = case(
+        (parent_type == "array", func.jsonb_insert(document, text_path(path), value)),
+        else_=func.jsonb_set(document, text_path(path), value, True),
+    )
+    parent_accepts = case(
+        (parent_type == "array", index_in_array),
+        else_=parent_type == "object",
+    )
+    return patched, parent_accepts
+
+
+def build_patch_statements(table, where, operations: List[schemas.JsonPatchOperation],
+                           columns: Tuple[str, ...]) -> list:
+    """
+    Compile JSON patch operations into UPDATE statements, one per operation.
+
+    The first segment of each path names the JSONB column, the rest is the
+    location inside its document. Each statement reads the document left by
+    the previous one, so the SQL grows with the number of operations, never
+    with their nesting, and the documents never leave the database. Run them
+    in order in one transaction: a statement that returns no row is an
+    operation whose path doesn't exist, and the patch must be rolled back.
+
+    Args:
+        table: Table holding the documents
+        where: Condition selecting the patched row
+        operations: Patch operations, applied in order
+        columns: Names of the columns that may be patched
+
+    Returns:
+        UPDATE statements returning the patched row, in operation order
+
+    Raises:
+        HTTPException: 422 if there are more than MAX_PATCH_OPERATIONS operations,
+            400 if a path does not name a patchable column
+    """
+    if len(operations) > MAX_PATCH_OPERATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"A patch has at most {MAX_PATCH_OPERATIONS} operations, got {len(operations)}"
+        )
+    statements = []
+    for operation in operations:
+        column, *path = parse_pointer(operation.path)
+        if column not in columns:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid path '{operation.path}': it must start with one of /{', /'.join(columns)}"
+            )
+        # Members can be added to a document that is still NULL
+        document = func.coalesce(table.c[column], literal({}, JSONB)) if path else table.c[column]
+        patched, condition = apply_operation(document, operation, path)
+        statement = update(table).where(where)
+        if condition is not None:
+            statement = statement.where(condition)
+        statements.append(statement.values({column: patched}).returning(*table.c))
+    return statements
@@ -0,0 +1,128 @@
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from typing import Dict, List, Optional, Set
+import asyncio
+import json
+import logging
+
+import asyncpg
+
+from . import models
+from .database import SQLALCHEMY_DATABASE_URL, AsyncSessionLocal
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Channel notified by the messages_notify_inserted trigger (migration 0007)
+MESSAGES_CHANNEL = "interview_messages"
+
+# Delay before reconnecting the listener after the connection was lost
+RECONNECT_INTERVAL = 2.0
+
+
+class MessageHub:
+    """
+    Wakes up live interview connections when messages are committed.
+
+    A single dedicated connection per worker LISTENs to MESSAGES_CHANNEL and
+    sets the events of the subscribers of the notified interview. Subscribers
+    then read the new rows themselves (see fetch_messages_after), so a missed
+    or coalesced notification never loses a message. If the listening
+    connection drops, every subscriber is woken up once it is back.
+    """
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self._subscribers: Dict[int, Set[asyncio.Event]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def subscribe(self, interview_id: int) -> asyncio.Event:
+        """Register a subscriber and return the event set on new messages of the interview."""
+        self.start()
+        event = asyncio.Event()
+        self._subscribers.setdefault(interview_id, set()).add(event)
+        return event
+
+    def unsubscribe(self, interview_id: int, event: asyncio.Event) -> None:
+        events = self._subscribers.get(interview_id)
+        if events is not None:
+            events.discard(event)
+            if not events:
+                del self._subscribers[interview_id]
+
+    def _wake(self, interview_id: Optional[int] = None) -> None:
+        if interview_id is None:
+            targets = [event for events in self._subscribers.values() for event in events]
+        else:
+            targets = self._subscribers.get(interview_id, ())
+        for event in targets:
+            event.set()
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        try:
+            interview_id = json.loads(payload)["interview_id"]
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"Ignoring malformed notification on {channel}: {payload}")
+            return
+        self._wake(interview_id)
+
+    async def _run(self) -> None:
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                lost = asyncio.get_running_loop().create_future()
+                connection.add_termination_listener(lambda _: lost.done() or lost.set_result(None))
+                await connection.add_listener(MESSAGES_CHANNEL, self._on_notification)
+                logger.info(f"Listening to {MESSAGES_CHANNEL} notifications")
+
+                # Messages committed while we were not listening
+                self._wake()
+                await lost
+                logger.warning("Lost the notification connection, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Notification listener failed: {str(e)}")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(RECONNECT_INTERVAL)
+
+
+async def fetch_messages_after(interview_id: int, after_id: int, limit: int = 100) -> List[models.Message]:
+    """
+    Return the messages of an interview with an id greater than after_id, oldest first.
+
+    Ids are the resume position of a live connection: a client reconnecting
+    with the last id it received gets everything it missed. The ids of an
+    interview's messages are committed in increasing order, whatever the
+    insert path: they are assigned under a per-interview lock (migration 0012).
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(models.Message)
+            .where(models.Message.interview_id == interview_id, models.Message.id > after_id)
+            .order_by(models.Message.id)
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+
+message_hub = MessageHub(
+    make_url(SQLALCHEMY_DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+)
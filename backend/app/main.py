@@ -1,19 +1,33 @@
-from fastapi import FastAPI, Depends, HTTPException, Query, status, Path, Header, File, UploadFile, Form
+from fastapi import FastAPI, Depends, HTTPException, Query, status, Path, Header, File, UploadFile, Form, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from sqlalchemy import func, or_, text
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, or_, select, text, tuple_, update
+from sqlalchemy.exc import DBAPIError
 from typing import List, Optional
 import uvicorn
 from datetime import datetime
-import secrets
 import hashlib
 import logging
-import io
-from fastapi.responses import StreamingResponse
-from . import google_drive, file_storage
+import os
+import asyncio
+import json
+from types import SimpleNamespace
+from fastapi.responses import StreamingResponse, FileResponse
+from starlette.websockets import WebSocketState
+from pydantic import TypeAdapter, ValidationError
+from . import analysis, auth, bulk_import, google_drive, file_storage, json_patch
+from .pagination import paginate_keyset, NEXT_CURSOR_HEADER
+from .cache import CachedResponse, ResponseCache, TTLCache
+from .body_limit import BodySizeLimitMiddleware
+from .search import array_match, array_match_count, trigram_match, trigram_rank
+from .live import message_hub, fetch_messages_after
+from .matching import matching_engine
+from .serialization import get_partial_schema, parse_fields, select_columns, serialize_list
 
 from . import models, schemas
-from .database import SessionLocal, engine
+from .database import SessionLocal, AsyncSessionLocal, engine, get_pool_stats
+from .migrations import upgrade_database
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,20 +36,38 @@ logger = logging.getLogger(__name__)
 # Create FastAPI app
 app = FastAPI(title="Recruitment AI Platform API", version="1.0.0")
 
-# Create database tables on startup
+# Short-lived cache for the admin dashboard statistics
+user_stats_cache = TTLCache("user_stats", ttl=float(os.getenv("USER_STATS_CACHE_TTL", "10")))
+
+# Serialized job board responses, shared by read_job and read_jobs
+job_cache = ResponseCache(
+    "jobs",
+    max_bytes=int(os.getenv("JOB_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+    ttl=float(os.getenv("JOB_CACHE_TTL", "60"))
+)
+job_list_adapter = TypeAdapter(List[schemas.Job])
+
+# Column values of the users loaded by get_current_user, bounded LRU (USER_CACHE_SIZE=0 disables it).
+# Invalidations only reach the worker that made the change: the TTL bounds
+# how long other workers may keep serving a changed or deactivated user.
+user_cache = TTLCache(
+    "users",
+    ttl=float(os.getenv("USER_CACHE_TTL", "5")),
+    maxsize=int(os.getenv("USER_CACHE_SIZE", "1000"))
+)
+
+# Apply database migrations on startup
 @app.on_event("startup")
 async def create_tables():
     try:
-        logger.info("Creating database tables if they don't exist")
-        models.Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created successfully")
+        upgrade_database()
         
         # Verify tables were created
         db = SessionLocal()
         try:
             # Try a simple query to verify database is working
             db.execute("SELECT 1")
-            logger.info("Database connection verified after table creation")
+            logger.info("Database connection verified after migrations")
             
             # Add default admin user if it doesn't exist
             admin_email = "admin@admin.com"
@@ -65,10 +97,23 @@ async def create_tables():
         finally:
             db.close()
     except Exception as e:
-        logger.error(f"Failed to create database tables: {str(e)}")
+        logger.error(f"Failed to migrate database: {str(e)}")
         # Don't raise the exception here to allow the application to start
         # even if table creation fails initially
 
+# Close the live interview listener on shutdown
+@app.on_event("shutdown")
+async def stop_message_hub():
+    await message_hub.stop()
+
+# Abort oversized uploads while their body is received, before it is spooled to disk
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    paths=("/api/upload-file/", "/api/upload-to-drive/"),
+    max_body_size=file_storage.MAX_FILE_SIZE + file_storage.MULTIPART_OVERHEAD,
+    detail=f"File is too large. Maximum size is {file_storage.MAX_FILE_SIZE // (1024 * 1024)}MB"
+)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -76,6 +121,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Accept-Ranges", "Content-Range", "Content-Length", "ETag", "Last-Modified"],
 )
 
 # Dependency to get database session
@@ -86,9 +132,14 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Dependency to get an async database session, used by the file endpoints
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
         
-# Dependency to get current authenticated user
-def get_current_user(db: Session = Depends(get_db), authorization: str = Header(None)):
+# Dependency to get the identity carried by the access token, without any database access
+def get_token_data(authorization: str = Header(None)) -> schemas.TokenData:
     if authorization is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -97,30 +148,37 @@ def get_current_user(db: Session = Depends(get_db), authorization: str = Header(
         )
     
     # Extract token from Authorization header
-    scheme, token = authorization.split()
-    if scheme.lower() != "bearer":
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication scheme",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Parse user ID from token (format: user_{id}_{random_hex})
+    # Verify signature and expiry of the token
     try:
-        parts = token.split('_')
-        if len(parts) < 3 or parts[0] != "user":
-            raise ValueError("Invalid token format")
-        
-        user_id = int(parts[1])
-    except (ValueError, IndexError):
+        return auth.decode_access_token(token.strip())
+    except auth.InvalidTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+# Dependency to get current authenticated user, for handlers that need the full row
+def get_current_user(token_data: schemas.TokenData = Depends(get_token_data), db: Session = Depends(get_db)):
+    # Read before loading the user, so a row loaded before a concurrent update is not cached after it
+    generation = user_cache.generation
+    values = user_cache.get(token_data.id)
+    if values is not None:
+        # A fresh instance per request, attached without a SELECT
+        user = models.User(**values)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
     
     # Get user from database
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = db.query(models.User).filter(models.User.id == token_data.id).first()
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -128,6 +186,10 @@ def get_current_user(db: Session = Depends(get_db), authorization: str = Header(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Column values shared by later requests, dropped when the user changes
+    if user_cache.maxsize:
+        values = {column.key: getattr(user, column.key) for column in models.User.__mapper__.column_attrs}
+        user_cache.set(token_data.id, values, generation)
     return user
         
 # Helper functions for password hashing and verification
@@ -168,7 +230,7 @@ def login(login_data: schemas.UserLogin, db: Session = Depends(get_db)):
     
     # Return user data with token
     return {
-        "access_token": f"user_{user.id}_{secrets.token_hex(16)}",
+        "access_token": auth.create_access_token(user.id, user.role),
         "token_type": "bearer",
         "user": user_dict
     }
@@ -185,21 +247,41 @@ def health_check():
 
 
 
+# Sorts of the user list; the last login isn't recorded, so it can't be sorted on
+USER_SORT_COLUMNS = {
+    "name": models.User.name,
+    "email": models.User.email,
+    "role": models.User.role,
+    "dateCreated": models.User.created_at,
+}
+
 @app.get("/api/users/", response_model=List[schemas.User])
 def read_users(
+    response: Response,
     searchTerm: Optional[str] = None,
     role: Optional[schemas.UserRole] = None,
     status: Optional[schemas.UserStatus] = None,
     sortBy: Optional[str] = None,
     sortOrder: Optional[schemas.SortOrder] = schemas.SortOrder.asc,
+    searchMode: schemas.SearchMode = schemas.SearchMode.substring,
     skip: int = 0, 
     limit: int = 100, 
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     query = db.query(models.User)
     
     # Apply filters
-    if searchTerm:
+    relevance = None
+    if searchTerm and searchMode == schemas.SearchMode.trigram:
+        query = query.filter(
+            or_(
+                trigram_match(models.User.name, searchTerm),
+                trigram_match(models.User.email, searchTerm)
+            )
+        )
+        relevance = trigram_rank([models.User.name, models.User.email], [searchTerm, searchTerm])
+    elif searchTerm:
         query = query.filter(
             or_(
                 models.User.name.ilike(f"%{searchTerm}%"),
@@ -213,25 +295,35 @@ def read_users(
     if status:
         query = query.filter(models.User.status == status)
     
-    # Apply sorting
+    # Resolve sorting column
+    order_column = None
     if sortBy:
-        if sortBy == "name":
-            order_column = models.User.name
-        elif sortBy == "email":
-            order_column = models.User.email
-        elif sortBy == "role":
-            order_column = models.User.role
-        elif sortBy == "dateCreated":
-            order_column = models.User.created_at
-        elif sortBy == "lastLogin":
-            order_column = models.User.last_login
-        else:
-            order_column = models.User.id
-            
+        if sortBy not in USER_SORT_COLUMNS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown sort '{sortBy}'. Available sorts: {', '.join(USER_SORT_COLUMNS)}"
+            )
+        order_column = USER_SORT_COLUMNS[sortBy]
+    
+    # Cursor mode: keyset pagination on (sort column, id)
+    if cursor is not None:
+        return paginate_keyset(
+            query, response, cursor, limit,
+            sort_column=order_column if order_column is not None else models.User.id,
+            id_column=models.User.id,
+            sort_key=sortBy or "id",
+            descending=sortOrder == schemas.SortOrder.desc,
+        )
+    
+    # Apply sorting
+    if order_column is not None:
         if sortOrder == schemas.SortOrder.desc:
             order_column = order_column.desc()
             
         query = query.order_by(order_column)
+    elif relevance is not None:
+        # Best matches first when no explicit sort is requested
+        query = query.order_by(relevance.desc(), models.User.id)
     
     # Apply pagination
     users = query.offset(skip).limit(limit).all()
@@ -283,6 +375,7 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
         
         # Commit all changes in a single transaction
         db.commit()
+        user_stats_cache.invalidate()
         
         return db_user
     except Exception as e:
@@ -340,6 +433,8 @@ def update_user(user_id: int, user: schemas.UserUpdate, db: Session = Depends(ge
                 recruiter_profile.specialization = specialization
     
     db.commit()
+    user_stats_cache.invalidate()
+    user_cache.invalidate(user_id)
     db.refresh(db_user)
     return db_user
 
@@ -358,6 +453,10 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
     # Delete user
     db.delete(db_user)
     db.commit()
+    user_stats_cache.invalidate()
+    user_cache.invalidate(user_id)
+    # Bulk profile deletes bypass the Session listeners of the matching index
+    matching_engine.remove_candidate(user_id)
     
     return {"success": True}
 
@@ -374,52 +473,153 @@ def change_password(user_id: int, password_data: schemas.PasswordChange, db: Ses
     # Update password
     db_user.password = get_password_hash(password_data.new_password)
     db.commit()
+    user_cache.invalidate(user_id)
     
     return {"success": True, "message": "Mot de passe modifié avec succès"}
 
 @app.get("/api/users-stats", response_model=schemas.UserStats)
 def get_user_stats(db: Session = Depends(get_db)):
-    total_users = db.query(func.count(models.User.id)).scalar()
-    admin_count = db.query(func.count(models.User.id)).filter(models.User.role == models.UserRole.admin).scalar()
-    recruiter_count = db.query(func.count(models.User.id)).filter(models.User.role == models.UserRole.recruteur).scalar()
-    candidate_count = db.query(func.count(models.User.id)).filter(models.User.role == models.UserRole.candidat).scalar()
-    active_users = db.query(func.count(models.User.id)).filter(models.User.status == models.UserStatus.actif).scalar()
-    inactive_users = db.query(func.count(models.User.id)).filter(models.User.status != models.UserStatus.actif).scalar()
+    return user_stats_cache.get_or_set("stats", lambda: compute_user_stats(db))
+
+def compute_user_stats(db: Session) -> schemas.UserStats:
+    """Derive every UserStats counter from a single GROUP BY role, status scan."""
+    rows = (
+        db.query(models.User.role, models.User.status, func.count(models.User.id))
+        .group_by(models.User.role, models.User.status)
+        .all()
+    )
+    
+    role_counts = {role: 0 for role in models.UserRole}
+    active_users = 0
+    inactive_users = 0
+    for role, user_status, count in rows:
+        role_counts[role] += count
+        if user_status == models.UserStatus.actif:
+            active_users += count
+        else:
+            inactive_users += count
     
     return schemas.UserStats(
-        totalUsers=total_users,
-        adminCount=admin_count,
-        recruiterCount=recruiter_count,
-        candidateCount=candidate_count,
+        totalUsers=sum(role_counts.values()),
+        adminCount=role_counts[models.UserRole.admin],
+        recruiterCount=role_counts[models.UserRole.recruteur],
+        candidateCount=role_counts[models.UserRole.candidat],
         activeUsers=active_users,
         inactiveUsers=inactive_users
     )
 
+@app.get("/api/admin/metrics", response_model=dict)
+def get_admin_metrics(db: Session = Depends(get_db)):
+    return {
+        "caches": {
+            user_stats_cache.name: user_stats_cache.stats(),
+            user_cache.name: user_cache.stats(),
+            job_cache.name: job_cache.stats(),
+        },
+        "file_storage": file_storage.get_storage_stats(db),
+        "database_pool": get_pool_stats(),
+        "matching": matching_engine.stats(),
+        "analysis_queue": analysis.get_queue_stats(db),
+    }
+
+# Job board response cache: a job write drops the job itself and the lists it was or is now part of
+def job_cache_snapshot(job: models.Job) -> dict:
+    """Values of a job the cached job lists are filtered on."""
+    return {
+        "id": job.id,
+        "title": job.title,
+        "company": job.company,
+        "location": job.location,
+        "type": job.type.value if job.type is not None else None,
+        "recruiter_id": job.recruiter_id,
+    }
+
+def job_matches_filters(job: dict, filters: dict) -> bool:
+    """
+    Whether a job may be part of a cached job list.
+
+    Errs on the side of matching: trigram searches and terms with LIKE
+    wildcards are not evaluated and count as a match.
+    """
+    for field in ("type", "recruiter_id"):
+        if filters[field] is not None and job[field] != filters[field]:
+            return False
+    if filters["searchMode"] == schemas.SearchMode.trigram.value:
+        return True
+    for field in ("title", "company", "location"):
+        term = filters[field]
+        if term is None or "%" in term or "_" in term:
+            continue
+        if term.lower() not in (job[field] or "").lower():
+            return False
+    return True
+
+def invalidate_job_cache(*versions: dict) -> None:
+    """Drop the cached responses affected by a job write, given the job before and/or after it."""
+    job_ids = {version["id"] for version in versions}
+    for job_id in job_ids:
+        job_cache.invalidate(("job", job_id))
+    # Pages of a matching list shift even when they don't contain the job
+    job_cache.invalidate_where(
+        lambda key, meta: key[0] == "jobs" and (
+            not job_ids.isdisjoint(meta["ids"])
+            or any(job_matches_filters(version, meta["filters"]) for version in versions)
+        )
+    )
+
+def cached_json_response(entry: CachedResponse, if_none_match: Optional[str]) -> Response:
+    """Serve a cached response, or 304 when the client already has this ETag."""
+    headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": "no-cache"}
+    if file_storage.etag_matches(if_none_match, entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
 # Job endpoints
 @app.get("/api/jobs/", response_model=List[schemas.Job])
 def read_jobs(
+    response: Response,
     title: Optional[str] = None,
     company: Optional[str] = None,
     location: Optional[str] = None,
     type: Optional[schemas.JobType] = None,
     recruiter_id: Optional[int] = None,
+    searchMode: schemas.SearchMode = schemas.SearchMode.substring,
     skip: int = 0, 
     limit: int = 100, 
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     authorization: str = Header(None)
 ):
+    # Cache key: the filters as they are applied, empty values dropped
+    filters = {
+        "title": title or None,
+        "company": company or None,
+        "location": location or None,
+        "type": type.value if type else None,
+        "recruiter_id": recruiter_id or None,
+        "searchMode": searchMode.value,
+    }
+    key = ("jobs", *filters.values(), skip if cursor is None else None, limit, cursor)
+    entry = job_cache.get(key)
+    if entry is not None:
+        return cached_json_response(entry, if_none_match)
+    generation = job_cache.generation
+    
     # Authentication requirement removed as per instruction
     query = db.query(models.Job)
     
-    # Apply filters
-    if title:
-        query = query.filter(models.Job.title.ilike(f"%{title}%"))
-    
-    if company:
-        query = query.filter(models.Job.company.ilike(f"%{company}%"))
-    
-    if location:
-        query = query.filter(models.Job.location.ilike(f"%{location}%"))
+    # Apply text filters
+    searched = [
+        (column, term)
+        for column, term in ((models.Job.title, title), (models.Job.company, company), (models.Job.location, location))
+        if term
+    ]
+    for column, term in searched:
+        if searchMode == schemas.SearchMode.trigram:
+            query = query.filter(trigram_match(column, term))
+        else:
+            query = query.filter(column.ilike(f"%{term}%"))
     
     if type:
         query = query.filter(models.Job.type == type)
@@ -427,9 +627,29 @@ def read_jobs(
     if recruiter_id:
         query = query.filter(models.Job.recruiter_id == recruiter_id)
     
-    # Apply pagination
-    jobs = query.offset(skip).limit(limit).all()
-    return jobs
+    if cursor is not None:
+        # Cursor mode: keyset pagination on id
+        jobs = paginate_keyset(query, response, cursor, limit, models.Job.id, models.Job.id)
+    else:
+        # Rank trigram matches by relevance
+        if searched and searchMode == schemas.SearchMode.trigram:
+            columns, terms = zip(*searched)
+            query = query.order_by(trigram_rank(list(columns), list(terms)).desc(), models.Job.id)
+        
+        # Apply pagination
+        jobs = query.offset(skip).limit(limit).all()
+    
+    headers = {}
+    if NEXT_CURSOR_HEADER in response.headers:
+        headers[NEXT_CURSOR_HEADER] = response.headers[NEXT_CURSOR_HEADER]
+    entry = job_cache.set(
+        key,
+        job_list_adapter.dump_json(job_list_adapter.validate_python(jobs, from_attributes=True)),
+        headers,
+        meta={"filters": filters, "ids": frozenset(job.id for job in jobs)},
+        generation=generation
+    )
+    return cached_json_response(entry, if_none_match)
 
 @app.post("/api/jobs/", response_model=schemas.Job, status_code=status.HTTP_201_CREATED)
 def create_job(job: schemas.JobCreate, db: Session = Depends(get_db)):
@@ -444,16 +664,44 @@ def create_job(job: schemas.JobCreate, db: Session = Depends(get_db)):
     db.add(db_job)
     db.commit()
     db.refresh(db_job)
+    invalidate_job_cache(job_cache_snapshot(db_job))
     
     return db_job
 
+# Bulk job import: NDJSON or CSV body streamed and inserted in batches
+@app.post("/api/jobs/bulk", response_model=schemas.BulkImportResult)
+async def import_jobs(
+    request: Request,
+    content_type: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        return await bulk_import.import_jobs(request.stream(), content_type, db)
+    finally:
+        # Imported jobs may belong to any cached list
+        job_cache.invalidate_where(lambda key, meta: key[0] == "jobs")
+        # Core inserts bypass the Session listeners: rebuild the matching index on next use
+        matching_engine.reset()
+
 @app.get("/api/jobs/{job_id}", response_model=schemas.Job)
-def read_job(job_id: int = Path(..., title="The ID of the job to get"), db: Session = Depends(get_db)):
+def read_job(
+    job_id: int = Path(..., title="The ID of the job to get"),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    key = ("job", job_id)
+    entry = job_cache.get(key)
+    if entry is not None:
+        return cached_json_response(entry, if_none_match)
+    generation = job_cache.generation
+    
     # Authentication requirement removed as per instruction
     db_job = db.query(models.Job).filter(models.Job.id == job_id).first()
     if db_job is None:
         raise HTTPException(status_code=404, detail="Job not found")
-    return db_job
+    
+    entry = job_cache.set(key, schemas.Job.model_validate(db_job).model_dump_json(), generation=generation)
+    return cached_json_response(entry, if_none_match)
 
 @app.put("/api/jobs/{job_id}", response_model=schemas.Job)
 def update_job(job_id: int, job: schemas.JobUpdate, db: Session = Depends(get_db)):
@@ -462,6 +710,8 @@ def update_job(job_id: int, job: schemas.JobUpdate, db: Session = Depends(get_db
     if db_job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
+    previous = job_cache_snapshot(db_job)
+    
     # Update job fields
     update_data = job.model_dump(exclude_unset=True)
     for key, value in update_data.items():
@@ -469,6 +719,7 @@ def update_job(job_id: int, job: schemas.JobUpdate, db: Session = Depends(get_db
     
     db.commit()
     db.refresh(db_job)
+    invalidate_job_cache(previous, job_cache_snapshot(db_job))
     return db_job
 
 @app.delete("/api/jobs/{job_id}", response_model=dict)
@@ -478,23 +729,115 @@ def delete_job(job_id: int, db: Session = Depends(get_db)):
     if db_job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
+    previous = job_cache_snapshot(db_job)
     db.delete(db_job)
     db.commit()
+    invalidate_job_cache(previous)
     
     return {"success": True}
 
+# Matching endpoints: scores come from the in-memory term index of app.matching
+@app.get("/api/jobs/{job_id}/ranked-candidates", response_model=List[schemas.CandidateMatch])
+def rank_job_candidates(job_id: int, limit: int = Query(20, ge=1, le=500), db: Session = Depends(get_db)):
+    ranked = matching_engine.rank_candidates(job_id, limit)
+    if ranked is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    names = dict(
+        db.query(models.User.id, models.User.name)
+        .filter(models.User.id.in_([candidate_id for candidate_id, _, _ in ranked]))
+    ) if ranked else {}
+    return [
+        {"candidate_id": candidate_id, "name": names.get(candidate_id), "score": round(score, 4), "matched_skills": skills}
+        for candidate_id, score, skills in ranked
+    ]
+
+# Candidate search: skills filters served by the GIN indexes of migration 0009
+MAX_SEARCH_SKILLS = 20
+
+@app.get("/api/candidates/search", response_model=List[schemas.CandidateSearchResult])
+def search_candidates(
+    skills: List[str] = Query([], description="Skills to look for, e.g. ?skills=python&skills=sql"),
+    mode: schemas.SkillMatchMode = schemas.SkillMatchMode.all,
+    field: schemas.SkillSearchField = schemas.SkillSearchField.skills,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    terms = list(dict.fromkeys(skill.strip() for skill in skills if skill.strip()))
+    if not terms:
+        raise HTTPException(status_code=400, detail="At least one skill is required")
+    if len(terms) > MAX_SEARCH_SKILLS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SEARCH_SKILLS} skills can be searched at once")
+    
+    if field == schemas.SkillSearchField.both:
+        columns = [models.CandidateProfile.skills, models.CandidateProfile.preferred_positions]
+    else:
+        columns = [getattr(models.CandidateProfile, field.value)]
+    
+    # Case and accent insensitive: terms and array elements are normalized in SQL
+    match_count = array_match_count(columns, terms).label("match_count")
+    rows = (
+        db.query(
+            models.CandidateProfile.user_id.label("candidate_id"),
+            models.User.name,
+            models.CandidateProfile.skills,
+            models.CandidateProfile.preferred_positions,
+            match_count
+        )
+        .outerjoin(models.User, models.User.id == models.CandidateProfile.user_id)
+        .filter(array_match(columns, terms, mode == schemas.SkillMatchMode.all))
+        .order_by(match_count.desc(), models.CandidateProfile.user_id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return rows
+
+@app.get("/api/candidates/{candidate_id}/recommended-jobs", response_model=List[schemas.JobMatch])
+def recommend_candidate_jobs(candidate_id: int, limit: int = Query(20, ge=1, le=500), db: Session = Depends(get_db)):
+    recommended = matching_engine.recommend_jobs(candidate_id, limit)
+    if recommended is None:
+        raise HTTPException(status_code=404, detail="Candidate profile not found")
+    
+    jobs = {
+        job.id: job
+        for job in db.query(models.Job.id, models.Job.title, models.Job.company)
+        .filter(models.Job.id.in_([job_id for job_id, _, _ in recommended]))
+    } if recommended else {}
+    return [
+        {"job_id": job_id, "title": jobs[job_id].title, "company": jobs[job_id].company, "score": round(score, 4), "matched_skills": skills}
+        for job_id, score, skills in recommended
+        if job_id in jobs
+    ]
+
 # Job Application endpoints
+# Fields computed by enrich_applications, and the columns it reads to compute them
+APPLICATION_ENRICHED_FIELDS = {"job_title", "company", "interview_id"}
+APPLICATION_ENRICHMENT_COLUMNS = {"job_id", "candidate_id", "status", "interview_at"}
+
 @app.get("/api/applications/", response_model=List[schemas.JobApplication])
 def read_applications(
+    response: Response,
     candidate_id: Optional[int] = None,
     job_id: Optional[int] = None,
     status: Optional[schemas.ApplicationStatus] = None,
     skip: int = 0, 
     limit: int = 100, 
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,status,job_title"),
     db: Session = Depends(get_db),
     authorization: str = Header(None)
 ):
-    query = db.query(models.JobApplication)
+    # Sparse fieldset: only the requested columns are read and returned
+    fieldset = parse_fields(fields, schemas.JobApplication)
+    schema = get_partial_schema(schemas.JobApplication, fieldset)
+    enriched = fieldset is None or not fieldset.isdisjoint(APPLICATION_ENRICHED_FIELDS)
+    
+    # Plain rows of the columns the response needs, serialized in bulk below
+    query = db.query(*select_columns(
+        models.JobApplication, schema, APPLICATION_ENRICHMENT_COLUMNS if enriched else ()
+    ))
     
     # Apply candidate_id filter if provided
     if candidate_id:
@@ -507,36 +850,77 @@ def read_applications(
     if status:
         query = query.filter(models.JobApplication.status == status)
     
-    # Apply pagination
-    applications = query.offset(skip).limit(limit).all()
-    
+    if cursor is not None:
+        # Cursor mode: keyset pagination on id
+        rows = paginate_keyset(
+            query, response, cursor, limit, models.JobApplication.id, models.JobApplication.id
+        )
+    else:
+        # Apply pagination
+        rows = query.offset(skip).limit(limit).all()
+
+    if enriched:
+        # Rows are read-only: copy them to objects enrich_applications can annotate
+        rows = [SimpleNamespace(**row._mapping) for row in rows]
+        enrich_applications(rows, db)
+
+    return serialize_list(schema, rows, response)
+
+def enrich_applications(applications: List[models.JobApplication], db: Session) -> None:
+    """
+    Attach job_title, company and interview_id to a page of applications.
+
+    The page is enriched with at most two extra queries, whatever its size:
+    one batched load of the referenced jobs and one for the upcoming interviews.
+    """
+    if not applications:
+        return
+
     # Enrichir les candidatures avec les informations des offres d'emploi
+    job_ids = {app.job_id for app in applications}
+    jobs = {
+        job.id: job
+        for job in db.query(models.Job.id, models.Job.title, models.Job.company)
+        .filter(models.Job.id.in_(job_ids))
+    }
     for app in applications:
-        # Récupérer les informations de l'offre d'emploi associée
-        job = db.query(models.Job).filter(models.Job.id == app.job_id).first()
+        job = jobs.get(app.job_id)
         if job:
             app.job_title = job.title
             app.company = job.company
-    
+
     # Check for upcoming interviews for all applications
     now = datetime.now()
+    upcoming = []
     for app in applications:
         # If interview is scheduled and within 24 hours, add interview link
         if app.interview_at and app.status == models.ApplicationStatus.interview:
             time_diff = app.interview_at - now
             # If interview is within 24 hours or already started but not more than 1 hour ago
             if time_diff.total_seconds() < 86400 and time_diff.total_seconds() > -3600:
-                # Get interview details
-                interview = db.query(models.Interview).filter(
-                    models.Interview.candidate_id == app.candidate_id,
-                    models.Interview.date == app.interview_at
-                ).first()
-                
-                if interview:
-                    # Add interview ID to the application for frontend to create link
-                    app.interview_id = interview.id
-    
-    return applications
+                upcoming.append(app)
+
+    if not upcoming:
+        return
+
+    # Get interview details for every upcoming (candidate_id, date) pair at once
+    keys = {(app.candidate_id, app.interview_at) for app in upcoming}
+    interviews = (
+        db.query(models.Interview.id, models.Interview.candidate_id, models.Interview.date)
+        .filter(tuple_(models.Interview.candidate_id, models.Interview.date).in_(list(keys)))
+        .order_by(models.Interview.id)
+        .all()
+    )
+    interview_ids = {}
+    for interview in interviews:
+        # Keep the first match, as the former per-row .first() lookup did
+        interview_ids.setdefault((interview.candidate_id, interview.date), interview.id)
+
+    for app in upcoming:
+        interview_id = interview_ids.get((app.candidate_id, app.interview_at))
+        if interview_id:
+            # Add interview ID to the application for frontend to create link
+            app.interview_id = interview_id
 
 @app.post("/api/applications/", response_model=schemas.JobApplication, status_code=status.HTTP_201_CREATED)
 def create_application(application: schemas.JobApplicationCreate, db: Session = Depends(get_db)):
@@ -590,6 +974,43 @@ def read_application(application_id: int, db: Session = Depends(get_db)):
     
     return db_application
 
+# Cached responses a change of application status may make stale, dropped by both status update paths
+def invalidate_application_caches() -> None:
+    user_stats_cache.invalidate()
+
+# Bulk status transition: one set-based UPDATE ... RETURNING for the whole selection
+@app.post("/api/applications/bulk-status", response_model=List[schemas.JobApplication])
+def update_applications_status(transition: schemas.JobApplicationBulkStatusUpdate, db: Session = Depends(get_db)):
+    if transition.ids is None and transition.job_id is None:
+        raise HTTPException(status_code=400, detail="Provide application ids or a job_id to select applications")
+    if transition.ids is not None and not transition.ids:
+        return []
+    
+    table = models.JobApplication.__table__
+    conditions = [table.c.status != transition.status]
+    if transition.ids is not None:
+        conditions.append(table.c.id.in_(transition.ids))
+    if transition.job_id is not None:
+        conditions.append(table.c.job_id == transition.job_id)
+    if transition.current_status is not None:
+        conditions.append(table.c.status == transition.current_status)
+    if transition.score_below is not None:
+        conditions.append(table.c.score < transition.score_below)
+    
+    # Rows locked by a concurrent update are re-checked against the conditions
+    # once it commits, so an application it moved elsewhere is left untouched
+    rows = db.execute(
+        update(table)
+        .where(*conditions)
+        .values(status=transition.status)
+        .returning(*table.c)
+    ).all()
+    db.commit()
+    if rows:
+        invalidate_application_caches()
+    
+    return sorted((dict(row._mapping) for row in rows), key=lambda row: row["id"])
+
 @app.put("/api/applications/{application_id}", response_model=schemas.JobApplication)
 def update_application(application_id: int, application: schemas.JobApplicationUpdate, db: Session = Depends(get_db)):
     # Authentication requirement removed as per instruction
@@ -603,6 +1024,8 @@ def update_application(application_id: int, application: schemas.JobApplicationU
         setattr(db_application, key, value)
     
     db.commit()
+    if "status" in update_data:
+        invalidate_application_caches()
     db.refresh(db_application)
     return db_application
 
@@ -624,7 +1047,7 @@ async def upload_file(
     file: UploadFile = File(...),
     type: str = Form(...),
     candidate_id: int = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Validate file type
     if not file.content_type.startswith('application/'):
@@ -641,14 +1064,10 @@ async def upload_file(
             detail="File must be a PDF, DOC or DOCX document"
         )
     
-    # Verify file size (max 5MB)
-    max_size = 5 * 1024 * 1024  # 5MB
-    file_size = 0
-    
     # Store file in database
     try:
-        # Store file in PostgreSQL
-        url = await file_storage.store_file(file, type, candidate_id, db)
+        # Store file in PostgreSQL, streamed in chunks and limited to 5MB
+        url = await file_storage.store_file(file, type, candidate_id, db, max_size=file_storage.MAX_FILE_SIZE)
         file_type_display = "CV" if type == "cv" else "Lettre de motivation"
         
         return {
@@ -670,10 +1089,14 @@ async def upload_file(
 @app.get("/api/files/{file_uuid}")
 async def get_file(
     file_uuid: str,
-    db: Session = Depends(get_db)
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # Retrieve file from database
-    db_file = file_storage.get_file_by_uuid(file_uuid, db)
+    # Retrieve file metadata from database, the content is streamed below
+    db_file = await file_storage.get_file_by_uuid(file_uuid, db)
     
     if not db_file:
         raise HTTPException(
@@ -681,23 +1104,70 @@ async def get_file(
             detail="File not found"
         )
     
-    # Return file as streaming response
+    headers = file_storage.get_file_headers(db_file)
+    
+    # The client copy is still current: don't read the content at all
+    if file_storage.is_not_modified(db_file, if_none_match, if_modified_since):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    # Empty files have no satisfiable range
+    if db_file.file_size == 0:
+        return Response(content=b"", media_type=db_file.content_type, headers=headers)
+    
+    # A range is only valid for the representation named by If-Range
+    if if_range and not file_storage.etag_matches(if_range, headers["ETag"]):
+        range_header = None
+    
+    byte_range = file_storage.parse_byte_range(range_header, db_file.file_size)
+    
+    # Whole files kept on the local filesystem are sent without passing through Python
+    local_path = file_storage.get_local_path(db_file)
+    if byte_range is None and local_path is not None:
+        return FileResponse(local_path, media_type=db_file.content_type, headers=headers)
+    
+    if byte_range is None:
+        start, end = 0, db_file.file_size - 1
+        status_code = status.HTTP_200_OK
+    else:
+        start, end = byte_range
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end}/{db_file.file_size}"
+    headers["Content-Length"] = str(end - start + 1)
+    
+    # Return file as streaming response, read from its storage backend chunk by chunk
     return StreamingResponse(
-        io.BytesIO(db_file.file_data),
+        file_storage.iter_file_range(db_file, db, start, end),
+        status_code=status_code,
         media_type=db_file.content_type,
-        headers={
-            "Content-Disposition": f"attachment; filename={db_file.filename}"
-        }
+        headers=headers
     )
 
+# File metadata endpoint: size and type without reading the content
+@app.head("/api/files/{file_uuid}")
+async def head_file(
+    file_uuid: str,
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_file = await file_storage.get_file_by_uuid(file_uuid, db)
+    
+    if not db_file:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
+        )
+    
+    headers = file_storage.get_file_headers(db_file)
+    headers["Content-Length"] = str(db_file.file_size)
+    return Response(media_type=db_file.content_type, headers=headers)
+
 # Delete file endpoint
 @app.delete("/api/files/{file_uuid}", response_model=dict)
 async def delete_file(
     file_uuid: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Delete file from database
-    success = file_storage.delete_file(file_uuid, db)
+    success = await file_storage.delete_file(file_uuid, db)
     
     if not success:
         raise HTTPException(
@@ -713,22 +1183,39 @@ async def upload_to_drive(
     file: UploadFile = File(...),
     type: str = Form(...),
     candidate_id: int = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Redirect to new endpoint
     return await upload_file(file, type, candidate_id, db)
 
 # Interview endpoints
+# JSONB documents written by the AI scorer, patchable with json_patch
+INTERVIEW_ANALYSIS_COLUMNS = (
+    "questions",
+    "detailed_scores",
+    "question_by_question_analysis",
+    "overall_assessment",
+    "interview_summary",
+)
+
 @app.get("/api/interviews/", response_model=List[schemas.Interview])
 def read_interviews(
+    response: Response,
     candidate_id: Optional[int] = None,
     status: Optional[schemas.InterviewStatus] = None,
     skip: int = 0, 
     limit: int = 100, 
+    cursor: Optional[str] = None,
+    assessment_contains: Optional[str] = Query(None, description='JSON the overall assessment must contain, e.g. {"skills": ["Python"]}'),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,position,date,status"),
     db: Session = Depends(get_db)
 ):
     # Authentication requirement removed as per instruction
-    query = db.query(models.Interview)
+    # Sparse fieldset: only the requested columns are read and returned
+    schema = get_partial_schema(schemas.Interview, parse_fields(fields, schemas.Interview))
+    
+    # Plain rows of the columns the response needs, serialized in bulk below
+    query = db.query(*select_columns(models.Interview, schema))
     
     # Apply filters
     if candidate_id:
@@ -737,9 +1224,21 @@ def read_interviews(
     if status:
         query = query.filter(models.Interview.status == status)
     
-    # Apply pagination
-    interviews = query.offset(skip).limit(limit).all()
-    return interviews
+    # Containment (@>) is served by the GIN index on overall_assessment
+    if assessment_contains:
+        try:
+            query = query.filter(models.Interview.overall_assessment.contains(json.loads(assessment_contains)))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="assessment_contains must be a JSON document")
+    
+    # Cursor mode: keyset pagination on id
+    if cursor is not None:
+        interviews = paginate_keyset(query, response, cursor, limit, models.Interview.id, models.Interview.id)
+    else:
+        # Apply pagination
+        interviews = query.offset(skip).limit(limit).all()
+    
+    return serialize_list(schema, interviews, response)
 
 @app.post("/api/interviews/", response_model=schemas.Interview, status_code=status.HTTP_201_CREATED)
 def create_interview(interview: schemas.InterviewCreate, db: Session = Depends(get_db)):
@@ -797,6 +1296,36 @@ def patch_interview(interview_id: int, interview: schemas.InterviewPatch, db: Se
     db.refresh(db_interview)
     return db_interview
 
+# Partial update of the analysis documents, applied server-side with jsonb_set
+@app.patch("/api/interviews/{interview_id}/analysis", response_model=schemas.Interview)
+def patch_interview_analysis(interview_id: int, operations: List[schemas.JsonPatchOperation], db: Session = Depends(get_db)):
+    if not operations:
+        raise HTTPException(status_code=400, detail="No patch operation provided")
+    
+    table = models.Interview.__table__
+    statements = json_patch.build_patch_statements(
+        table, table.c.id == interview_id, operations, INTERVIEW_ANALYSIS_COLUMNS
+    )
+    try:
+        # Lock the row, so every operation applies to the documents left by the previous one
+        if db.execute(select(table.c.id).where(table.c.id == interview_id).with_for_update()).first() is None:
+            raise HTTPException(status_code=404, detail="Interview not found")
+        for operation, statement in zip(operations, statements):
+            row = db.execute(statement).first()
+            if row is None:
+                # The whole patch is atomic (RFC 6902)
+                db.rollback()
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Patch could not be applied: {operation.op} '{operation.path}', the location does not exist"
+                )
+        db.commit()
+    except DBAPIError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Patch could not be applied: {str(e.orig)}")
+    
+    return dict(row._mapping)
+
 @app.delete("/api/interviews/{interview_id}", response_model=dict)
 def delete_interview(interview_id: int, db: Session = Depends(get_db)):
     # Authentication requirement removed as per instruction
@@ -814,9 +1343,11 @@ def delete_interview(interview_id: int, db: Session = Depends(get_db)):
 # Message endpoints
 @app.get("/api/messages/", response_model=List[schemas.Message])
 def read_messages(
+    response: Response,
     interview_id: Optional[int] = None,
     skip: int = 0, 
     limit: int = 100, 
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     query = db.query(models.Message)
@@ -825,6 +1356,15 @@ def read_messages(
     if interview_id:
         query = query.filter(models.Message.interview_id == interview_id)
     
+    # Cursor mode: keyset pagination on (timestamp, id)
+    if cursor is not None:
+        return paginate_keyset(
+            query, response, cursor, limit,
+            sort_column=models.Message.timestamp,
+            id_column=models.Message.id,
+            sort_key="timestamp",
+        )
+    
     # Apply pagination and ordering by timestamp
     messages = query.order_by(models.Message.timestamp).offset(skip).limit(limit).all()
     return messages
@@ -844,6 +1384,83 @@ def create_message(message: schemas.MessageCreate, db: Session = Depends(get_db)
     
     return db_message
 
+# Batch append of interview turns: one existence check and one multi-row INSERT
+@app.post("/api/interviews/{interview_id}/messages:batch", response_model=List[schemas.Message], status_code=status.HTTP_201_CREATED)
+def create_messages_batch(interview_id: int, batch: schemas.MessageBatchCreate, db: Session = Depends(get_db)):
+    # Verify interview exists
+    interview_exists = db.query(
+        db.query(models.Interview.id).filter(models.Interview.id == interview_id).exists()
+    ).scalar()
+    if not interview_exists:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    
+    # Messages keep the order of the batch: they share a timestamp and ids are increasing
+    table = models.Message.__table__
+    rows = db.execute(
+        table.insert()
+        .values([{"interview_id": interview_id, **message.model_dump()} for message in batch.messages])
+        .returning(*table.c)
+    ).all()
+    db.commit()
+    if rows:
+        invalidate_application_caches()
+    
+    return sorted((dict(row._mapping) for row in rows), key=lambda row: row["id"])
+
+# Live interview channel: pushes committed messages and accepts new turns
+@app.websocket("/ws/interviews/{interview_id}")
+async def interview_channel(websocket: WebSocket, interview_id: int, after_id: int = 0):
+    async with AsyncSessionLocal() as db:
+        interview = await db.get(models.Interview, interview_id)
+    if interview is None:
+        await websocket.close(code=4404)
+        return
+    
+    await websocket.accept()
+    new_messages = message_hub.subscribe(interview_id)
+    
+    async def push_messages():
+        last_id = after_id
+        while True:
+            # Clear before reading so a message committed meanwhile wakes us up again
+            new_messages.clear()
+            messages = await fetch_messages_after(interview_id, last_id)
+            for message in messages:
+                await websocket.send_json({
+                    "event": "message",
+                    "data": schemas.Message.model_validate(message).model_dump(mode="json"),
+                })
+                last_id = message.id
+            if not messages:
+                await new_messages.wait()
+    
+    async def receive_turns():
+        while True:
+            payload = await websocket.receive_text()
+            try:
+                turn = schemas.MessageBatchItem.model_validate_json(payload)
+            except ValidationError as e:
+                await websocket.send_json({"event": "error", "detail": e.errors(include_url=False, include_context=False)})
+                continue
+            # Sent back to every connection, the sender included, by push_messages
+            async with AsyncSessionLocal() as db:
+                db.add(models.Message(interview_id=interview_id, **turn.model_dump()))
+                await db.commit()
+    
+    tasks = [asyncio.ensure_future(push_messages()), asyncio.ensure_future(receive_turns())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        message_hub.unsubscribe(interview_id, new_messages)
+        if websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.close()
+
 @app.get("/api/messages/{message_id}", response_model=schemas.Message)
 def read_message(message_id: int, db: Session = Depends(get_db)):
     db_message = db.query(models.Message).filter(models.Message.id == message_id).first()
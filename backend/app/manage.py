@@ -0,0 +1,340 @@
+"""
+Administrative commands of the Recruitment AI Platform backend.
+
+Run from the backend directory:
+
+    python -m app.manage migrate-storage --to local --batch-size 50
+    python -m app.manage reconcile-counters --batch-size 500 --dry-run
+    python -m app.manage analysis-worker --workers 4 --pool process
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import sys
+import time
+
+from sqlalchemy import bindparam, distinct, func, select, update
+
+from . import analysis, models
+from .database import AsyncSessionLocal
+from .file_storage import FileBlob, FileStorage, acquire_blob, iter_file_range
+from .storage_backends import BACKENDS, get_backend
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def migrate_storage(target: str, batch_size: int) -> dict:
+    """
+    Move stored file contents to another storage backend, in batches.
+
+    Files still held in file_storage.file_data are hashed and turned into
+    blobs on the target backend, then blobs living on any other backend are
+    copied to the target and removed from their source. Each batch is one
+    transaction, so the command can be interrupted and run again.
+
+    Downloads of a blob that is being moved may fail: run it when traffic is low.
+
+    Args:
+        target: Name of the destination backend
+        batch_size: Number of rows moved per transaction
+
+    Returns:
+        Number of inline files and blobs moved
+    """
+    backend = get_backend(target)
+    moved_files = 0
+    moved_blobs = 0
+
+    # Inline files: one blob per distinct content on the target backend
+    last_id = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            files = (await db.execute(
+                select(FileStorage)
+                .where(FileStorage.is_inline, FileStorage.id > last_id)
+                .order_by(FileStorage.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )).scalars().all()
+            if not files:
+                break
+
+            for db_file in files:
+                digest = hashlib.sha256()
+                async for part in iter_file_range(db_file, db, 0, db_file.file_size - 1):
+                    digest.update(part)
+
+                blob_id, created = await acquire_blob(db, digest.hexdigest(), db_file.file_size, backend)
+                if created:
+                    writer = await backend.open_writer(blob_id, digest.hexdigest(), db)
+                    try:
+                        async for part in iter_file_range(db_file, db, 0, db_file.file_size - 1):
+                            await writer.write(part)
+                        await writer.close()
+                    except Exception:
+                        await writer.abort()
+                        raise
+
+                db_file.blob_id = blob_id
+                db_file.file_data = None
+                last_id = db_file.id
+
+            await db.commit()
+            moved_files += len(files)
+            logger.info(f"Moved {moved_files} inline files to '{target}'")
+
+    # Blobs stored on another backend
+    last_id = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            blobs = (await db.execute(
+                select(FileBlob)
+                .where(FileBlob.backend != target, FileBlob.id > last_id)
+                .order_by(FileBlob.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )).scalars().all()
+            if not blobs:
+                break
+
+            for blob in blobs:
+                source = get_backend(blob.backend)
+                writer = await backend.open_writer(blob.id, blob.sha256, db)
+                try:
+                    async for part in source.iter_range(blob.id, blob.sha256, 0, blob.size - 1, db):
+                        await writer.write(part)
+                    await writer.close()
+                except Exception:
+                    await writer.abort()
+                    raise
+
+                await source.delete(blob.id, blob.sha256, db)
+                blob.backend = target
+                last_id = blob.id
+
+            await db.commit()
+            moved_blobs += len(blobs)
+            logger.info(f"Moved {moved_blobs} blobs to '{target}'")
+
+    return {"files": moved_files, "blobs": moved_blobs}
+
+
+# Average scores closer than this are not reported as drift
+SCORE_TOLERANCE = 1e-6
+
+
+def counter_drifts(profile, expected: dict, fields) -> dict:
+    """Fields of a profile whose stored counter differs from the expected value."""
+    drifts = {}
+    for field in fields:
+        stored = getattr(profile, field)
+        value = expected.get(field)
+        if isinstance(value, float) or isinstance(stored, float):
+            drifted = (stored is None) != (value is None) or (
+                value is not None and abs(stored - value) > SCORE_TOLERANCE
+            )
+        else:
+            drifted = stored != value
+        if drifted:
+            drifts[field] = value
+    return drifts
+
+
+async def expected_candidate_counters(db, user_ids) -> dict:
+    """Counters of candidate profiles computed from their applications and interviews."""
+    expected = {user_id: {"applied_jobs": 0, "completed_interviews": 0, "average_score": None} for user_id in user_ids}
+
+    applied = await db.execute(
+        select(models.JobApplication.candidate_id, func.count())
+        .where(models.JobApplication.candidate_id.in_(user_ids))
+        .group_by(models.JobApplication.candidate_id)
+    )
+    for user_id, count in applied:
+        expected[user_id]["applied_jobs"] = count
+
+    interviews = await db.execute(
+        select(models.Interview.candidate_id, func.count(), func.avg(models.Interview.score))
+        .where(
+            models.Interview.candidate_id.in_(user_ids),
+            models.Interview.status == models.InterviewStatus.completed
+        )
+        .group_by(models.Interview.candidate_id)
+    )
+    for user_id, count, average in interviews:
+        expected[user_id]["completed_interviews"] = count
+        expected[user_id]["average_score"] = float(average) if average is not None else None
+
+    return expected
+
+
+async def expected_recruiter_counters(db, user_ids) -> dict:
+    """Counters of recruiter profiles computed from the applications and interviews of their jobs."""
+    expected = {user_id: {"assigned_candidates": 0, "completed_interviews": 0} for user_id in user_ids}
+
+    assigned = await db.execute(
+        select(models.Job.recruiter_id, func.count(distinct(models.JobApplication.candidate_id)))
+        .join(models.Job, models.Job.id == models.JobApplication.job_id)
+        .where(models.Job.recruiter_id.in_(user_ids))
+        .group_by(models.Job.recruiter_id)
+    )
+    for user_id, count in assigned:
+        expected[user_id]["assigned_candidates"] = count
+
+    completed = await db.execute(
+        select(models.Job.recruiter_id, func.count(models.Interview.id))
+        .select_from(models.Interview)
+        .join(models.JobApplication, models.JobApplication.id == models.Interview.application_id)
+        .join(models.Job, models.Job.id == models.JobApplication.job_id)
+        .where(
+            models.Job.recruiter_id.in_(user_ids),
+            models.Interview.status == models.InterviewStatus.completed
+        )
+        .group_by(models.Job.recruiter_id)
+    )
+    for user_id, count in completed:
+        expected[user_id]["completed_interviews"] = count
+
+    return expected
+
+
+async def reconcile_profiles(model, compute_expected, fields, batch_size: int, dry_run: bool) -> dict:
+    """
+    Rebuild the counters of one profile table, in batches of profiles.
+
+    The profiles of a batch are locked before their counters are computed,
+    so triggers of concurrent transactions wait for the batch to commit and
+    then apply their change on top of the rebuilt value.
+
+    Returns:
+        Number of profiles checked, of drifted profiles, and of drifts per field
+    """
+    table = model.__table__
+    fixes = update(table).where(table.c.id == bindparam("profile_id"))
+    report = {"profiles": 0, "drifted": 0, "fields": {field: 0 for field in fields}}
+
+    last_id = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            profiles = (await db.execute(
+                select(model.id, model.user_id, *(getattr(model, field) for field in fields))
+                .where(model.id > last_id)
+                .order_by(model.id)
+                .limit(batch_size)
+                .with_for_update()
+            )).all()
+            if not profiles:
+                break
+
+            expected = await compute_expected(db, [profile.user_id for profile in profiles])
+            changes = []
+            for profile in profiles:
+                drifts = counter_drifts(profile, expected[profile.user_id], fields)
+                if drifts:
+                    logger.info(
+                        f"{table.name} {profile.id} (user {profile.user_id}): "
+                        + ", ".join(f"{field} {getattr(profile, field)} -> {value}" for field, value in drifts.items())
+                    )
+                    for field in drifts:
+                        report["fields"][field] += 1
+                    changes.append({"profile_id": profile.id, **expected[profile.user_id]})
+
+            if changes and not dry_run:
+                await db.execute(fixes.values({field: bindparam(field) for field in fields}), changes)
+                await db.commit()
+
+            report["profiles"] += len(profiles)
+            report["drifted"] += len(changes)
+            last_id = profiles[-1].id
+
+    return report
+
+
+async def reconcile_counters(batch_size: int, dry_run: bool = False) -> dict:
+    """
+    Rebuild the counters of candidate and recruiter profiles and report drift.
+
+    Counters are maintained by the triggers of migration 0010. They can
+    drift when rows are changed with those triggers disabled, or for
+    profiles created after the rows they count.
+
+    Args:
+        batch_size: Number of profiles reconciled per transaction
+        dry_run: Only report the drift, without fixing it
+
+    Returns:
+        Reconciliation report of each profile table
+    """
+    return {
+        "candidate_profiles": await reconcile_profiles(
+            models.CandidateProfile, expected_candidate_counters,
+            ("applied_jobs", "completed_interviews", "average_score"), batch_size, dry_run
+        ),
+        "recruiter_profiles": await reconcile_profiles(
+            models.RecruiterProfile, expected_recruiter_counters,
+            ("assigned_candidates", "completed_interviews"), batch_size, dry_run
+        ),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.manage", description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate = commands.add_parser("migrate-storage", help="Move stored files to another storage backend")
+    migrate.add_argument("--to", dest="target", required=True, choices=sorted(BACKENDS))
+    migrate.add_argument("--batch-size", type=int, default=50)
+
+    reconcile = commands.add_parser("reconcile-counters", help="Rebuild the profile counters and report drift")
+    reconcile.add_argument("--batch-size", type=int, default=500)
+    reconcile.add_argument("--dry-run", action="store_true", help="Report the drift without fixing it")
+
+    worker = commands.add_parser("analysis-worker", help="Analyze the queued applications")
+    worker.add_argument("--workers", type=int, default=analysis.ANALYSIS_WORKERS)
+    worker.add_argument("--pool", choices=("process", "thread"), default=analysis.ANALYSIS_POOL)
+    worker.add_argument("--batch-size", type=int, default=analysis.ANALYSIS_BATCH_SIZE)
+    worker.add_argument("--max-in-flight", type=int, default=analysis.ANALYSIS_MAX_IN_FLIGHT)
+    worker.add_argument("--scorer", default=analysis.ANALYSIS_SCORER, help="Scorer function, as module:function")
+    worker.add_argument("--once", action="store_true", help="Stop when the queue is empty")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate-storage":
+        result = asyncio.run(migrate_storage(args.target, args.batch_size))
+        logger.info(f"Storage migration done: {result['files']} inline files and {result['blobs']} blobs moved")
+
+    if args.command == "reconcile-counters":
+        result = asyncio.run(reconcile_counters(args.batch_size, args.dry_run))
+        for table, report in result.items():
+            fields = ", ".join(f"{field}: {count}" for field, count in report["fields"].items())
+            logger.info(
+                f"{table}: {report['drifted']} of {report['profiles']} profiles drifted ({fields})"
+                + (" - not fixed (dry run)" if args.dry_run else "")
+            )
+
+    if args.command == "analysis-worker":
+        pool = analysis.AnalysisWorkerPool(
+            workers=args.workers,
+            pool=args.pool,
+            batch_size=args.batch_size,
+            max_in_flight=args.max_in_flight,
+            scorer=args.scorer,
+        )
+        started = time.monotonic()
+        try:
+            result = asyncio.run(pool.run(once=args.once))
+        except KeyboardInterrupt:
+            result = dict(pool.stats)
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"Analysis worker stopped: {result['analyzed']} applications analyzed "
+            f"({result['analyzed'] * 60 / elapsed:.1f}/min), {result['failed']} failed, {result['retried']} retried"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
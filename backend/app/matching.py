@@ -0,0 +1,183 @@
+"""
+Candidate–job matching engine.
+
+Candidates and jobs are held in the sparse term index of
+app.matching_index, which defines the terms and the scores. The index is
+loaded lazily from the database, then kept up to date by Session listeners
+when profiles and jobs are committed.
+"""
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple
+import threading
+import logging
+
+from . import models
+from .database import SessionLocal
+from .matching_index import MatchingIndex
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Rows loaded from the database per batch
+LOAD_BATCH_SIZE = 5000
+
+# Session.info key of the profile and job changes applied on commit
+PENDING_CHANGES_KEY = "matching_pending_changes"
+
+
+def candidate_values(skills: Optional[List[str]], positions: Optional[List[str]]) -> List[str]:
+    """Texts of the terms of a candidate profile."""
+    return (skills or []) + (positions or [])
+
+
+def job_texts(title: Optional[str], requirements: Optional[List[str]], responsibilities: Optional[List[str]]) -> List[str]:
+    """Texts of the terms of a job."""
+    return [title or ""] + (requirements or []) + (responsibilities or [])
+
+
+class MatchingEngine:
+    """Thread-safe MatchingIndex of the candidate profiles and jobs of the database"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.loaded = False
+        self.index = MatchingIndex()
+
+    def reset(self) -> None:
+        """Drop the index; it is rebuilt from the database on next use."""
+        with self._lock:
+            self.loaded = False
+            self.index = MatchingIndex()
+
+    # Updates
+
+    def _set_candidate(self, candidate_id: int, skills: Optional[List[str]], positions: Optional[List[str]]) -> None:
+        self.index.set_candidate(candidate_id, candidate_values(skills, positions))
+
+    def _set_job(self, job_id: int, title: str, requirements: Optional[List[str]], responsibilities: Optional[List[str]]) -> None:
+        self.index.set_job(job_id, job_texts(title, requirements, responsibilities))
+
+    def update_candidate(self, candidate_id: int, skills: Optional[List[str]], positions: Optional[List[str]]) -> None:
+        with self._lock:
+            if self.loaded:
+                self._set_candidate(candidate_id, skills, positions)
+
+    def remove_candidate(self, candidate_id: int) -> None:
+        with self._lock:
+            self.index.remove_candidate(candidate_id)
+
+    def update_job(self, job_id: int, title: str, requirements: Optional[List[str]], responsibilities: Optional[List[str]]) -> None:
+        with self._lock:
+            if self.loaded:
+                self._set_job(job_id, title, requirements, responsibilities)
+
+    def remove_job(self, job_id: int) -> None:
+        with self._lock:
+            self.index.remove_job(job_id)
+
+    def ensure_loaded(self) -> None:
+        """Build the index from the database on first use."""
+        if self.loaded:
+            return
+        with self._lock:
+            if self.loaded:
+                return
+            self.index = MatchingIndex()
+            db = SessionLocal()
+            try:
+                # One index call per batch, which merges each term column once
+                profiles = iter(db.query(
+                    models.CandidateProfile.user_id,
+                    models.CandidateProfile.skills,
+                    models.CandidateProfile.preferred_positions
+                ).yield_per(LOAD_BATCH_SIZE))
+                while batch := list(islice(profiles, LOAD_BATCH_SIZE)):
+                    self.index.set_candidates(
+                        (profile.user_id, candidate_values(profile.skills, profile.preferred_positions))
+                        for profile in batch
+                    )
+
+                jobs = iter(db.query(
+                    models.Job.id, models.Job.title, models.Job.requirements, models.Job.responsibilities
+                ).yield_per(LOAD_BATCH_SIZE))
+                while batch := list(islice(jobs, LOAD_BATCH_SIZE)):
+                    self.index.set_jobs(
+                        (job.id, job_texts(job.title, job.requirements, job.responsibilities))
+                        for job in batch
+                    )
+            finally:
+                db.close()
+            self.loaded = True
+            stats = self.index.stats()
+            logger.info(
+                f"Matching index loaded: {stats['candidates']} candidates, {stats['jobs']} jobs, "
+                f"{stats['candidate_terms']} candidate terms"
+            )
+
+    # Scoring
+
+    def rank_candidates(self, job_id: int, limit: int = 20) -> Optional[List[Tuple[int, float, List[str]]]]:
+        """
+        Best candidates for a job.
+
+        Returns:
+            (candidate id, score, matched skills) tuples, or None if the job is unknown
+        """
+        self.ensure_loaded()
+        with self._lock:
+            return self.index.rank_candidates(job_id, limit)
+
+    def recommend_jobs(self, candidate_id: int, limit: int = 20) -> Optional[List[Tuple[int, float, List[str]]]]:
+        """
+        Best jobs for a candidate.
+
+        Returns:
+            (job id, score, matched skills) tuples, or None if the candidate has no profile
+        """
+        self.ensure_loaded()
+        with self._lock:
+            return self.index.recommend_jobs(candidate_id, limit)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"loaded": self.loaded, **self.index.stats()}
+
+
+matching_engine = MatchingEngine()
+
+
+@event.listens_for(Session, "after_flush")
+def record_matching_changes(session: Session, flush_context):
+    changes = session.info.setdefault(PENDING_CHANGES_KEY, [])
+    for instance in list(session.new) + list(session.dirty):
+        if isinstance(instance, models.CandidateProfile):
+            changes.append(("candidate", instance.user_id, (instance.skills, instance.preferred_positions)))
+        elif isinstance(instance, models.Job):
+            changes.append(("job", instance.id, (instance.title, instance.requirements, instance.responsibilities)))
+    for instance in session.deleted:
+        if isinstance(instance, models.CandidateProfile):
+            changes.append(("candidate", instance.user_id, None))
+        elif isinstance(instance, models.Job):
+            changes.append(("job", instance.id, None))
+
+
+@event.listens_for(Session, "after_commit")
+def apply_matching_changes(session: Session):
+    for kind, entity_id, values in session.info.pop(PENDING_CHANGES_KEY, []):
+        if kind == "candidate":
+            if values is None:
+                matching_engine.remove_candidate(entity_id)
+            else:
+                matching_engine.update_candidate(entity_id, *values)
+        elif values is None:
+            matching_engine.remove_job(entity_id)
+        else:
+            matching_engine.update_job(entity_id, *values)
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_matching_changes(session: Session):
+    session.info.pop(PENDING_CHANGES_KEY, None)
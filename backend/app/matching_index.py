@@ -0,0 +1,390 @@
+"""
+Sparse term index of candidates and jobs, scored by app.matching.
+
+Texts are cut into terms: lowercase, accent-free words, split at punctuation
+and at stop-words, so "Maîtrise de React, Node.js" gives "maitrise", "react"
+and "node.js". A candidate has the terms of its skills and preferred
+positions; a job has the terms of its title, requirements and
+responsibilities, from its own text only.
+
+A job term is matched by a candidate term made of some of its consecutive
+words ("react" matches "react native"). The score of a pair is the share of
+the job terms the candidate matches: it depends on the two of them only, not
+on the other candidates or jobs of the index.
+
+Terms are interned into integer ids shared by both sides, and each side is a
+sparse term matrix stored by column: for each term id, a sorted NumPy array
+of the slots of the candidates having it, or of the (job slot, term index)
+keys of the job terms containing it. Memory grows with the postings, not
+with vocabulary x entities as dense bitsets would. A query only reads the
+columns of its terms and counts matches in NumPy arrays of one slot per
+candidate or job; an update inserts into or deletes from the columns of the
+terms it changes, once per batch of entities.
+"""
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import re
+import unicodedata
+
+import numpy as np
+
+# Longest candidate term, in words, searched inside job terms
+MAX_TERM_WORDS = 4
+
+# Bits of the term index in the (job slot, term index) keys of the job columns
+TERM_INDEX_BITS = 20
+TERM_INDEX_MASK = (1 << TERM_INDEX_BITS) - 1
+
+# Column of a term without postings
+EMPTY = np.zeros(0, dtype=np.int64)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#.]+")
+
+# Punctuation ending a term; dots only at the end of a sentence (node.js is a word)
+SEPARATOR_PATTERN = re.compile(r"[,;:/|()\[\]{}!?•\n\t]|\.(?=\s|$)")
+
+# Function words of job texts, French and English; "c" is a language, not an elision
+STOP_WORDS = frozenset("""
+a au aux avec ce ces cet cette d dans de des du en entre et il l la le les leur leurs ou par pour qu que qui
+sa se ses son sur un une vos votre
+an and are as at be by for from in into is of on or our the to we with you your
+""".split())
+
+
+@lru_cache(maxsize=65536)
+def tokenize(text: str) -> Tuple[str, ...]:
+    """Lowercase, accent-free words of a text; '+', '#' and inner dots are kept (c++, c#, node.js)."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return tuple(token.strip(".") for token in TOKEN_PATTERN.findall(text) if token.strip("."))
+
+
+@lru_cache(maxsize=65536)
+def split_terms(text: str) -> Tuple[Tuple[str, ...], ...]:
+    """Terms of a text: runs of words between punctuation and stop-words."""
+    terms = []
+    for piece in SEPARATOR_PATTERN.split(text):
+        term: List[str] = []
+        for token in tokenize(piece):
+            if token not in STOP_WORDS:
+                term.append(token)
+            elif term:
+                terms.append(tuple(term))
+                term = []
+        if term:
+            terms.append(tuple(term))
+    return tuple(terms)
+
+
+class Slots:
+    """
+    Dense positions of entity ids, indexing the per-query NumPy arrays.
+
+    Positions of removed entities are reused; the id array is doubled when
+    full, so adding an entity is amortized O(1).
+    """
+
+    def __init__(self, size: int = 64):
+        self.ids = np.full(size, -1, dtype=np.int64)
+        self.slots: Dict[int, int] = {}
+        self.free: List[int] = list(range(size - 1, -1, -1))
+
+    def add(self, entity_id: int) -> int:
+        slot = self.slots.get(entity_id)
+        if slot is None:
+            if not self.free:
+                size = self.ids.size
+                self.ids = np.concatenate([self.ids, np.full(size, -1, dtype=np.int64)])
+                self.free = list(range(2 * size - 1, size - 1, -1))
+            slot = self.free.pop()
+            self.slots[entity_id] = slot
+            self.ids[slot] = entity_id
+        return slot
+
+    def remove(self, entity_id: int) -> None:
+        slot = self.slots.pop(entity_id, None)
+        if slot is not None:
+            self.ids[slot] = -1
+            self.free.append(slot)
+
+
+class Vocabulary:
+    """
+    Integer ids of the terms of both sides.
+
+    Ids of the terms no candidate or job uses any more are reused, so they
+    stay below the number of terms in use.
+    """
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.terms: List[Optional[str]] = []
+        self.free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def intern(self, term: str) -> int:
+        term_id = self.ids.get(term)
+        if term_id is None:
+            if self.free:
+                term_id = self.free.pop()
+                self.terms[term_id] = term
+            else:
+                term_id = len(self.terms)
+                self.terms.append(term)
+            self.ids[term] = term_id
+        return term_id
+
+    def release(self, term_id: int) -> None:
+        del self.ids[self.terms[term_id]]
+        self.terms[term_id] = None
+        self.free.append(term_id)
+
+
+def insert_sorted(column: np.ndarray, values) -> np.ndarray:
+    """Sorted column with values it doesn't hold yet inserted."""
+    return np.insert(column, column.searchsorted(values), values)
+
+
+def slot_keys(column: np.ndarray, slot: int) -> slice:
+    """Positions of the keys of a job slot in a sorted job column."""
+    start, stop = column.searchsorted([slot << TERM_INDEX_BITS, (slot + 1) << TERM_INDEX_BITS])
+    return slice(start, stop)
+
+
+def top_rows(rows: np.ndarray, keys: Tuple[np.ndarray, ...], limit: int) -> np.ndarray:
+    """
+    Rows with the greatest keys, compared in order, at most limit of them.
+
+    Args:
+        rows: Candidate rows
+        keys: Arrays aligned with rows, the first one decisive, the last one ascending (ids)
+    """
+    if rows.size > limit:
+        # Only rows at least as good as the limit-th on the first key can make it
+        threshold = np.partition(keys[0], rows.size - limit)[rows.size - limit]
+        keep = keys[0] >= threshold
+        rows, keys = rows[keep], tuple(key[keep] for key in keys)
+    *descending, ascending = keys
+    order = np.lexsort((ascending, *(-key for key in reversed(descending))))
+    return rows[order[:limit]]
+
+
+class MatchingIndex:
+    """Sparse term matrices of candidates and jobs, see the module docstring. Not thread-safe."""
+
+    def __init__(self):
+        self.vocabulary = Vocabulary()
+
+        # Sorted term ids of each candidate, and sorted candidate slots of each term id
+        self.candidates = Slots()
+        self.candidate_terms: Dict[int, np.ndarray] = {}
+        self.candidate_columns: Dict[int, np.ndarray] = {}
+
+        # Number of terms and sorted word n-gram ids of each job; for each n-gram id,
+        # the sorted slot << TERM_INDEX_BITS | term index keys of the job terms containing it
+        self.jobs = Slots()
+        self.job_sizes: Dict[int, int] = {}
+        self._job_sizes_by_slot = np.zeros(self.jobs.ids.size, dtype=np.int64)
+        self.job_ngrams: Dict[int, np.ndarray] = {}
+        self.job_columns: Dict[int, np.ndarray] = {}
+
+    # Updates
+
+    def set_candidate(self, candidate_id: int, values: Iterable[str]) -> None:
+        """Replace the terms of a candidate, from its skills and preferred positions."""
+        self.set_candidates([(candidate_id, values)])
+
+    def set_candidates(self, items: Iterable[Tuple[int, Iterable[str]]]) -> None:
+        """
+        Replace the terms of several candidates.
+
+        Each column is merged once per call: loading candidates in batches
+        doesn't copy a column per posting.
+        """
+        added: Dict[int, List[int]] = defaultdict(list)
+        removed: Set[int] = set()
+        for candidate_id, values in dict(items).items():
+            slot = self.candidates.add(candidate_id)
+            terms = {self.vocabulary.intern(" ".join(term)) for value in values for term in split_terms(value)}
+            previous = set(self.candidate_terms.get(candidate_id, EMPTY).tolist())
+            for term_id in previous - terms:
+                self._unpost_candidate(slot, term_id)
+                removed.add(term_id)
+            for term_id in terms - previous:
+                added[term_id].append(slot)
+            self.candidate_terms[candidate_id] = np.array(sorted(terms), dtype=np.int64)
+        for term_id, slots in added.items():
+            self.candidate_columns[term_id] = insert_sorted(self.candidate_columns.get(term_id, EMPTY), np.sort(slots))
+        self._drop_empty(self.candidate_columns, removed)
+
+    def remove_candidate(self, candidate_id: int) -> None:
+        terms = self.candidate_terms.pop(candidate_id, None)
+        if terms is None:
+            return
+        slot = self.candidates.slots[candidate_id]
+        for term_id in terms.tolist():
+            self._unpost_candidate(slot, term_id)
+        self._drop_empty(self.candidate_columns, terms.tolist())
+        self.candidates.remove(candidate_id)
+
+    def _unpost_candidate(self, slot: int, term_id: int) -> None:
+        column = self.candidate_columns[term_id]
+        self.candidate_columns[term_id] = np.delete(column, column.searchsorted(slot))
+
+    def set_job(self, job_id: int, texts: Iterable[str]) -> None:
+        """Replace the terms of a job, from its title, requirements and responsibilities."""
+        self.set_jobs([(job_id, texts)])
+
+    def set_jobs(self, items: Iterable[Tuple[int, Iterable[str]]]) -> None:
+        """Replace the terms of several jobs, merging each column once like set_candidates."""
+        added: Dict[int, List[int]] = defaultdict(list)
+        removed: Set[int] = set()
+        for job_id, texts in dict(items).items():
+            removed.update(self._unpost_job(job_id))
+            terms = list(dict.fromkeys(term for text in texts if text for term in split_terms(text)))
+            terms = terms[:1 << TERM_INDEX_BITS]
+            ngrams: Dict[str, Set[int]] = defaultdict(set)
+            for index, term in enumerate(terms):
+                for size in range(1, min(MAX_TERM_WORDS, len(term)) + 1):
+                    for start in range(len(term) - size + 1):
+                        ngrams[" ".join(term[start:start + size])].add(index)
+
+            slot = self.jobs.add(job_id)
+            if self._job_sizes_by_slot.size < self.jobs.ids.size:
+                sizes = np.zeros(self.jobs.ids.size, dtype=np.int64)
+                sizes[:self._job_sizes_by_slot.size] = self._job_sizes_by_slot
+                self._job_sizes_by_slot = sizes
+            self._job_sizes_by_slot[slot] = len(terms)
+            self.job_sizes[job_id] = len(terms)
+            ngram_ids = []
+            for ngram, indexes in ngrams.items():
+                ngram_id = self.vocabulary.intern(ngram)
+                added[ngram_id].extend(slot << TERM_INDEX_BITS | index for index in indexes)
+                ngram_ids.append(ngram_id)
+            self.job_ngrams[job_id] = np.array(sorted(ngram_ids), dtype=np.int64)
+        for ngram_id, keys in added.items():
+            self.job_columns[ngram_id] = insert_sorted(self.job_columns.get(ngram_id, EMPTY), np.sort(keys))
+        self._drop_empty(self.job_columns, removed)
+
+    def remove_job(self, job_id: int) -> None:
+        self._drop_empty(self.job_columns, self._unpost_job(job_id))
+
+    def _unpost_job(self, job_id: int) -> List[int]:
+        """Delete the keys of a job from its columns and free its slot; returns the ids of these columns."""
+        ngram_ids = self.job_ngrams.pop(job_id, None)
+        if ngram_ids is None:
+            return []
+        del self.job_sizes[job_id]
+        slot = self.jobs.slots[job_id]
+        for ngram_id in ngram_ids.tolist():
+            column = self.job_columns[ngram_id]
+            keys = slot_keys(column, slot)
+            self.job_columns[ngram_id] = np.concatenate([column[:keys.start], column[keys.stop:]])
+        self.jobs.remove(job_id)
+        return ngram_ids.tolist()
+
+    def _drop_empty(self, columns: Dict[int, np.ndarray], term_ids: Iterable[int]) -> None:
+        """Delete the empty columns among term_ids, releasing the ids neither side uses any more."""
+        for term_id in term_ids:
+            if not columns[term_id].size:
+                del columns[term_id]
+                if term_id not in self.candidate_columns and term_id not in self.job_columns:
+                    self.vocabulary.release(term_id)
+
+    # Scoring
+
+    def _terms(self, term_ids: np.ndarray) -> List[str]:
+        return sorted(self.vocabulary.terms[term_id] for term_id in term_ids.tolist())
+
+    def rank_candidates(self, job_id: int, limit: int = 20) -> Optional[List[Tuple[int, float, List[str]]]]:
+        """
+        Best candidates for a job: most job terms matched, then most candidate terms found, then lowest id.
+
+        Returns:
+            (candidate id, score, matched skills) tuples, or None if the job is unknown
+        """
+        ngram_ids = self.job_ngrams.get(job_id)
+        if ngram_ids is None:
+            return None
+        found = [ngram_id for ngram_id in ngram_ids.tolist() if ngram_id in self.candidate_columns]
+        if not found:
+            return []
+
+        # Per candidate slot: job terms matched, and candidate terms found in the job
+        covered = np.zeros(self.candidates.ids.size, dtype=np.int32)
+        matched = np.zeros(self.candidates.ids.size, dtype=np.int32)
+        slot = self.jobs.slots[job_id]
+        ngrams_of_terms: Dict[int, List[int]] = defaultdict(list)
+        for ngram_id in found:
+            matched[self.candidate_columns[ngram_id]] += 1
+            column = self.job_columns[ngram_id]
+            for index in (column[slot_keys(column, slot)] & TERM_INDEX_MASK).tolist():
+                ngrams_of_terms[index].append(ngram_id)
+        for term_ngrams in ngrams_of_terms.values():
+            if len(term_ngrams) == 1:
+                covered[self.candidate_columns[term_ngrams[0]]] += 1
+                continue
+            # A candidate matching a term with several of its n-grams matches it once
+            term_matched = np.zeros(covered.size, dtype=bool)
+            for ngram_id in term_ngrams:
+                term_matched[self.candidate_columns[ngram_id]] = True
+            covered += term_matched
+
+        rows = np.flatnonzero(covered)
+        ids = self.candidates.ids
+        best = top_rows(rows, (covered[rows], matched[rows], ids[rows]), limit)
+        size = self.job_sizes[job_id]
+        found = np.array(found, dtype=np.int64)
+        return [
+            (int(ids[row]), int(covered[row]) / size,
+             self._terms(np.intersect1d(self.candidate_terms[int(ids[row])], found, assume_unique=True)))
+            for row in best
+        ]
+
+    def recommend_jobs(self, candidate_id: int, limit: int = 20) -> Optional[List[Tuple[int, float, List[str]]]]:
+        """
+        Best jobs for a candidate: highest score, then most candidate terms found, then lowest id.
+
+        Returns:
+            (job id, score, matched skills) tuples, or None if the candidate is unknown
+        """
+        terms = self.candidate_terms.get(candidate_id)
+        if terms is None:
+            return None
+        found = [term_id for term_id in terms.tolist() if term_id in self.job_columns]
+        if not found:
+            return []
+
+        # Per job slot: distinct job terms matched, and candidate terms found in the job
+        columns = [self.job_columns[term_id] for term_id in found]
+        keys = np.unique(np.concatenate(columns))
+        covered = np.bincount(keys >> TERM_INDEX_BITS, minlength=self.jobs.ids.size)
+        matched = np.zeros(self.jobs.ids.size, dtype=np.int32)
+        for column in columns:
+            # A slot repeated in the index is incremented once
+            matched[column >> TERM_INDEX_BITS] += 1
+
+        rows = np.flatnonzero(covered)
+        scores = covered[rows] / self._job_sizes_by_slot[rows]
+        ids = self.jobs.ids
+        best = top_rows(rows, (scores, matched[rows], ids[rows]), limit)
+        found = np.array(found, dtype=np.int64)
+        return [
+            (int(ids[row]), float(covered[row] / self._job_sizes_by_slot[row]),
+             self._terms(np.intersect1d(self.job_ngrams[int(ids[row])], found, assume_unique=True)))
+            for row in best
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "candidates": len(self.candidate_terms),
+            "jobs": len(self.job_sizes),
+            "terms": len(self.vocabulary),
+            "candidate_terms": len(self.candidate_columns),
+            "job_ngrams": len(self.job_columns),
+            "postings": sum(column.size for column in self.candidate_columns.values())
+            + sum(column.size for column in self.job_columns.values()),
+        }
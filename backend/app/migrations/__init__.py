@@ -0,0 +1,29 @@
+from alembic import command
+from alembic.config import Config
+import os
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def get_alembic_config() -> Config:
+    """Build the Alembic configuration pointing at this migrations package."""
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    return config
+
+
+def upgrade_database(revision: str = "head") -> None:
+    """
+    Apply the versioned schema migrations up to the given revision.
+
+    Args:
+        revision: Target Alembic revision ("head" for the latest one)
+    """
+    logger.info(f"Applying database migrations up to '{revision}'")
+    command.upgrade(get_alembic_config(), revision)
+    logger.info("Database migrations applied successfully")
@@ -0,0 +1,41 @@
+from alembic import context
+from sqlalchemy.sql import text
+
+from app.database import engine
+from app import models, file_storage  # noqa: F401 - register every table on Base.metadata
+
+target_metadata = models.Base.metadata
+
+# Arbitrary key of the advisory lock serializing migrations between workers
+MIGRATION_LOCK_ID = 727_001
+
+
+def run_migrations_offline():
+    """Emit the migration SQL to stdout instead of running it."""
+    context.configure(
+        url=str(engine.url),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Run the migrations against the application database."""
+    with engine.connect() as connection:
+        # Several uvicorn workers may start at once: only one migrates at a time
+        connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        try:
+            context.configure(connection=connection, target_metadata=target_metadata)
+            with context.begin_transaction():
+                context.run_migrations()
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
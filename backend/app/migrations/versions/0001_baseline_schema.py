@@ -0,0 +1,200 @@
+"""Baseline schema
+
+Creates the tables that used to be created by Base.metadata.create_all at
+startup. Databases created that way already have them: existing tables are
+left untouched so this revision can be applied on top of them.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _timestamps():
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    ]
+
+
+def _create_table(existing, name, *columns):
+    if name in existing:
+        return
+    op.create_table(name, *columns)
+    op.create_index(f"ix_{name}_id", name, ["id"])
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    _create_table(
+        existing, "users",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("email", sa.String, nullable=False),
+        sa.Column("name", sa.String, nullable=False),
+        sa.Column("image", sa.String),
+        sa.Column("role", sa.Enum("admin", "recruteur", "candidat", name="userrole"), nullable=False),
+        sa.Column("status", sa.Enum("actif", "inactif", "suspendu", name="userstatus"), nullable=False),
+        sa.Column("password", sa.String, nullable=False),
+        sa.Column("is_active", sa.Boolean),
+        *_timestamps(),
+    )
+    if "users" not in existing:
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    _create_table(
+        existing, "jobs",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("title", sa.String, nullable=False),
+        sa.Column("company", sa.String, nullable=False),
+        sa.Column("location", sa.String, nullable=False),
+        sa.Column("type", sa.Enum("CDI", "CDD", "Stage", "Alternance", "Freelance", name="jobtype"), nullable=False),
+        sa.Column("salary", sa.String),
+        sa.Column("posted_date", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("description", sa.Text, nullable=False),
+        sa.Column("responsibilities", postgresql.ARRAY(sa.String)),
+        sa.Column("requirements", postgresql.ARRAY(sa.String)),
+        sa.Column("benefits", postgresql.ARRAY(sa.String)),
+        sa.Column("company_website", sa.String),
+        sa.Column("company_linkedin", sa.String),
+        sa.Column("recruiter_id", sa.Integer, nullable=False),
+        sa.Column("desired_candidates", sa.Integer),
+        sa.Column("duration", sa.Integer),
+    )
+
+    _create_table(
+        existing, "job_applications",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("job_id", sa.Integer, nullable=False),
+        sa.Column("candidate_id", sa.Integer, nullable=False),
+        sa.Column("cover_letter", sa.Text),
+        sa.Column("cv_url", sa.String, nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "pending", "reviewed", "interview", "accepted", "rejected", "analyzed",
+                "accepted_after_interview", "rejected_after_interview",
+                name="applicationstatus",
+            ),
+            nullable=False,
+        ),
+        sa.Column("applied_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("phone", sa.String),
+        sa.Column("location", sa.String),
+        sa.Column("interview_at", sa.DateTime(timezone=True)),
+        sa.Column("score", sa.Integer),
+        sa.Column("observations", sa.Text),
+        sa.Column("qualified", sa.Boolean),
+        sa.Column("strengths", sa.Text),
+        sa.Column("weaknesses", sa.Text),
+        sa.Column("keywords_match", sa.Text),
+        sa.Column("analyzed_at", sa.DateTime(timezone=True)),
+    )
+
+    _create_table(
+        existing, "interviews",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("candidate_id", sa.Integer, nullable=False),
+        sa.Column("application_id", sa.Integer),
+        sa.Column("position", sa.String, nullable=False),
+        sa.Column("date", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("duration", sa.String),
+        sa.Column(
+            "status",
+            sa.Enum("scheduled", "in_progress", "completed", "cancelled", name="interviewstatus"),
+            nullable=False,
+        ),
+        sa.Column("score", sa.Float),
+        sa.Column("questions", sa.JSON),
+        sa.Column("detailed_scores", sa.JSON),
+        sa.Column("question_by_question_analysis", sa.JSON),
+        sa.Column("overall_assessment", sa.JSON),
+        sa.Column("interview_summary", sa.JSON),
+        *_timestamps(),
+    )
+
+    _create_table(
+        existing, "questions",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("interview_id", sa.Integer, nullable=False),
+        sa.Column("question_text", sa.Text, nullable=False),
+        sa.Column("answer_text", sa.Text),
+        sa.Column("score", sa.Float),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+    _create_table(
+        existing, "messages",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("interview_id", sa.Integer, nullable=False),
+        sa.Column("role", sa.Enum("user", "assistant", name="messagerole"), nullable=False),
+        sa.Column("content", sa.Text, nullable=False),
+        sa.Column("type", sa.Enum("text", "audio", name="messagetype"), nullable=False),
+        sa.Column("timestamp", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("audio_url", sa.String),
+    )
+
+    _create_table(
+        existing, "recruiter_profiles",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, nullable=False),
+        sa.Column("department", sa.String),
+        sa.Column("specialization", sa.String),
+        sa.Column("assigned_candidates", sa.Integer),
+        sa.Column("completed_interviews", sa.Integer),
+        *_timestamps(),
+    )
+    if "recruiter_profiles" not in existing:
+        op.create_index("ix_recruiter_profiles_user_id", "recruiter_profiles", ["user_id"], unique=True)
+
+    _create_table(
+        existing, "candidate_profiles",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, nullable=False),
+        sa.Column("applied_jobs", sa.Integer),
+        sa.Column("completed_interviews", sa.Integer),
+        sa.Column("average_score", sa.Float),
+        sa.Column("skills", postgresql.ARRAY(sa.String)),
+        sa.Column("preferred_positions", postgresql.ARRAY(sa.String)),
+        *_timestamps(),
+    )
+    if "candidate_profiles" not in existing:
+        op.create_index("ix_candidate_profiles_user_id", "candidate_profiles", ["user_id"], unique=True)
+
+    _create_table(
+        existing, "file_storage",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("filename", sa.String, nullable=False),
+        sa.Column("content_type", sa.String, nullable=False),
+        sa.Column("file_data", sa.LargeBinary, nullable=False),
+        sa.Column("file_size", sa.Integer, nullable=False),
+        sa.Column("file_uuid", sa.String, nullable=False),
+        sa.Column("candidate_id", sa.Integer, nullable=False),
+        sa.Column("file_type", sa.String, nullable=False),
+        *_timestamps(),
+    )
+    if "file_storage" not in existing:
+        op.create_index("ix_file_storage_file_uuid", "file_storage", ["file_uuid"], unique=True)
+
+
+def downgrade():
+    for table in (
+        "file_storage", "candidate_profiles", "recruiter_profiles", "messages",
+        "questions", "interviews", "job_applications", "jobs", "users",
+    ):
+        op.drop_table(table)
+    for enum_name in (
+        "messagetype", "messagerole", "interviewstatus", "applicationstatus",
+        "jobtype", "userstatus", "userrole",
+    ):
+        sa.Enum(name=enum_name).drop(op.get_bind(), checkfirst=True)
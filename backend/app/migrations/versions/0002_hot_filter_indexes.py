@@ -0,0 +1,45 @@
+"""Indexes for the hot filter columns
+
+Matches the access patterns of the list endpoints:
+- read_applications filters on candidate_id, job_id and/or status, and
+  create_application checks (job_id, candidate_id) for duplicates;
+- read_applications resolves upcoming interviews by (candidate_id, date)
+  and read_interviews filters on candidate_id;
+- read_messages reads one interview ordered by (timestamp, id);
+- read_jobs filters on recruiter_id.
+
+Indexes are built CONCURRENTLY so the migration does not block writes on
+a live database.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_job_applications_candidate_id_job_id", "job_applications", "candidate_id, job_id"),
+    ("ix_job_applications_job_id_status", "job_applications", "job_id, status"),
+    ("ix_job_applications_status", "job_applications", "status"),
+    ("ix_interviews_candidate_id_date", "interviews", "candidate_id, date"),
+    ("ix_messages_interview_id_timestamp", "messages", "interview_id, timestamp, id"),
+    ("ix_jobs_recruiter_id", "jobs", "recruiter_id"),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _table, _columns in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
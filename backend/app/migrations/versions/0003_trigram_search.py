@@ -0,0 +1,55 @@
+"""Accent-insensitive trigram search on jobs and users
+
+Adds pg_trgm and unaccent, an IMMUTABLE normalize_search_text() wrapper
+(lower + unaccent) usable in index expressions, and GIN trigram indexes on
+the normalized searchable columns. Leading-wildcard LIKE and word
+similarity filters on normalize_search_text(column) can then use an index.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_jobs_title_trgm", "jobs", "title"),
+    ("ix_jobs_company_trgm", "jobs", "company"),
+    ("ix_jobs_location_trgm", "jobs", "location"),
+    ("ix_users_name_trgm", "users", "name"),
+    ("ix_users_email_trgm", "users", "email"),
+]
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    # unaccent() is only STABLE; pinning the dictionary makes the wrapper safe
+    # to declare IMMUTABLE so it can be used in index expressions.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION normalize_search_text(value text)
+        RETURNS text
+        LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+        AS $$ SELECT lower(public.unaccent('public.unaccent'::regdictionary, value)) $$
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        for name, table, column in INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {table} USING gin (normalize_search_text({column}) gin_trgm_ops)"
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _table, _column in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    op.execute("DROP FUNCTION IF EXISTS normalize_search_text(text)")
@@ -0,0 +1,39 @@
+"""Chunked file storage
+
+Uploads are now written as fixed-size rows in file_chunks instead of one
+LargeBinary value. file_storage.file_data becomes nullable: it is only set
+for files stored before this revision.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "file_chunks",
+        sa.Column(
+            "file_id", sa.Integer,
+            sa.ForeignKey("file_storage.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("chunk_index", sa.Integer, primary_key=True),
+        sa.Column("data", sa.LargeBinary, nullable=False),
+    )
+    # PDFs barely compress: skip pglz and keep chunks out of line
+    op.execute("ALTER TABLE file_chunks ALTER COLUMN data SET STORAGE EXTERNAL")
+    op.alter_column("file_storage", "file_data", existing_type=sa.LargeBinary, nullable=True)
+
+
+def downgrade():
+    op.drop_table("file_chunks")
+    op.alter_column("file_storage", "file_data", existing_type=sa.LargeBinary, nullable=False)
@@ -0,0 +1,110 @@
+"""Content-addressed, deduplicated file storage
+
+Chunks now belong to file_blobs rows keyed by the SHA-256 of the content
+instead of to a single upload. Every file_storage row of a chunked file
+references its blob and blobs keep the reference count delete_file uses.
+Chunked files stored by revision 0004 are hashed and merged here; files
+still stored in file_storage.file_data are left as they are.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+import hashlib
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "file_blobs",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("sha256", sa.String(64), nullable=False),
+        sa.Column("size", sa.Integer, nullable=False),
+        sa.Column("ref_count", sa.Integer, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_file_blobs_id", "file_blobs", ["id"])
+    op.create_unique_constraint("file_blobs_sha256_key", "file_blobs", ["sha256"])
+
+    op.add_column("file_storage", sa.Column("blob_id", sa.Integer, sa.ForeignKey("file_blobs.id"), nullable=True))
+    op.create_index("ix_file_storage_blob_id", "file_storage", ["blob_id"])
+    op.add_column("file_chunks", sa.Column("blob_id", sa.Integer, nullable=True))
+
+    # Move the chunks of every chunked file to a blob, merging identical contents
+    connection = op.get_bind()
+    file_ids = connection.execute(
+        sa.text("SELECT id FROM file_storage WHERE file_data IS NULL ORDER BY id")
+    ).scalars().all()
+    for file_id in file_ids:
+        digest = hashlib.sha256()
+        size = 0
+        chunk_indexes = connection.execute(
+            sa.text("SELECT chunk_index FROM file_chunks WHERE file_id = :id ORDER BY chunk_index"),
+            {"id": file_id},
+        ).scalars().all()
+        for chunk_index in chunk_indexes:
+            data = connection.execute(
+                sa.text("SELECT data FROM file_chunks WHERE file_id = :id AND chunk_index = :i"),
+                {"id": file_id, "i": chunk_index},
+            ).scalar()
+            digest.update(data)
+            size += len(data)
+
+        blob_id, created = connection.execute(
+            sa.text(
+                "INSERT INTO file_blobs (sha256, size, ref_count) VALUES (:sha256, :size, 1) "
+                "ON CONFLICT (sha256) DO UPDATE SET ref_count = file_blobs.ref_count + 1 "
+                "RETURNING id, xmax = 0"
+            ),
+            {"sha256": digest.hexdigest(), "size": size},
+        ).one()
+        if created:
+            connection.execute(
+                sa.text("UPDATE file_chunks SET blob_id = :blob_id WHERE file_id = :id"),
+                {"blob_id": blob_id, "id": file_id},
+            )
+        else:
+            connection.execute(sa.text("DELETE FROM file_chunks WHERE file_id = :id"), {"id": file_id})
+        connection.execute(
+            sa.text("UPDATE file_storage SET blob_id = :blob_id WHERE id = :id"),
+            {"blob_id": blob_id, "id": file_id},
+        )
+
+    op.drop_constraint("file_chunks_pkey", "file_chunks", type_="primary")
+    op.drop_column("file_chunks", "file_id")
+    op.alter_column("file_chunks", "blob_id", existing_type=sa.Integer, nullable=False)
+    op.create_primary_key("file_chunks_pkey", "file_chunks", ["blob_id", "chunk_index"])
+    op.create_foreign_key(
+        "file_chunks_blob_id_fkey", "file_chunks", "file_blobs",
+        ["blob_id"], ["id"], ondelete="CASCADE",
+    )
+
+
+def downgrade():
+    # Give every upload its own copy of the chunks again
+    op.add_column("file_chunks", sa.Column("file_id", sa.Integer, nullable=True))
+    op.drop_constraint("file_chunks_blob_id_fkey", "file_chunks", type_="foreignkey")
+    op.drop_constraint("file_chunks_pkey", "file_chunks", type_="primary")
+    op.execute(
+        "INSERT INTO file_chunks (blob_id, chunk_index, data, file_id) "
+        "SELECT c.blob_id, c.chunk_index, c.data, f.id "
+        "FROM file_chunks c JOIN file_storage f ON f.blob_id = c.blob_id"
+    )
+    op.execute("DELETE FROM file_chunks WHERE file_id IS NULL")
+    op.drop_column("file_chunks", "blob_id")
+    op.alter_column("file_chunks", "file_id", existing_type=sa.Integer, nullable=False)
+    op.create_primary_key("file_chunks_pkey", "file_chunks", ["file_id", "chunk_index"])
+    op.create_foreign_key(
+        "file_chunks_file_id_fkey", "file_chunks", "file_storage",
+        ["file_id"], ["id"], ondelete="CASCADE",
+    )
+    op.drop_index("ix_file_storage_blob_id", "file_storage")
+    op.drop_column("file_storage", "blob_id")
+    op.drop_table("file_blobs")
@@ -0,0 +1,28 @@
+"""Storage backend of file blobs
+
+Records on which storage backend each blob content lives. Existing blobs
+are stored in PostgreSQL (file_chunks).
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "file_blobs",
+        sa.Column("backend", sa.String, nullable=False, server_default="postgres"),
+    )
+
+
+def downgrade():
+    op.drop_column("file_blobs", "backend")
@@ -0,0 +1,50 @@
+"""Notifications of new interview messages
+
+A trigger sends a NOTIFY on the interview_messages channel for each new
+message, delivered when the inserting transaction commits. Live interview
+connections listen to it instead of polling the messages table.
+
+The database runs with session_replication_role = 'replica', which skips
+ordinary triggers: this one is enabled ALWAYS.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_message_inserted() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM pg_notify(
+                'interview_messages',
+                json_build_object('interview_id', NEW.interview_id, 'id', NEW.id)::text
+            );
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER messages_notify_inserted
+        AFTER INSERT ON messages
+        FOR EACH ROW EXECUTE FUNCTION notify_message_inserted()
+        """
+    )
+    op.execute("ALTER TABLE messages ENABLE ALWAYS TRIGGER messages_notify_inserted")
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS messages_notify_inserted ON messages")
+    op.execute("DROP FUNCTION IF EXISTS notify_message_inserted()")
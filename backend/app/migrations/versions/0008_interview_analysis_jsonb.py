@@ -0,0 +1,65 @@
+"""JSONB interview analysis
+
+Converts the AI analysis columns of interviews from JSON to JSONB, so they
+can be updated in place with jsonb_set and searched by containment, and adds
+GIN indexes for containment (@>) queries on the assessment and the scores.
+
+The type change rewrites the interviews table under an exclusive lock.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    "questions",
+    "detailed_scores",
+    "question_by_question_analysis",
+    "overall_assessment",
+    "interview_summary",
+]
+
+INDEXES = [
+    ("ix_interviews_overall_assessment", "overall_assessment"),
+    ("ix_interviews_detailed_scores", "detailed_scores"),
+]
+
+
+def upgrade():
+    for column in COLUMNS:
+        op.alter_column(
+            "interviews", column,
+            type_=postgresql.JSONB,
+            existing_type=sa.JSON,
+            postgresql_using=f"{column}::jsonb",
+        )
+
+    with op.get_context().autocommit_block():
+        for name, column in INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON interviews USING gin ({column} jsonb_path_ops)"
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _column in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+    for column in COLUMNS:
+        op.alter_column(
+            "interviews", column,
+            type_=sa.JSON,
+            existing_type=postgresql.JSONB,
+            postgresql_using=f"{column}::json",
+        )
@@ -0,0 +1,49 @@
+"""Skill search on candidate profiles
+
+Adds an IMMUTABLE normalize_search_array() that applies normalize_search_text
+(lower + unaccent) and trims every element of a text array, and GIN indexes
+on the normalized skills and preferred_positions arrays. Containment (@>)
+and overlap (&&) filters on normalize_search_array(column) use these
+indexes as an inverted index from skill to profiles.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_candidate_profiles_skills_search", "skills"),
+    ("ix_candidate_profiles_preferred_positions_search", "preferred_positions"),
+]
+
+
+def upgrade():
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION normalize_search_array(vals text[])
+        RETURNS text[]
+        LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+        AS $$ SELECT ARRAY(SELECT btrim(normalize_search_text(v)) FROM unnest(vals) AS v) $$
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        for name, column in INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON candidate_profiles USING gin (normalize_search_array({column}))"
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _column in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    op.execute("DROP FUNCTION IF EXISTS normalize_search_array(text[])")
@@ -0,0 +1,234 @@
+"""Incrementally maintained profile counters
+
+Triggers keep the counters of candidate and recruiter profiles up to date as
+applications and interviews change, instead of dashboards aggregating the
+whole tables:
+- candidate_profiles.applied_jobs: applications of the candidate;
+- candidate_profiles.completed_interviews / average_score: completed
+  interviews of the candidate and the average of their scores;
+- recruiter_profiles.assigned_candidates: distinct candidates who applied to
+  a job of the recruiter;
+- recruiter_profiles.completed_interviews: completed interviews of
+  applications to a job of the recruiter.
+
+Counters are moved by +/-1 from the changed row. The average score is
+recomputed from the interviews of the one candidate concerned, so it never
+accumulates rounding errors. Reassigning or deleting a job recomputes the
+counters of the recruiters involved. `python -m app.manage reconcile-counters`
+rebuilds every counter and reports drift.
+
+The database runs with session_replication_role = 'replica', which skips
+ordinary triggers: these are enabled ALWAYS.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+FUNCTIONS = [
+    """
+    CREATE OR REPLACE FUNCTION refresh_candidate_average_score(candidate integer) RETURNS void
+    LANGUAGE sql AS $$
+        UPDATE candidate_profiles
+        SET average_score = (
+            SELECT avg(score) FROM interviews
+            WHERE candidate_id = candidate AND status = 'completed'
+        )
+        WHERE user_id = candidate
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION refresh_recruiter_counters(recruiter integer) RETURNS void
+    LANGUAGE sql AS $$
+        UPDATE recruiter_profiles
+        SET assigned_candidates = (
+                SELECT count(DISTINCT a.candidate_id)
+                FROM job_applications a JOIN jobs j ON j.id = a.job_id
+                WHERE j.recruiter_id = recruiter
+            ),
+            completed_interviews = (
+                SELECT count(*)
+                FROM interviews i
+                JOIN job_applications a ON a.id = i.application_id
+                JOIN jobs j ON j.id = a.job_id
+                WHERE j.recruiter_id = recruiter AND i.status = 'completed'
+            )
+        WHERE user_id = recruiter
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION move_application_counters(application job_applications, delta integer) RETURNS void
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        recruiter integer;
+        completed integer;
+    BEGIN
+        UPDATE candidate_profiles
+        SET applied_jobs = coalesce(applied_jobs, 0) + delta
+        WHERE user_id = application.candidate_id;
+
+        SELECT recruiter_id INTO recruiter FROM jobs WHERE id = application.job_id;
+        IF recruiter IS NULL THEN
+            RETURN;
+        END IF;
+
+        -- Serializes the changes of one recruiter, so the check below sees
+        -- the applications committed by concurrent transactions
+        PERFORM 1 FROM recruiter_profiles WHERE user_id = recruiter FOR UPDATE;
+
+        SELECT count(*) INTO completed
+        FROM interviews
+        WHERE application_id = application.id AND status = 'completed';
+
+        UPDATE recruiter_profiles
+        SET assigned_candidates = coalesce(assigned_candidates, 0) + CASE
+                WHEN EXISTS (
+                    SELECT 1 FROM job_applications a JOIN jobs j ON j.id = a.job_id
+                    WHERE a.candidate_id = application.candidate_id
+                      AND j.recruiter_id = recruiter
+                      AND a.id <> application.id
+                ) THEN 0
+                ELSE delta
+            END,
+            completed_interviews = coalesce(completed_interviews, 0) + delta * completed
+        WHERE user_id = recruiter;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION job_applications_update_counters() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM move_application_counters(OLD, -1);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM move_application_counters(NEW, 1);
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION move_interview_counters(interview interviews, delta integer) RETURNS void
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF interview.status <> 'completed' THEN
+            RETURN;
+        END IF;
+
+        UPDATE candidate_profiles
+        SET completed_interviews = coalesce(completed_interviews, 0) + delta
+        WHERE user_id = interview.candidate_id;
+
+        UPDATE recruiter_profiles
+        SET completed_interviews = coalesce(completed_interviews, 0) + delta
+        WHERE user_id = (
+            SELECT j.recruiter_id
+            FROM job_applications a JOIN jobs j ON j.id = a.job_id
+            WHERE a.id = interview.application_id
+        );
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION interviews_update_counters() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM move_interview_counters(OLD, -1);
+            PERFORM refresh_candidate_average_score(OLD.candidate_id);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM move_interview_counters(NEW, 1);
+            IF TG_OP = 'INSERT' OR NEW.candidate_id IS DISTINCT FROM OLD.candidate_id THEN
+                PERFORM refresh_candidate_average_score(NEW.candidate_id);
+            END IF;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION jobs_update_counters() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM refresh_recruiter_counters(OLD.recruiter_id);
+        IF TG_OP = 'UPDATE' THEN
+            PERFORM refresh_recruiter_counters(NEW.recruiter_id);
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+]
+
+# (name, table, events, condition, function)
+TRIGGERS = [
+    ("job_applications_counters", "job_applications", "INSERT OR DELETE", None,
+     "job_applications_update_counters"),
+    ("job_applications_counters_moved", "job_applications", "UPDATE OF candidate_id, job_id",
+     "OLD.candidate_id IS DISTINCT FROM NEW.candidate_id OR OLD.job_id IS DISTINCT FROM NEW.job_id",
+     "job_applications_update_counters"),
+    ("interviews_counters", "interviews", "INSERT OR DELETE", None,
+     "interviews_update_counters"),
+    ("interviews_counters_changed", "interviews", "UPDATE OF candidate_id, application_id, status, score",
+     "OLD.candidate_id IS DISTINCT FROM NEW.candidate_id OR OLD.application_id IS DISTINCT FROM NEW.application_id"
+     " OR OLD.status IS DISTINCT FROM NEW.status OR OLD.score IS DISTINCT FROM NEW.score",
+     "interviews_update_counters"),
+    ("jobs_counters", "jobs", "DELETE", None,
+     "jobs_update_counters"),
+    ("jobs_counters_reassigned", "jobs", "UPDATE OF recruiter_id",
+     "OLD.recruiter_id IS DISTINCT FROM NEW.recruiter_id",
+     "jobs_update_counters"),
+]
+
+DROPPED_FUNCTIONS = [
+    "jobs_update_counters()",
+    "interviews_update_counters()",
+    "move_interview_counters(interviews, integer)",
+    "job_applications_update_counters()",
+    "move_application_counters(job_applications, integer)",
+    "refresh_recruiter_counters(integer)",
+    "refresh_candidate_average_score(integer)",
+]
+
+
+def upgrade():
+    # Interviews of an application are counted when it is deleted or moved
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_interviews_application_id "
+            "ON interviews (application_id)"
+        )
+
+    for function in FUNCTIONS:
+        op.execute(function)
+
+    for name, table, events, condition, function in TRIGGERS:
+        when = f"WHEN ({condition})" if condition else ""
+        op.execute(
+            f"""
+            CREATE TRIGGER {name}
+            AFTER {events} ON {table}
+            FOR EACH ROW {when} EXECUTE FUNCTION {function}()
+            """
+        )
+        op.execute(f"ALTER TABLE {table} ENABLE ALWAYS TRIGGER {name}")
+
+
+def downgrade():
+    for name, table, _events, _condition, _function in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON {table}")
+    for function in DROPPED_FUNCTIONS:
+        op.execute(f"DROP FUNCTION IF EXISTS {function}")
+
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_interviews_application_id")
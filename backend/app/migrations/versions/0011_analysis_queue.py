@@ -0,0 +1,83 @@
+"""Queue of CV analyses
+
+analysis_jobs holds one row per application to analyze. Workers of
+`python -m app.manage analysis-worker` claim queued rows with
+FOR UPDATE SKIP LOCKED, so any number of them share the queue without
+blocking each other; a claimed row whose lease expired is claimed again.
+
+A trigger enqueues every application inserted as pending (enabled ALWAYS,
+as the database runs with session_replication_role = 'replica'), and
+pending applications not analyzed yet are enqueued by this migration.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "analysis_jobs",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("application_id", sa.Integer, nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("queued", "running", "done", "failed", name="analysisjobstatus"),
+            nullable=False,
+            server_default="queued",
+        ),
+        sa.Column("attempts", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("locked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.Text, nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_analysis_jobs_application_id", "analysis_jobs", ["application_id"], unique=True)
+    op.create_index("ix_analysis_jobs_status_id", "analysis_jobs", ["status", "id"])
+
+    op.execute(
+        """
+        INSERT INTO analysis_jobs (application_id)
+        SELECT id FROM job_applications
+        WHERE status = 'pending' AND analyzed_at IS NULL
+        ORDER BY id
+        """
+    )
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION enqueue_application_analysis() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO analysis_jobs (application_id)
+            VALUES (NEW.id)
+            ON CONFLICT (application_id) DO NOTHING;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER job_applications_enqueue_analysis
+        AFTER INSERT ON job_applications
+        FOR EACH ROW WHEN (NEW.status = 'pending')
+        EXECUTE FUNCTION enqueue_application_analysis()
+        """
+    )
+    op.execute("ALTER TABLE job_applications ENABLE ALWAYS TRIGGER job_applications_enqueue_analysis")
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS job_applications_enqueue_analysis ON job_applications")
+    op.execute("DROP FUNCTION IF EXISTS enqueue_application_analysis()")
+    op.drop_table("analysis_jobs")
+    op.execute("DROP TYPE IF EXISTS analysisjobstatus")
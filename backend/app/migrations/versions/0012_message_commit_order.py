@@ -0,0 +1,60 @@
+"""Commit-ordered message ids per interview
+
+Live interview connections resume from the last message id they received
+(id > after_id). That only loses nothing if, within an interview, a message
+with a lower id is never committed after one with a higher id. The serial
+default alone doesn't ensure it: messages of the same interview inserted
+concurrently (WebSocket turns, create_message, messages:batch) take their
+ids in one order and may commit in the other.
+
+A BEFORE INSERT trigger takes a transaction-level advisory lock on the
+interview, then assigns the id: inserts into one interview are serialized
+until commit, so ids are taken in commit order. Every insert path is
+covered, whatever the client.
+
+The database runs with session_replication_role = 'replica', which skips
+ordinary triggers: this one is enabled ALWAYS.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+# First key of the advisory locks on interviews (the second is the interview id)
+MESSAGE_LOCK_NAMESPACE = 727_002
+
+
+def upgrade():
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION order_message_insert() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM pg_advisory_xact_lock({MESSAGE_LOCK_NAMESPACE}, NEW.interview_id);
+            -- Taken under the lock: the default id was drawn before it
+            NEW.id := nextval(pg_get_serial_sequence('messages', 'id'));
+            RETURN NEW;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER messages_order_insert
+        BEFORE INSERT ON messages
+        FOR EACH ROW EXECUTE FUNCTION order_message_insert()
+        """
+    )
+    op.execute("ALTER TABLE messages ENABLE ALWAYS TRIGGER messages_order_insert")
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS messages_order_insert ON messages")
+    op.execute("DROP FUNCTION IF EXISTS order_message_insert()")
@@ -1,4 +1,5 @@
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, Enum, ARRAY, Float, ForeignKey, Text, JSON
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, Enum, ARRAY, Float, ForeignKey, Text, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from .database import Base
@@ -57,6 +58,10 @@ class Job(Base):
     desired_candidates = Column(Integer, nullable=True)
     duration = Column(Integer, nullable=True)  # Durée en minutes
     
+    __table_args__ = (
+        Index("ix_jobs_recruiter_id", "recruiter_id"),
+    )
+    
     # Relationships
     # recruiter = relationship("RecruiterProfile", back_populates="jobs", primaryjoin="Job.recruiter_id == RecruiterProfile.id")
     # applications = relationship("JobApplication", back_populates="job")
@@ -97,6 +102,12 @@ class JobApplication(Base):
     keywords_match = Column(Text, nullable=True)
     analyzed_at = Column(DateTime(timezone=True), nullable=True)
     
+    __table_args__ = (
+        Index("ix_job_applications_candidate_id_job_id", "candidate_id", "job_id"),
+        Index("ix_job_applications_job_id_status", "job_id", "status"),
+        Index("ix_job_applications_status", "status"),
+    )
+    
     # Relationships
     # job = relationship("Job", back_populates="applications", primaryjoin="JobApplication.job_id == Job.id")
     # candidate = relationship("CandidateProfile", back_populates="applications", primaryjoin="JobApplication.candidate_id == CandidateProfile.id")
@@ -121,14 +132,27 @@ class Interview(Base):
     duration = Column(String, nullable=True)
     status = Column(Enum(InterviewStatus), nullable=False, default=InterviewStatus.scheduled)
     score = Column(Float, nullable=True)
-    questions = Column(JSON, nullable=True)  # Nouveau champ pour stocker les questions générées par l'IA
-    detailed_scores = Column(JSON, nullable=True)  # Scores détaillés par catégorie
-    question_by_question_analysis = Column(JSON, nullable=True)  # Analyse détaillée par question
-    overall_assessment = Column(JSON, nullable=True)  # Évaluation globale du candidat
-    interview_summary = Column(JSON, nullable=True)  # Résumé de l'entretien
+    questions = Column(JSONB, nullable=True)  # Nouveau champ pour stocker les questions générées par l'IA
+    detailed_scores = Column(JSONB, nullable=True)  # Scores détaillés par catégorie
+    question_by_question_analysis = Column(JSONB, nullable=True)  # Analyse détaillée par question
+    overall_assessment = Column(JSONB, nullable=True)  # Évaluation globale du candidat
+    interview_summary = Column(JSONB, nullable=True)  # Résumé de l'entretien
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    __table_args__ = (
+        Index("ix_interviews_candidate_id_date", "candidate_id", "date"),
+        Index("ix_interviews_application_id", "application_id"),
+        Index(
+            "ix_interviews_overall_assessment", "overall_assessment",
+            postgresql_using="gin", postgresql_ops={"overall_assessment": "jsonb_path_ops"}
+        ),
+        Index(
+            "ix_interviews_detailed_scores", "detailed_scores",
+            postgresql_using="gin", postgresql_ops={"detailed_scores": "jsonb_path_ops"}
+        ),
+    )
+    
     # Relationships
     # candidate = relationship("CandidateProfile", back_populates="interviews", primaryjoin="Interview.candidate_id == CandidateProfile.id")
     # application = relationship("JobApplication", back_populates="interview", primaryjoin="Interview.application_id == JobApplication.id")
@@ -170,6 +194,10 @@ class Message(Base):
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
     audio_url = Column(String, nullable=True)
     
+    __table_args__ = (
+        Index("ix_messages_interview_id_timestamp", "interview_id", "timestamp", "id"),
+    )
+    
     # Relationships
     # interview = relationship("Interview", back_populates="messages", primaryjoin="Message.interview_id == Interview.id")
     # last_login = Column(DateTime(timezone=True), nullable=True)
@@ -207,3 +235,28 @@ class CandidateProfile(Base):
     # user = relationship("User", primaryjoin="CandidateProfile.user_id == User.id")
     # applications = relationship("JobApplication", back_populates="candidate", primaryjoin="CandidateProfile.id == JobApplication.candidate_id")
     # interviews = relationship("Interview", back_populates="candidate", primaryjoin="CandidateProfile.id == Interview.candidate_id")
+
+
+class AnalysisJobStatus(enum.Enum):
+    queued = "queued"
+    running = "running"
+    done = "done"
+    failed = "failed"
+
+
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+    
+    id = Column(Integer, primary_key=True)
+    application_id = Column(Integer, nullable=False)
+    status = Column(Enum(AnalysisJobStatus), nullable=False, default=AnalysisJobStatus.queued, server_default="queued")
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    locked_at = Column(DateTime(timezone=True), nullable=True)  # Début du bail du worker qui l'analyse
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("ix_analysis_jobs_application_id", "application_id", unique=True),
+        Index("ix_analysis_jobs_status_id", "status", "id"),
+    )
@@ -0,0 +1,153 @@
+from sqlalchemy import DateTime, Enum, and_, literal, or_, tuple_
+from sqlalchemy.orm import Query
+from fastapi import HTTPException, Response, status
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+import base64
+import json
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Response header carrying the cursor of the next page in cursor mode
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_key: str, value: Any, row_id: int) -> str:
+    """
+    Build an opaque cursor from the sort key of the last row of a page.
+
+    Args:
+        sort_key: Name of the sort option the page was built with
+        value: Value of the sort column for the last row
+        row_id: Primary key of the last row (tie breaker)
+
+    Returns:
+        URL-safe cursor string
+    """
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif hasattr(value, "name") and hasattr(value, "value"):
+        # Python enum stored in an Enum column
+        value = value.name
+
+    payload = json.dumps({"s": sort_key, "v": value, "i": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str, column) -> Tuple[Any, int]:
+    """
+    Decode a cursor produced by encode_cursor for the given sort column.
+
+    Args:
+        cursor: Cursor received from the client
+        sort_key: Name of the sort option of the current request
+        column: Sort column, used to restore the value type
+
+    Returns:
+        (sort value, row id) of the last row of the previous page
+
+    Raises:
+        HTTPException: If the cursor is malformed or was built for another sort
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        value, row_id = payload["v"], int(payload["i"])
+
+        if payload["s"] != sort_key:
+            raise ValueError("cursor was built for another sort order")
+
+        column_type = column.type
+        if value is not None and isinstance(column_type, DateTime):
+            value = datetime.fromisoformat(value)
+        elif value is not None and isinstance(column_type, Enum) and column_type.enum_class:
+            value = column_type.enum_class[value]
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Rejected pagination cursor: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+    return value, row_id
+
+
+def paginate_keyset(
+    query: Query,
+    response: Response,
+    cursor: str,
+    limit: int,
+    sort_column,
+    id_column,
+    sort_key: str = "id",
+    descending: bool = False,
+) -> List[Any]:
+    """
+    Fetch one page of a query ordered by (sort_column, id_column).
+
+    Instead of OFFSET, the page starts right after the (sort value, id) pair
+    carried by the cursor, so every page costs the same as the first one and
+    rows inserted meanwhile do not shift the following pages. An empty cursor
+    requests the first page. The cursor of the next page is returned in the
+    X-Next-Cursor response header, which is omitted on the last page.
+
+    Rows whose nullable sort column is NULL come last in ascending order and
+    first in descending order (the Postgres default, so a (sort_column, id)
+    index still serves the order), paged by id among themselves.
+
+    Args:
+        query: Filtered query to paginate
+        response: Response used to return the next cursor
+        cursor: Cursor received from the client ("" for the first page)
+        limit: Page size
+        sort_column: Column the page is sorted by
+        id_column: Primary key column used as tie breaker
+        sort_key: Name of the sort option, checked against the cursor
+        descending: Sort direction
+
+    Returns:
+        Rows of the page
+    """
+    same_column = sort_column is id_column
+
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort_key, sort_column)
+        after_id = id_column < row_id if descending else id_column > row_id
+        if same_column:
+            position = after_id
+        elif value is None:
+            # Within the NULL rows: after them come the other rows when descending, nothing when ascending
+            position = and_(sort_column.is_(None), after_id)
+            if descending:
+                position = or_(position, sort_column.isnot(None))
+        else:
+            # Row value comparison lets Postgres seek a (sort_column, id) index
+            key = tuple_(sort_column, id_column)
+            last = tuple_(literal(value, sort_column.type), literal(row_id, id_column.type))
+            position = key < last if descending else key > last
+            if not descending and sort_column.nullable:
+                # NULL rows follow every value
+                position = or_(position, sort_column.is_(None))
+        query = query.filter(position)
+
+    if same_column:
+        order = [id_column.desc() if descending else id_column]
+    elif descending:
+        order = [sort_column.desc().nulls_first(), id_column.desc()]
+    else:
+        order = [sort_column.asc().nulls_last(), id_column]
+
+    rows = query.order_by(*order).limit(limit).all()
+
+    if limit > 0 and len(rows) == limit:
+        last_row = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            sort_key,
+            getattr(last_row, sort_column.key),
+            getattr(last_row, id_column.key),
+        )
+
+    return rows
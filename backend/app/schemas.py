@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
-from typing import Optional, List, Union, Any, Dict
+from typing import Optional, List, Union, Any, Dict, Literal
 from enum import Enum
 
 class UserRole(str, Enum):
@@ -20,6 +20,10 @@ class Token(BaseModel):
     class Config:
         from_attributes = True
 
+class TokenData(BaseModel):
+    id: int
+    role: UserRole
+
 class UserStatus(str, Enum):
     actif = "actif"
     inactif = "inactif"
@@ -29,6 +33,19 @@ class SortOrder(str, Enum):
     asc = "asc"
     desc = "desc"
 
+class SearchMode(str, Enum):
+    substring = "substring"  # ILIKE '%term%' (historique)
+    trigram = "trigram"  # pg_trgm, insensible aux accents, trié par pertinence
+
+class SkillMatchMode(str, Enum):
+    all = "all"  # le profil possède toutes les compétences demandées
+    any = "any"  # le profil possède au moins une des compétences demandées
+
+class SkillSearchField(str, Enum):
+    skills = "skills"
+    preferred_positions = "preferred_positions"
+    both = "both"
+
 class UserBase(BaseModel):
     email: EmailStr
     name: str
@@ -109,6 +126,7 @@ class UserFilters(BaseModel):
     status: Optional[UserStatus] = None
     sortBy: Optional[str] = None
     sortOrder: Optional[SortOrder] = SortOrder.asc
+    searchMode: Optional[SearchMode] = SearchMode.substring
 
 class UserStats(BaseModel):
     totalUsers: int
@@ -174,6 +192,46 @@ class Job(JobBase):
         from_attributes = True
 
 
+class CandidateMatch(BaseModel):
+    candidate_id: int
+    name: Optional[str] = None
+    score: float
+    matched_skills: List[str]
+
+
+class CandidateSearchResult(BaseModel):
+    candidate_id: int
+    name: Optional[str] = None
+    skills: Optional[List[str]] = None
+    preferred_positions: Optional[List[str]] = None
+    match_count: int
+
+
+class JobMatch(BaseModel):
+    job_id: int
+    title: str
+    company: str
+    score: float
+    matched_skills: List[str]
+
+
+class BulkImportError(BaseModel):
+    field: Optional[str] = None
+    message: str
+
+
+class BulkImportRowError(BaseModel):
+    row: int
+    errors: List[BulkImportError]
+
+
+class BulkImportResult(BaseModel):
+    total: int
+    inserted: int
+    failed: int
+    errors: List[BulkImportRowError]
+
+
 class JobDetail(Job):
     applications: Optional[List[Any]] = None  # Will be replaced with JobApplication
 
@@ -221,6 +279,15 @@ class JobApplicationUpdate(BaseModel):
     analyzed_at: Optional[datetime] = None
 
 
+class JobApplicationBulkStatusUpdate(BaseModel):
+    status: ApplicationStatus
+    # Selection: explicit ids and/or a filter, combined with AND
+    ids: Optional[List[int]] = None
+    job_id: Optional[int] = None
+    current_status: Optional[ApplicationStatus] = None
+    score_below: Optional[int] = None
+
+
 class JobApplication(JobApplicationBase):
     id: int
     status: ApplicationStatus
@@ -318,6 +385,13 @@ class InterviewPatch(BaseModel):
     interview_summary: Optional[Dict[str, Any]] = None
 
 
+class JsonPatchOperation(BaseModel):
+    op: Literal["add", "replace", "remove"]
+    # JSON pointer whose first segment is the column, e.g. /detailed_scores/communication
+    path: str
+    value: Any = None
+
+
 class Interview(InterviewBase):
     id: int
     status: InterviewStatus
@@ -382,6 +456,17 @@ class MessageCreate(MessageBase):
     pass
 
 
+class MessageBatchItem(BaseModel):
+    role: MessageRole
+    content: str
+    type: MessageType = MessageType.text
+    audio_url: Optional[str] = None
+
+
+class MessageBatchCreate(BaseModel):
+    messages: List[MessageBatchItem] = Field(..., min_length=1, max_length=500)
+
+
 class MessageUpdate(BaseModel):
     interview_id: Optional[int] = None
     role: Optional[MessageRole] = None
@@ -0,0 +1,74 @@
+from sqlalchemy import Integer, String, and_, any_, cast, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from typing import List
+
+
+def normalize(expression):
+    """Lowercase and strip accents in SQL, matching the trigram index expressions."""
+    return func.normalize_search_text(expression)
+
+
+def escape_like(term: str) -> str:
+    """Escape the LIKE wildcards of a user supplied search term."""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def trigram_match(column, term: str):
+    """
+    Accent and case insensitive match of term against column.
+
+    Matches rows where the term is a substring of the column, or where one of
+    its words is similar to the term (tolerating typos). Both operators are
+    served by the GIN trigram index on normalize_search_text(column).
+    """
+    normalized_term = normalize(literal(term))
+    pattern = literal("%") + normalize(literal(escape_like(term))) + literal("%")
+    return or_(
+        normalize(column).like(pattern, escape="\\"),
+        normalized_term.op("<%")(normalize(column)),
+    )
+
+
+def trigram_rank(columns: List, terms: List[str]):
+    """Relevance of a row: summed word similarity of each term to its column."""
+    ranks = [
+        func.word_similarity(normalize(literal(term)), normalize(column))
+        for column, term in zip(columns, terms)
+    ]
+    return sum(ranks[1:], ranks[0])
+
+
+def normalize_array(expression):
+    """Normalize every element of a text array, matching the skill search index expressions."""
+    return func.normalize_search_array(expression)
+
+
+def array_match(columns: List, terms: List[str], match_all: bool):
+    """
+    Match rows whose array columns contain all (or any) of the terms.
+
+    Terms and array elements are compared after normalize_search_array, so
+    the filter is case and accent insensitive and served by the GIN indexes
+    on normalize_search_array(column). With several columns, a term may be
+    found in any of them.
+    """
+    normalized_terms = normalize_array(literal(terms, ARRAY(String)))
+    if not match_all:
+        return or_(*(normalize_array(column).op("&&")(normalized_terms) for column in columns))
+    if len(columns) == 1:
+        return normalize_array(columns[0]).op("@>")(normalized_terms)
+    # Each term may be in either column: one containment test per term: each is an index scan, combined by a BitmapAnd
+    return and_(*(
+        or_(*(normalize_array(column).op("@>")(normalize_array(literal([term], ARRAY(String)))) for column in columns))
+        for term in terms
+    ))
+
+
+def array_match_count(columns: List, terms: List[str]):
+    """Number of distinct terms found in the array columns of a row."""
+    term = func.unnest(normalize_array(literal(terms, ARRAY(String)))).table_valued("value").render_derived()
+    found = or_(*(term.c.value == any_(normalize_array(column)) for column in columns))
+    return cast(
+        select(func.count(func.distinct(term.c.value))).where(found).scalar_subquery(),
+        Integer
+    )
@@ -0,0 +1,127 @@
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from functools import lru_cache
+from typing import Any, FrozenSet, Iterable, List, Optional, Sequence, Type
+import json
+import re
+
+import numpy as np
+
+# Headers of the injected response that describe its own (empty) body
+BODY_HEADERS = {"content-length", "content-type"}
+
+# Numbers that dump_json writes differently from json.dumps: exponents and
+# decimals below 1e-4. A string containing one only takes the slower path.
+DIVERGENT_NUMBER = re.compile(rb"[:\[,]-?(?:\d+(?:\.\d+)?e[-+]?\d+|0\.0000)")
+
+# Longest float written by dump_json before its exponent, e.g. -1.2345678901234567
+MAX_MANTISSA_BYTES = 24
+
+
+def has_divergent_number(content: bytes) -> bool:
+    """Whether a dump_json body may hold a number that json.dumps writes differently."""
+    if b"0.0000" in content:
+        return DIVERGENT_NUMBER.search(content) is not None
+    # Exponents follow a digit: look around those only, text is full of other e's
+    codes = np.frombuffer(content, dtype=np.uint8)
+    exponents = np.flatnonzero((codes[1:] == ord("e")) & (codes[:-1] - ord("0") < 10)) + 1
+    return any(
+        DIVERGENT_NUMBER.search(content, max(0, position - MAX_MANTISSA_BYTES - 2), position + 6)
+        for position in exponents.tolist()
+    )
+
+
+def select_columns(model, schema: Type[BaseModel], extra: Iterable[str] = ()) -> list:
+    """
+    Table columns of a model that a response schema reads.
+
+    Querying these columns instead of the mapped class returns plain rows:
+    no ORM instances, identity map entries or attribute instrumentation are
+    built for a read-only page, and columns outside the schema are never read.
+
+    Args:
+        model: Mapped class queried
+        schema: Response schema of one row
+        extra: Other column names needed to compute the response
+    """
+    names = set(schema.model_fields) | set(extra)
+    return [column for column in model.__table__.columns if column.key in names]
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[FrozenSet[str]]:
+    """
+    Parse a sparse fieldset parameter (comma-separated field names).
+
+    The id is always part of the fieldset: it identifies rows and is the
+    position of cursor pagination.
+
+    Returns:
+        Requested field names, or None when every field is requested
+
+    Raises:
+        HTTPException: 400 if a name is not a field of the schema
+    """
+    if not fields:
+        return None
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = sorted(names - set(schema.model_fields))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}. Available fields: {', '.join(schema.model_fields)}"
+        )
+    return frozenset(names | {"id"})
+
+
+@lru_cache(maxsize=256)
+def get_partial_schema(schema: Type[BaseModel], fields: Optional[FrozenSet[str]]) -> Type[BaseModel]:
+    """
+    Schema restricted to a sparse fieldset, keeping the field order and definitions of schema.
+
+    Partial schemas are built once per fieldset.
+    """
+    if fields is None:
+        return schema
+    return create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (field.annotation, field) for name, field in schema.model_fields.items() if name in fields}
+    )
+
+
+@lru_cache(maxsize=512)
+def get_list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    """TypeAdapter of List[schema], built once per schema."""
+    return TypeAdapter(List[schema])
+
+
+def serialize_list(schema: Type[BaseModel], rows: Sequence[Any], response: Response) -> Response:
+    """
+    Validate rows against a schema and encode them to JSON in one pass.
+
+    The body is byte for byte what FastAPI returns for response_model=List[schema],
+    without the intermediate dicts and jsonable_encoder walk. pydantic's
+    dump_json only writes some floats differently from json.dumps (1e20 for
+    1e+20, 0.00001 for 1e-05): a body with such a number is encoded again
+    the way FastAPI does. NaN and infinite floats, which FastAPI can't encode
+    (500), are written as null. Headers already set on the injected
+    response, such as the next cursor, are kept.
+
+    Args:
+        schema: Response schema of one row
+        rows: ORM instances, rows or objects read with from_attributes
+        response: Response injected in the endpoint
+
+    Returns:
+        JSON response
+    """
+    adapter = get_list_adapter(schema)
+    validated = adapter.validate_python(rows, from_attributes=True)
+    content = adapter.dump_json(validated, by_alias=True)
+    if has_divergent_number(content):
+        content = json.dumps(
+            adapter.dump_python(validated, mode="json", by_alias=True),
+            ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode("utf-8")
+    headers = {key: value for key, value in response.headers.items() if key not in BODY_HEADERS}
+    return Response(content=content, media_type="application/json", headers=headers)
@@ -0,0 +1,264 @@
+from sqlalchemy import Column, Integer, LargeBinary, ForeignKey, delete, event, select
+from sqlalchemy.sql import func
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from abc import ABC, abstractmethod
+import os
+import tempfile
+import logging
+from typing import AsyncIterator, Dict, Optional
+
+from .database import Base
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Backend used for new file contents: 'postgres' or 'local'
+FILE_STORAGE_BACKEND = os.getenv("FILE_STORAGE_BACKEND", "postgres")
+# Root directory of the local filesystem backend
+FILE_STORAGE_PATH = os.getenv("FILE_STORAGE_PATH", "/app/storage")
+
+# Contents are written and read in parts of this size
+CHUNK_SIZE = 256 * 1024  # 256KB
+
+# Session.info key of the local files to remove once the transaction commits
+PENDING_REMOVALS_KEY = "storage_pending_removals"
+# Session.info key of the local files written in the transaction, removed if it rolls back
+PENDING_WRITES_KEY = "storage_pending_writes"
+
+
+class FileChunk(Base):
+    """Model for one fixed-size chunk of a blob stored in PostgreSQL"""
+    __tablename__ = "file_chunks"
+
+    blob_id = Column(Integer, ForeignKey("file_blobs.id", ondelete="CASCADE"), primary_key=True)
+    chunk_index = Column(Integer, primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+
+    def __repr__(self):
+        return f"<FileChunk(blob_id={self.blob_id}, chunk_index={self.chunk_index})>"
+
+
+class BlobWriter(ABC):
+    """Incremental writer of one blob content, returned by StorageBackend.open_writer"""
+
+    @abstractmethod
+    async def write(self, chunk: bytes) -> None:
+        """Append a part of the content."""
+
+    async def close(self) -> None:
+        """Make the written content durable and visible."""
+
+    async def abort(self) -> None:
+        """Discard what was written so far."""
+
+
+class StorageBackend(ABC):
+    """
+    Place where blob contents live.
+
+    A blob is identified by its file_blobs id and SHA-256. Writes go through
+    a BlobWriter so uploads can be stored one chunk at a time, and reads
+    return an async iterator over a byte range so downloads are streamed.
+    All operations are async and never block the event loop.
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    async def open_writer(self, blob_id: int, sha256: str, db: AsyncSession) -> BlobWriter:
+        """Start writing the content of a new blob, as part of the current transaction."""
+
+    @abstractmethod
+    def iter_range(self, blob_id: int, sha256: str, start: int, end: int, db: AsyncSession) -> AsyncIterator[bytes]:
+        """Yield bytes start..end (inclusive) of a blob, at most CHUNK_SIZE at a time."""
+
+    @abstractmethod
+    async def delete(self, blob_id: int, sha256: str, db: AsyncSession) -> None:
+        """Remove a blob content as part of the current transaction."""
+
+    def get_path(self, blob_id: int, sha256: str) -> Optional[str]:
+        """Filesystem path of a blob content, when the backend keeps one."""
+        return None
+
+
+class PostgresChunkWriter(BlobWriter):
+    def __init__(self, blob_id: int, db: AsyncSession):
+        self.blob_id = blob_id
+        self.db = db
+        self.chunk_index = 0
+
+    async def write(self, chunk: bytes) -> None:
+        await self.db.execute(
+            FileChunk.__table__.insert(),
+            {"blob_id": self.blob_id, "chunk_index": self.chunk_index, "data": chunk}
+        )
+        self.chunk_index += 1
+
+
+class PostgresBackend(StorageBackend):
+    """Stores contents as CHUNK_SIZE rows of the file_chunks table"""
+
+    name = "postgres"
+
+    async def open_writer(self, blob_id: int, sha256: str, db: AsyncSession) -> BlobWriter:
+        return PostgresChunkWriter(blob_id, db)
+
+    async def iter_range(self, blob_id: int, sha256: str, start: int, end: int, db: AsyncSession) -> AsyncIterator[bytes]:
+        position = start
+        while position <= end:
+            chunk_index, offset = divmod(position, CHUNK_SIZE)
+            length = min(CHUNK_SIZE - offset, end - position + 1)
+
+            # Partial chunks are cut by Postgres, only the requested slice is sent
+            data = (await db.execute(
+                select(func.substring(FileChunk.data, offset + 1, length)).where(
+                    FileChunk.blob_id == blob_id,
+                    FileChunk.chunk_index == chunk_index
+                )
+            )).scalar()
+
+            if not data:
+                logger.error(f"Missing data at byte {position} of blob {blob_id}")
+                return
+
+            yield bytes(data)
+            position += len(data)
+
+    async def delete(self, blob_id: int, sha256: str, db: AsyncSession) -> None:
+        # Foreign key cascades are disabled (session_replication_role), remove chunks explicitly
+        await db.execute(delete(FileChunk).where(FileChunk.blob_id == blob_id))
+
+
+class LocalFileWriter(BlobWriter):
+    """
+    Writes to a temporary file renamed into place on close; disk I/O runs in the threadpool.
+
+    The file exists before the blob row is committed: it is recorded in the
+    session, and removed if the transaction rolls back.
+    """
+
+    def __init__(self, path: str, db: AsyncSession):
+        self.path = path
+        self.db = db
+        self.file = None
+
+    def _open(self) -> None:
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        # Write next to the final path so the rename is atomic
+        self.file = tempfile.NamedTemporaryFile(dir=directory, prefix=".upload-", delete=False)
+
+    def _close(self) -> None:
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        os.replace(self.file.name, self.path)
+
+    def _abort(self) -> None:
+        self.file.close()
+        try:
+            os.remove(self.file.name)
+        except FileNotFoundError:
+            pass
+
+    async def write(self, chunk: bytes) -> None:
+        await run_in_threadpool(self.file.write, chunk)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self._close)
+        self.db.sync_session.info.setdefault(PENDING_WRITES_KEY, []).append(self.path)
+
+    async def abort(self) -> None:
+        await run_in_threadpool(self._abort)
+
+
+class LocalFileSystemBackend(StorageBackend):
+    """
+    Stores contents as files under a root directory.
+
+    Files are named after the content hash and the blob id, so a content
+    deleted and uploaded again never reuses the path of the removed file.
+    Downloads can be served straight from the file (see get_path).
+    """
+
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def get_path(self, blob_id: int, sha256: str) -> Optional[str]:
+        return os.path.join(self.root, sha256[:2], sha256[2:4], f"{sha256}-{blob_id}")
+
+    async def open_writer(self, blob_id: int, sha256: str, db: AsyncSession) -> BlobWriter:
+        writer = LocalFileWriter(self.get_path(blob_id, sha256), db)
+        await run_in_threadpool(writer._open)
+        return writer
+
+    async def iter_range(self, blob_id: int, sha256: str, start: int, end: int, db: AsyncSession) -> AsyncIterator[bytes]:
+        f = await run_in_threadpool(open, self.get_path(blob_id, sha256), "rb")
+        try:
+            position = start
+            while position <= end:
+                data = await run_in_threadpool(os.pread, f.fileno(), min(CHUNK_SIZE, end - position + 1), position)
+                if not data:
+                    logger.error(f"Unexpected end of blob {blob_id} at byte {position}")
+                    return
+                yield data
+                position += len(data)
+        finally:
+            f.close()
+
+    async def delete(self, blob_id: int, sha256: str, db: AsyncSession) -> None:
+        # The file is only removed once the blob deletion is committed
+        db.sync_session.info.setdefault(PENDING_REMOVALS_KEY, []).append(self.get_path(blob_id, sha256))
+
+
+BACKENDS: Dict[str, StorageBackend] = {
+    PostgresBackend.name: PostgresBackend(),
+    LocalFileSystemBackend.name: LocalFileSystemBackend(FILE_STORAGE_PATH),
+}
+
+
+def get_backend(name: Optional[str] = None) -> StorageBackend:
+    """
+    Return a storage backend by name.
+
+    Args:
+        name: Backend name, defaults to FILE_STORAGE_BACKEND
+
+    Returns:
+        The storage backend
+
+    Raises:
+        ValueError: If no backend has this name
+    """
+    name = name or FILE_STORAGE_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown file storage backend '{name}'. Must be one of: {', '.join(BACKENDS)}")
+    return BACKENDS[name]
+
+
+def remove_files(paths, reason: str) -> None:
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Could not remove {reason} file {path}: {str(e)}")
+
+
+@event.listens_for(Session, "after_commit")
+def remove_deleted_files(session: Session):
+    session.info.pop(PENDING_WRITES_KEY, None)
+    remove_files(session.info.pop(PENDING_REMOVALS_KEY, []), "stored")
+
+
+@event.listens_for(Session, "after_rollback")
+def remove_written_files(session: Session):
+    # No blob row refers to these files: their blob ids were rolled back too
+    session.info.pop(PENDING_REMOVALS_KEY, None)
+    remove_files(session.info.pop(PENDING_WRITES_KEY, []), "uncommitted")
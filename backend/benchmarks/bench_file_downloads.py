@@ -0,0 +1,66 @@
+"""
+Peak memory of the API while it serves a batch of large files concurrently.
+
+Uploads --files distinct files of --size bytes, then downloads them all
+--rounds times from --concurrency threads (whole files, then 1MB ranges),
+while sampling the resident memory of the API process. With streamed
+downloads the peak stays close to concurrency x CHUNK_SIZE above the
+baseline; loading whole files would add about concurrency x size.
+
+Run against a single uvicorn worker, from the backend directory:
+
+    BENCH_BASE_URL=http://localhost:8000 python -m benchmarks.bench_file_downloads --pid $(pgrep -f "uvicorn app.main")
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import os
+import time
+
+from .common import RssSampler, format_latencies, megabytes, request, upload_file
+
+
+def download(url: str, range_header: str = None):
+    started = time.perf_counter()
+    status, body = request("GET", url, headers={"Range": range_header} if range_header else {})
+    if status not in (200, 206):
+        raise RuntimeError(f"GET {url} returned {status}")
+    return time.perf_counter() - started, len(body)
+
+
+def run_phase(name: str, pid: int, jobs, concurrency: int) -> None:
+    with RssSampler(pid) as rss, ThreadPoolExecutor(concurrency) as pool:
+        started = time.perf_counter()
+        results = list(pool.map(lambda job: download(*job), jobs))
+        elapsed = time.perf_counter() - started
+    latencies = [latency for latency, _ in results]
+    transferred = sum(size for _, size in results)
+    print(
+        f"{name}: {len(results)} downloads, {megabytes(transferred)} in {elapsed:.2f}s "
+        f"({megabytes(transferred / elapsed)}/s), {format_latencies(latencies)}; "
+        f"server RSS {megabytes(rss.baseline)} -> peak {megabytes(rss.peak)} "
+        f"(+{megabytes(rss.peak - rss.baseline)})"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pid", type=int, required=True, help="PID of the API worker process")
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--size", type=int, default=5 * 1024 * 1024 - 1024, help="Bytes per file (at most 5MB)")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    urls = [upload_file(os.urandom(args.size)) for _ in range(args.files)]
+    print(f"Uploaded {args.files} files of {megabytes(args.size)}")
+
+    run_phase("full files", args.pid, [(url, None) for url in urls * args.rounds], args.concurrency)
+    run_phase("1MB ranges", args.pid, [
+        (url, f"bytes={offset}-{offset + 1024 * 1024 - 1}")
+        for url in urls * args.rounds
+        for offset in (0, args.size // 2)
+    ], args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Matching index: build time, memory and ranking latency at 100k candidates x 10k jobs.
+
+Builds a MatchingIndex of --candidates synthetic profiles and --jobs
+synthetic job offers (Zipf-distributed skills, French requirement lines),
+then measures rank_candidates and recommend_jobs on --queries random jobs
+and candidates, and profile updates. Runs in process, no API or database
+needed. From the backend directory:
+
+    python -m benchmarks.bench_matching
+"""
+import argparse
+import os
+import random
+import time
+
+from app.matching_index import MatchingIndex
+
+from .common import RssSampler, format_latencies, megabytes
+
+BASE_SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "React", "React Native", "Angular", "Vue.js", "Node.js", "Django",
+    "FastAPI", "Spring Boot", "SQL", "PostgreSQL", "MongoDB", "Docker", "Kubernetes", "AWS", "Azure", "GCP",
+    "C++", "C#", ".NET", "Go", "Rust", "PHP", "Symfony", "Laravel", "Machine Learning", "Deep Learning",
+    "Data Engineering", "Power BI", "Excel", "Gestion de projet", "Scrum", "DevOps", "CI/CD", "Linux", "Git", "Figma",
+]
+POSITIONS = ["Développeur Full Stack", "Data Engineer", "Chef de projet", "Développeur Backend", "Data Scientist",
+             "Ingénieur DevOps", "Développeur Mobile", "Product Owner"]
+REQUIREMENTS = ["Maîtrise de {}", "Expérience en {} et {}", "Bonne connaissance de {}", "{} indispensable",
+                "Connaissances en {}, {} appréciées"]
+RESPONSIBILITIES = ["Concevoir et développer des services {}", "Participer aux revues de code",
+                    "Maintenir les pipelines {}", "Accompagner les équipes sur {}"]
+
+
+def skill_pool(size: int):
+    # Rare skills after the common ones, e.g. "framework 123"
+    return BASE_SKILLS + [f"framework {index}" for index in range(size - len(BASE_SKILLS))]
+
+
+def pick(rng: random.Random, skills, count: int):
+    # Zipf-like: low indexes are far more frequent
+    return [skills[min(int(rng.paretovariate(1.1)) - 1, len(skills) - 1)] for _ in range(count)]
+
+
+def candidate_values(rng: random.Random, skills):
+    return pick(rng, skills, rng.randint(5, 15)) + rng.sample(POSITIONS, rng.randint(1, 2))
+
+
+def job_texts(rng: random.Random, skills):
+    requirements = [template.format(*pick(rng, skills, template.count("{}")))
+                    for template in rng.sample(REQUIREMENTS, rng.randint(3, 5))]
+    responsibilities = [template.format(*pick(rng, skills, template.count("{}")))
+                        for template in rng.sample(RESPONSIBILITIES, rng.randint(2, 4))]
+    return [rng.choice(POSITIONS)] + requirements + responsibilities
+
+
+def measure(call, ids):
+    durations = []
+    for entity_id in ids:
+        started = time.perf_counter()
+        call(entity_id)
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=100_000)
+    parser.add_argument("--jobs", type=int, default=10_000)
+    parser.add_argument("--skills", type=int, default=5_000, help="Distinct skills of the synthetic data")
+    parser.add_argument("--queries", type=int, default=200, help="Rankings measured per direction")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=5000, help="Rows per index call while building")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    skills = skill_pool(args.skills)
+    candidates = [candidate_values(rng, skills) for _ in range(args.candidates)]
+    jobs = [job_texts(rng, skills) for _ in range(args.jobs)]
+
+    index = MatchingIndex()
+    with RssSampler(os.getpid()) as rss:
+        started = time.perf_counter()
+        # Batches of rows, as MatchingEngine loads the database
+        for start in range(0, len(candidates), args.batch):
+            index.set_candidates(enumerate(candidates[start:start + args.batch], start + 1))
+        for start in range(0, len(jobs), args.batch):
+            index.set_jobs(enumerate(jobs[start:start + args.batch], start + 1))
+        elapsed = time.perf_counter() - started
+    print(f"build: {elapsed:.2f}s, RSS +{megabytes(rss.peak - rss.baseline)}, {index.stats()}")
+
+    job_ids = [rng.randint(1, args.jobs) for _ in range(args.queries)]
+    candidate_ids = [rng.randint(1, args.candidates) for _ in range(args.queries)]
+    # First calls build the posting arrays of the terms they read
+    cold = measure(lambda job_id: index.rank_candidates(job_id, args.limit), job_ids)
+    print(f"rank_candidates, cold: {format_latencies(cold)}")
+    warm = measure(lambda job_id: index.rank_candidates(job_id, args.limit), job_ids)
+    print(f"rank_candidates, warm: {format_latencies(warm)}")
+    recommended = measure(lambda candidate_id: index.recommend_jobs(candidate_id, args.limit), candidate_ids)
+    print(f"recommend_jobs: {format_latencies(recommended)}")
+    updates = measure(lambda candidate_id: index.set_candidate(candidate_id, candidate_values(rng, skills)),
+                      candidate_ids)
+    print(f"profile update: {format_latencies(updates)}")
+    after_updates = measure(lambda job_id: index.rank_candidates(job_id, args.limit), job_ids)
+    print(f"rank_candidates after {len(updates)} updates: {format_latencies(after_updates)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Message throughput of simultaneous interviews: one request per turn vs batches.
+
+Creates --interviews interviews for each concurrency level, then each
+interview (one thread each) appends --turns messages, first one at a time
+through POST /api/messages/, then --batch-size at a time through
+POST /api/interviews/{id}/messages:batch. Reports messages per second.
+
+Size the API database pool for the concurrency (DB_POOL_SIZE, DB_MAX_OVERFLOW).
+From the backend directory:
+
+    BENCH_BASE_URL=http://localhost:8000 python -m benchmarks.bench_message_batch --concurrency 50 200
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import argparse
+import time
+
+from .common import format_latencies, post_json
+
+
+def create_interview(index: int) -> int:
+    status, interview = post_json("/api/interviews/", {
+        "candidate_id": 1_000_000 + index,
+        "position": "Benchmark",
+        "date": datetime.now(timezone.utc).isoformat(),
+    })
+    if status != 201:
+        raise RuntimeError(f"Interview creation returned {status}: {interview}")
+    return interview["id"]
+
+
+def turn(index: int) -> dict:
+    return {"role": "user" if index % 2 == 0 else "assistant", "content": f"Turn {index}: " + "lorem ipsum " * 20}
+
+
+def per_turn(interview_id: int, turns: int, batch_size: int):
+    latencies = []
+    for index in range(turns):
+        started = time.perf_counter()
+        status, body = post_json("/api/messages/", {"interview_id": interview_id, **turn(index)})
+        if status != 201:
+            raise RuntimeError(f"create_message returned {status}: {body}")
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def batched(interview_id: int, turns: int, batch_size: int):
+    latencies = []
+    for first in range(0, turns, batch_size):
+        started = time.perf_counter()
+        status, body = post_json(
+            f"/api/interviews/{interview_id}/messages:batch",
+            {"messages": [turn(index) for index in range(first, min(first + batch_size, turns))]}
+        )
+        if status != 201:
+            raise RuntimeError(f"messages:batch returned {status}: {body}")
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def run(name: str, append, interview_ids, turns: int, batch_size: int) -> None:
+    with ThreadPoolExecutor(len(interview_ids)) as pool:
+        started = time.perf_counter()
+        results = list(pool.map(lambda interview_id: append(interview_id, turns, batch_size), interview_ids))
+        elapsed = time.perf_counter() - started
+    messages = len(interview_ids) * turns
+    latencies = [latency for result in results for latency in result]
+    print(
+        f"  {name}: {messages} messages in {elapsed:.2f}s = {messages / elapsed:.0f} messages/s, "
+        f"request latency {format_latencies(latencies)}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200], help="Simultaneous interviews")
+    parser.add_argument("--turns", type=int, default=40, help="Messages appended per interview")
+    parser.add_argument("--batch-size", type=int, default=10, help="Messages per batch request")
+    args = parser.parse_args()
+
+    for concurrency in args.concurrency:
+        with ThreadPoolExecutor(min(concurrency, 20)) as pool:
+            interview_ids = list(pool.map(create_interview, range(concurrency)))
+        print(f"{concurrency} concurrent interviews, {args.turns} messages each:")
+        run("one request per message", per_turn, interview_ids, args.turns, args.batch_size)
+        run(f"batches of {args.batch_size}", batched, interview_ids, args.turns, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Serialization cost of list pages: response_model vs serialize_list.
+
+Builds --rows synthetic rows of JobApplication and Interview (attribute
+objects, as read from the database) and encodes them --rounds times
+through the path FastAPI takes for response_model=List[schema]
+(validation, jsonable_encoder, json.dumps) and through
+serialization.serialize_list. Runs in process, no API or database needed.
+From the backend directory:
+
+    python -m benchmarks.bench_serialization
+"""
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import List
+import argparse
+import asyncio
+import time
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app import schemas
+from app.serialization import serialize_list
+
+from .common import format_latencies
+
+NOW = datetime(2026, 10, 18, 9, 30, tzinfo=timezone.utc)
+
+
+def application_row(index: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=index, job_id=index % 50, candidate_id=index, cover_letter="Madame, Monsieur, " + "lorem ipsum " * 40,
+        cv_url=f"/api/files/{index:032x}", phone="+33 6 12 34 56 78", location="Lyon",
+        status=schemas.ApplicationStatus.reviewed, applied_at=NOW - timedelta(days=index % 30),
+        updated_at=NOW, interview_at=NOW + timedelta(hours=index % 48), job_title="Développeur Python",
+        company="Acme", score=index % 100, observations="Solide expérience backend",
+        qualified=index % 2 == 0, strengths="FastAPI, PostgreSQL", weaknesses="Peu de frontend",
+        keywords_match="python, sql, docker", analyzed_at=NOW, interview_id=index
+    )
+
+
+def interview_row(index: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=index, candidate_id=index, application_id=index, position="Développeur Python",
+        date=NOW + timedelta(days=index % 14), duration="45 min",
+        questions=[{"id": question, "text": f"Question {question}", "category": "technique"} for question in range(8)],
+        detailed_scores={"technique": 7.5, "communication": 8, "motivation": 6.5},
+        question_by_question_analysis=[{"question": question, "score": 7, "comment": "Réponse claire " * 5}
+                                       for question in range(8)],
+        overall_assessment={"summary": "Bon profil " * 10, "recommendation": "hire"},
+        interview_summary={"highlights": ["python", "sql"], "concerns": []},
+        status=schemas.InterviewStatus.completed, score=7.4, created_at=NOW, updated_at=NOW,
+        candidate_name=f"Candidat {index}"
+    )
+
+
+def response_model_body(loop, field, rows) -> bytes:
+    content = loop.run_until_complete(serialize_response(field=field, response_content=rows, is_coroutine=True))
+    return JSONResponse(content).body
+
+
+def measure(encode, rounds: int):
+    durations = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        encode()
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100, help="Rows per page")
+    parser.add_argument("--rounds", type=int, default=200, help="Pages encoded per path")
+    args = parser.parse_args()
+
+    # One event loop for every call, so its creation isn't measured
+    loop = asyncio.new_event_loop()
+    for schema, make_row in ((schemas.JobApplication, application_row), (schemas.Interview, interview_row)):
+        rows = [make_row(index) for index in range(1, args.rows + 1)]
+        field = create_response_field(name=f"Response_{schema.__name__}", type_=List[schema])
+        if response_model_body(loop, field, rows) != serialize_list(schema, rows, Response()).body:
+            raise RuntimeError(f"{schema.__name__}: serialize_list and response_model bodies differ")
+
+        baseline = measure(lambda: response_model_body(loop, field, rows), args.rounds)
+        bulk = measure(lambda: serialize_list(schema, rows, Response()), args.rounds)
+        print(f"{schema.__name__}, pages of {args.rows}:")
+        print(f"  response_model: {format_latencies(baseline)}")
+        print(f"  serialize_list: {format_latencies(bulk)}")
+        print(f"  speedup at the median: {sorted(baseline)[len(baseline) // 2] / sorted(bulk)[len(bulk) // 2]:.1f}x")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
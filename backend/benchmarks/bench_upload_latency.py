@@ -0,0 +1,72 @@
+"""
+Latency of light requests while large uploads are in progress.
+
+Measures GET --probe latency alone, then again while --uploads threads keep
+uploading --size byte files. With the file endpoints on the async session
+the probe latency under load stays close to the idle one; blocking database
+calls on the event loop would delay every probe by the upload time.
+
+Run against a single uvicorn worker, from the backend directory:
+
+    BENCH_BASE_URL=http://localhost:8000 python -m benchmarks.bench_upload_latency
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import os
+import threading
+import time
+
+from .common import format_latencies, megabytes, request, upload_file
+
+
+def probe(path: str, duration: float, interval: float):
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        status, _ = request("GET", path)
+        if status != 200:
+            raise RuntimeError(f"GET {path} returned {status}")
+        latencies.append(time.perf_counter() - started)
+        time.sleep(interval)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--probe", default="/health", help="Light endpoint whose latency is measured")
+    parser.add_argument("--uploads", type=int, default=8, help="Concurrent uploading threads")
+    parser.add_argument("--size", type=int, default=5 * 1024 * 1024 - 1024, help="Bytes per upload (at most 5MB)")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per phase")
+    parser.add_argument("--interval", type=float, default=0.01, help="Pause between probes")
+    args = parser.parse_args()
+
+    idle = probe(args.probe, args.duration, args.interval)
+    print(f"idle: {len(idle)} probes, {format_latencies(idle)}")
+
+    stop = threading.Event()
+    uploaded = []
+
+    def keep_uploading():
+        while not stop.is_set():
+            # Distinct contents, so each upload writes a new blob
+            upload_file(os.urandom(args.size))
+            uploaded.append(args.size)
+
+    with ThreadPoolExecutor(args.uploads) as pool:
+        uploaders = [pool.submit(keep_uploading) for _ in range(args.uploads)]
+        try:
+            loaded = probe(args.probe, args.duration, args.interval)
+        finally:
+            stop.set()
+        for uploader in uploaders:
+            uploader.result()
+
+    print(
+        f"during uploads: {len(loaded)} probes, {format_latencies(loaded)}; "
+        f"{len(uploaded)} uploads ({megabytes(sum(uploaded))}) by {args.uploads} threads"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Helpers shared by the benchmark scripts.
+
+HTTP benchmarks drive a running API (BENCH_BASE_URL, default
+http://localhost:8000) with the standard library only, from threads, so
+they can run from any machine that reaches the API.
+"""
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+BASE_URL = os.getenv("BENCH_BASE_URL", "http://localhost:8000").rstrip("/")
+
+
+def request(method: str, path: str, body: Optional[bytes] = None, headers: Optional[Dict[str, str]] = None,
+            timeout: float = 120) -> Tuple[int, bytes]:
+    """Send one request and return its status and body, HTTP errors included."""
+    req = urllib.request.Request(f"{BASE_URL}{path}", data=body, method=method, headers=headers or {})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def post_json(path: str, payload) -> Tuple[int, object]:
+    status, body = request("POST", path, json.dumps(payload).encode(), {"Content-Type": "application/json"})
+    return status, json.loads(body) if body else None
+
+
+def upload_file(content: bytes, candidate_id: int = 1, file_type: str = "cv") -> str:
+    """Upload content as a PDF through /api/upload-file/ and return its URL."""
+    boundary = uuid.uuid4().hex
+    parts = [
+        f'--{boundary}\r\nContent-Disposition: form-data; name="type"\r\n\r\n{file_type}\r\n'.encode(),
+        f'--{boundary}\r\nContent-Disposition: form-data; name="candidate_id"\r\n\r\n{candidate_id}\r\n'.encode(),
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="bench.pdf"\r\n'
+        f'Content-Type: application/pdf\r\n\r\n'.encode() + content + b"\r\n",
+        f"--{boundary}--\r\n".encode(),
+    ]
+    status, body = request(
+        "POST", "/api/upload-file/", b"".join(parts),
+        {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    )
+    if status != 201:
+        raise RuntimeError(f"Upload failed with {status}: {body[:200]!r}")
+    return json.loads(body)["url"]
+
+
+def percentile(values: List[float], share: float) -> float:
+    """Nearest-rank percentile of values (share between 0 and 1)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(share * len(ordered)) - 1))]
+
+
+def format_latencies(values: List[float]) -> str:
+    """p50 / p95 / p99 / max latency in milliseconds."""
+    return " ".join(
+        f"{name} {percentile(values, share) * 1000:.1f}ms"
+        for name, share in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))
+    )
+
+
+class RssSampler:
+    """
+    Samples the resident memory of a process (Linux /proc) in a background thread.
+
+    Use it as a context manager around the measured phase; peak holds the
+    highest RSS seen, in bytes.
+    """
+
+    def __init__(self, pid: int, interval: float = 0.01):
+        self.pid = pid
+        self.interval = interval
+        self.baseline = 0
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def read(self) -> int:
+        with open(f"/proc/{self.pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+        return 0
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.read())
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self.baseline = self.peak = self.read()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.read())
+
+
+def megabytes(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f}MB"
@@ -0,0 +1,27 @@
+import asyncio
+from types import SimpleNamespace
+
+
+def test_jobs_of_a_failed_batch_are_released_at_once(database, monkeypatch):
+    from app import analysis
+
+    pool = analysis.AnalysisWorkerPool(pool="thread", workers=1, max_attempts=3)
+    claimed = [
+        SimpleNamespace(id=1, application_id=10, attempts=1),
+        SimpleNamespace(id=2, application_id=11, attempts=3),
+    ]
+    written = {}
+
+    async def load_requests(claimed):
+        raise ConnectionError("connection lost")
+
+    async def write_results(claimed, results):
+        written.update(results)
+
+    monkeypatch.setattr(pool, "load_requests", load_requests)
+    monkeypatch.setattr(pool, "write_results", write_results)
+    asyncio.run(pool.process_batch(None, claimed))
+
+    # write_results queues job 1 again and fails job 2, out of attempts
+    assert set(written) == {1, 2}
+    assert all(isinstance(error, ConnectionError) for error in written.values())
@@ -0,0 +1,33 @@
+from itertools import count
+
+
+def add_application(db, models, job_id: int, candidate_id: int):
+    application = models.JobApplication(job_id=job_id, candidate_id=candidate_id, cv_url="/api/files/1")
+    db.add(application)
+    db.flush()
+    return application
+
+
+def test_stats_read_after_a_bulk_status_change_are_recomputed(db, monkeypatch):
+    from app import main, models, schemas
+
+    applications = [add_application(db, models, job_id=424242, candidate_id=candidate_id) for candidate_id in (1, 2)]
+    # Each computation returns a new value
+    computations = count(1)
+    monkeypatch.setattr(main, "compute_user_stats", lambda db: next(computations))
+    main.user_stats_cache.invalidate()
+    assert main.get_user_stats(db) == main.get_user_stats(db) == 1
+
+    rows = main.update_applications_status(
+        schemas.JobApplicationBulkStatusUpdate(status=schemas.ApplicationStatus.reviewed, job_id=424242),
+        db
+    )
+    assert [row["id"] for row in rows] == sorted(application.id for application in applications)
+    assert main.get_user_stats(db) == 2
+
+    # Nothing selected, nothing dropped
+    main.update_applications_status(
+        schemas.JobApplicationBulkStatusUpdate(status=schemas.ApplicationStatus.reviewed, job_id=424242),
+        db
+    )
+    assert main.get_user_stats(db) == 2
@@ -0,0 +1,87 @@
+import asyncio
+import json
+
+from fastapi import FastAPI, File, UploadFile
+
+from app.body_limit import BodySizeLimitMiddleware
+
+LIMIT = 1024
+BOUNDARY = "boundary"
+
+
+def make_app():
+    app = FastAPI()
+    app.state.parsed = 0
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        app.state.parsed += 1
+        return {"size": len(await file.read())}
+
+    app.add_middleware(BodySizeLimitMiddleware, paths=("/upload",), max_body_size=LIMIT, detail="Too large")
+    return app
+
+
+def multipart_body(content: bytes) -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="cv.pdf"\r\n'
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode() + content + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def post(app, body: bytes, declare_length: bool = True, chunk_size: int = 256):
+    """Send body in chunks, return the status, the response body and the number of chunks read by the app."""
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+    headers = [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())]
+    if declare_length:
+        headers.append((b"content-length", str(len(body)).encode()))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/upload", "raw_path": b"/upload", "root_path": "", "query_string": b"",
+        "headers": headers, "client": ("test", 1), "server": ("test", 80),
+    }
+    read = 0
+    messages = []
+
+    async def receive():
+        nonlocal read
+        if read < len(chunks):
+            read += 1
+            return {"type": "http.request", "body": chunks[read - 1], "more_body": read < len(chunks)}
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    status = next(message["status"] for message in messages if message["type"] == "http.response.start")
+    content = b"".join(message.get("body", b"") for message in messages if message["type"] == "http.response.body")
+    return status, json.loads(content), read
+
+
+def test_upload_under_the_limit_is_accepted():
+    app = make_app()
+    status, content, _ = post(app, multipart_body(b"x" * 500))
+    assert status == 200
+    assert content == {"size": 500}
+
+
+def test_declared_length_over_the_limit_is_rejected_before_reading_the_body():
+    app = make_app()
+    status, content, read = post(app, multipart_body(b"x" * 4000))
+    assert status == 413
+    assert content == {"detail": "Too large"}
+    assert read == 0
+    assert app.state.parsed == 0
+
+
+def test_streamed_body_over_the_limit_is_aborted_at_the_limit():
+    app = make_app()
+    body = multipart_body(b"x" * 100_000)
+    status, content, read = post(app, body, declare_length=False)
+    assert status == 413
+    assert content == {"detail": "Too large"}
+    # Reading stopped at the first chunk past the limit
+    assert read == LIMIT // 256 + 1
+    assert app.state.parsed == 0
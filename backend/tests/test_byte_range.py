@@ -0,0 +1,45 @@
+import pytest
+from fastapi import HTTPException
+
+
+@pytest.fixture
+def parse_byte_range(database):
+    from app.file_storage import parse_byte_range
+    return parse_byte_range
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=900-5000", (900, 999)),
+    ("Bytes = 10-19", (10, 19)),
+])
+def test_satisfiable_ranges(parse_byte_range, header, expected):
+    assert parse_byte_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", [
+    None,
+    "",
+    "bytes",
+    "bytes=",
+    "bytes=-",
+    "bytes=abc-def",
+    "bytes=5",
+    "bytes=+5-10",
+    "bytes=20-10",
+    "bytes=0-1,5-9",
+    "items=0-10",
+])
+def test_unusable_headers_are_ignored(parse_byte_range, header):
+    assert parse_byte_range(header, 1000) is None
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=5000-6000", "bytes=-0"])
+def test_ranges_past_the_end_are_not_satisfiable(parse_byte_range, header):
+    with pytest.raises(HTTPException) as error:
+        parse_byte_range(header, 1000)
+    assert error.value.status_code == 416
+    assert error.value.headers["Content-Range"] == "bytes */1000"
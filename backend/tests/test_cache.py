@@ -0,0 +1,39 @@
+from app.cache import TTLCache
+
+
+def test_get_or_set_caches_the_computed_value():
+    cache = TTLCache("test", ttl=60)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"total": 3}
+
+    assert cache.get_or_set("stats", compute) == {"total": 3}
+    assert cache.get_or_set("stats", compute) == {"total": 3}
+    assert len(calls) == 1
+
+
+def test_get_or_set_does_not_store_a_value_computed_across_an_invalidation():
+    cache = TTLCache("test", ttl=60)
+
+    def compute_then_concurrent_write():
+        # A write commits and invalidates while the value is being computed
+        cache.invalidate()
+        return {"total": 3}
+
+    assert cache.get_or_set("stats", compute_then_concurrent_write) == {"total": 3}
+    assert cache.get("stats") is None
+    assert cache.get_or_set("stats", lambda: {"total": 4}) == {"total": 4}
+    assert cache.get("stats") == {"total": 4}
+
+
+def test_set_ignores_a_stale_generation():
+    cache = TTLCache("test", ttl=60, maxsize=10)
+    generation = cache.generation
+    cache.invalidate(1)
+    cache.set(1, "stale", generation)
+    assert cache.get(1) is None
+
+    cache.set(1, "fresh", cache.generation)
+    assert cache.get(1) == "fresh"
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+
+def add_job(db, models, title: str):
+    job = models.Job(
+        title=title,
+        company=f"{title} Corp",
+        location="Paris",
+        type=models.JobType.CDI,
+        description=f"{title} description",
+        recruiter_id=1,
+    )
+    db.add(job)
+    db.flush()
+    return job
+
+
+def make_page(db, models, size: int, first_candidate_id: int):
+    """Applications of size candidates to size jobs, each with an interview in the next hour."""
+    interview_at = datetime.now().replace(microsecond=0) + timedelta(hours=1)
+    page = []
+    for index in range(size):
+        job = add_job(db, models, f"Job {index}")
+        interview = models.Interview(
+            candidate_id=first_candidate_id + index,
+            position=job.title,
+            date=interview_at,
+            status=models.InterviewStatus.scheduled,
+        )
+        db.add(interview)
+        db.flush()
+        page.append(SimpleNamespace(
+            job_id=job.id,
+            candidate_id=interview.candidate_id,
+            status=models.ApplicationStatus.interview,
+            interview_at=interview_at,
+            expected_interview_id=interview.id,
+        ))
+    return page
+
+
+def test_enrich_applications_query_count_does_not_grow_with_page_size(db, query_counter):
+    from app import main, models
+
+    counts = {}
+    for size in (1, 25):
+        page = make_page(db, models, size, first_candidate_id=1000 * size)
+        with query_counter:
+            main.enrich_applications(page, db)
+        counts[size] = query_counter.count
+
+        for application in page:
+            assert application.job_title.startswith("Job ")
+            assert application.interview_id == application.expected_interview_id
+
+    # One load of the jobs, one of the upcoming interviews
+    assert counts[1] == counts[25] == 2
+
+
+def test_enrich_applications_skips_interview_lookup_without_upcoming_interviews(db, query_counter):
+    from app import main, models
+
+    job = add_job(db, models, "Backend developer")
+    page = [
+        SimpleNamespace(job_id=job.id, candidate_id=candidate_id, status=models.ApplicationStatus.pending, interview_at=None)
+        for candidate_id in range(10)
+    ]
+    with query_counter:
+        main.enrich_applications(page, db)
+
+    assert query_counter.count == 1
+    assert all(application.company == "Backend developer Corp" for application in page)
@@ -0,0 +1,115 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, Integer, MetaData, Table
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app import json_patch, schemas
+
+COLUMNS = ("detailed_scores", "questions")
+table = Table(
+    "interviews", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("detailed_scores", JSONB),
+    Column("questions", JSONB),
+)
+
+
+def operations(*specs):
+    return [schemas.JsonPatchOperation(op=op, path=path, value=value) for op, path, value in specs]
+
+
+def compiled_size(statement) -> int:
+    return len(str(statement.compile(dialect=postgresql.dialect())))
+
+
+def test_each_operation_is_its_own_statement():
+    patch = operations(*(("add", f"/detailed_scores/criterion_{index}", index) for index in range(30)))
+    statements = json_patch.build_patch_statements(table, table.c.id == 1, patch, COLUMNS)
+    assert len(statements) == 30
+    # Operations on one column don't nest the document expression
+    assert len({compiled_size(statement) for statement in statements}) == 1
+
+
+@pytest.mark.parametrize("op, path", [
+    ("add", "/detailed_scores/communication"),
+    ("add", "/questions/0"),
+    ("add", "/questions/-"),
+    ("replace", "/detailed_scores/communication"),
+    ("remove", "/detailed_scores/communication"),
+])
+def test_operations_inside_a_document_require_their_location(op, path):
+    [statement] = json_patch.build_patch_statements(table, table.c.id == 1, operations((op, path, 1)), COLUMNS)
+    where = str(statement.compile(dialect=postgresql.dialect())).split(" WHERE ", 1)[1]
+    assert "#>" in where
+
+
+def test_whole_document_operations_always_apply():
+    [statement] = json_patch.build_patch_statements(
+        table, table.c.id == 1, operations(("replace", "/detailed_scores", {"communication": 8})), COLUMNS
+    )
+    where = str(statement.compile(dialect=postgresql.dialect())).split(" WHERE ", 1)[1]
+    assert "#>" not in where
+
+
+@pytest.mark.parametrize("path", ["/score", "detailed_scores/communication"])
+def test_paths_outside_the_patchable_columns_are_rejected(path):
+    with pytest.raises(HTTPException) as error:
+        json_patch.build_patch_statements(table, table.c.id == 1, operations(("add", path, 1)), COLUMNS)
+    assert error.value.status_code == 400
+
+
+@pytest.fixture
+def interview(db):
+    from app import models
+
+    interview = models.Interview(
+        candidate_id=1, position="Développeur", date=datetime.now(timezone.utc),
+        detailed_scores={"communication": 6}, questions=[{"id": 1}]
+    )
+    db.add(interview)
+    db.flush()
+    return interview
+
+
+def apply(db, interview, *specs):
+    table = interview.__table__
+    statements = json_patch.build_patch_statements(table, table.c.id == interview.id, operations(*specs), COLUMNS)
+    return [db.execute(statement).first() for statement in statements]
+
+
+def test_operations_apply_in_order(db, interview):
+    *_, row = apply(
+        db, interview,
+        ("replace", "/detailed_scores/communication", 8),
+        ("add", "/detailed_scores/technique", 7),
+        ("add", "/questions/0", {"id": 0}),
+        ("add", "/questions/-", {"id": 2}),
+        ("remove", "/detailed_scores/communication", None),
+    )
+    assert row.detailed_scores == {"technique": 7}
+    assert row.questions == [{"id": 0}, {"id": 1}, {"id": 2}]
+
+
+@pytest.mark.parametrize("op, path", [
+    ("add", "/detailed_scores/missing/communication"),
+    ("add", "/questions/5"),
+    ("add", "/questions/x"),
+    ("replace", "/detailed_scores/missing"),
+    ("remove", "/questions/3"),
+])
+def test_missing_locations_match_no_row(db, interview, op, path):
+    assert apply(db, interview, (op, path, 1)) == [None]
+
+
+def test_patches_are_limited_in_operations():
+    patch = operations(*(("add", f"/detailed_scores/criterion_{index}", index)
+                         for index in range(json_patch.MAX_PATCH_OPERATIONS + 1)))
+    with pytest.raises(HTTPException) as error:
+        json_patch.build_patch_statements(table, table.c.id == 1, patch, COLUMNS)
+    assert error.value.status_code == 422
+    assert str(json_patch.MAX_PATCH_OPERATIONS) in error.value.detail
+
+    assert len(json_patch.build_patch_statements(table, table.c.id == 1, patch[:-1], COLUMNS)) == len(patch) - 1
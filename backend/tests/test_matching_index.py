@@ -0,0 +1,108 @@
+import pytest
+
+from app.matching_index import MatchingIndex, split_terms
+
+JOB_TEXTS = ["Développeur Full Stack", "Maîtrise de React Native, Node.js", "Expérience en gestion de projet"]
+
+
+@pytest.fixture
+def index():
+    index = MatchingIndex()
+    index.set_job(1, JOB_TEXTS)
+    index.set_job(2, ["Data Engineer", "Python et SQL"])
+    index.set_candidate(10, ["React", "Node.js", "Gestion de projet"])
+    index.set_candidate(11, ["Python", "SQL", "Développeur Full Stack"])
+    return index
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Maîtrise de React, Node.js.", (("maitrise",), ("react",), ("node.js",))),
+    ("C++ et C#", (("c++",), ("c#",))),
+    ("Machine Learning (TensorFlow)", (("machine", "learning"), ("tensorflow",))),
+    ("de la", ()),
+])
+def test_split_terms(text, expected):
+    assert split_terms(text) == expected
+
+
+def test_job_terms_come_from_the_job_text_only(index):
+    before = index.rank_candidates(1)
+    # A candidate bringing a term of the job text doesn't change the other scores
+    index.set_candidate(12, ["Expérience"])
+    after = index.rank_candidates(1)
+    assert [row for row in after if row[0] != 12] == before
+    assert index.job_sizes[1] == 7
+
+
+def test_rank_candidates(index):
+    # 7 job terms: developpeur full stack, maitrise, react native, node.js, experience, gestion, projet
+    assert index.rank_candidates(1) == [
+        (10, 4 / 7, ["gestion", "node.js", "projet", "react"]),
+        (11, 1 / 7, ["developpeur full stack"]),
+    ]
+    assert index.rank_candidates(1, limit=1) == [(10, 4 / 7, ["gestion", "node.js", "projet", "react"])]
+    assert index.rank_candidates(3) is None
+
+
+def test_recommend_jobs(index):
+    assert index.recommend_jobs(11) == [(2, 2 / 3, ["python", "sql"]), (1, 1 / 7, ["developpeur full stack"])]
+    assert index.recommend_jobs(99) is None
+
+
+def test_updates_and_removals(index):
+    index.set_candidate(10, ["Python"])
+    assert index.rank_candidates(1) == [(11, 1 / 7, ["developpeur full stack"])]
+    # "react" is still an n-gram of job 1
+    assert index.vocabulary.ids["react"] not in index.candidate_columns
+
+    index.remove_job(2)
+    assert index.recommend_jobs(10) == []
+    assert index.vocabulary.ids["python"] not in index.job_columns
+
+    index.remove_candidate(11)
+    assert index.rank_candidates(1) == []
+    assert index.stats()["candidates"] == 1
+
+
+def test_rankings_past_the_initial_slots():
+    index = MatchingIndex()
+    index.set_job(1, ["Python, SQL, Docker"])
+    for candidate_id in range(1, 201):
+        index.set_candidate(candidate_id, ["Python", "SQL", "Docker"][:1 + candidate_id % 3])
+    for candidate_id in range(1, 201, 2):
+        index.remove_candidate(candidate_id)
+
+    ranked = index.rank_candidates(1, limit=5)
+    # Even ids with candidate_id % 3 == 2 have the three skills
+    assert [candidate_id for candidate_id, _, _ in ranked] == [2, 8, 14, 20, 26]
+    assert {score for _, score, _ in ranked} == {1.0}
+    assert index.recommend_jobs(4) == [(1, 2 / 3, ["python", "sql"])]
+
+
+def test_ids_of_unused_terms_are_reused():
+    index = MatchingIndex()
+    index.set_candidate(1, ["Python", "Rust"])
+    index.set_job(1, ["Rust"])
+    rust = index.vocabulary.ids["rust"]
+
+    index.set_candidate(1, ["Python"])
+    # Still a job term
+    assert index.vocabulary.ids["rust"] == rust
+    index.remove_job(1)
+    assert "rust" not in index.vocabulary.ids
+
+    index.set_candidate(2, ["Go"])
+    assert index.vocabulary.ids["go"] == rust
+    assert len(index.vocabulary) == 2
+
+
+def test_batched_updates_match_single_ones(index):
+    batched = MatchingIndex()
+    batched.set_jobs([(1, JOB_TEXTS), (2, ["Data Engineer", "Python et SQL"])])
+    # The last values of a repeated id are kept
+    batched.set_candidates([(10, ["Java"]), (11, ["Python", "SQL", "Développeur Full Stack"]),
+                            (10, ["React", "Node.js", "Gestion de projet"])])
+    for job_id in (1, 2):
+        assert batched.rank_candidates(job_id) == index.rank_candidates(job_id)
+    for candidate_id in (10, 11):
+        assert batched.recommend_jobs(candidate_id) == index.recommend_jobs(candidate_id)
@@ -0,0 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+from sqlalchemy import text
+
+INTERVIEW_ID = 987_654_321
+INSERT = text(
+    "INSERT INTO messages (interview_id, role, content, type) "
+    "VALUES (:interview_id, 'user', :content, 'text') RETURNING id"
+)
+
+
+def test_concurrent_inserts_of_an_interview_take_ids_in_commit_order(database):
+    engine = database.engine
+    first_inserted = threading.Event()
+    release_first = threading.Event()
+
+    def first():
+        with engine.connect() as connection:
+            with connection.begin():
+                message_id = connection.execute(INSERT, {"interview_id": INTERVIEW_ID, "content": "first"}).scalar()
+                first_inserted.set()
+                # Still uncommitted while the second insert starts
+                release_first.wait(10)
+            return message_id
+
+    def second():
+        first_inserted.wait(10)
+        with engine.connect() as connection:
+            with connection.begin():
+                return connection.execute(INSERT, {"interview_id": INTERVIEW_ID, "content": "second"}).scalar()
+
+    try:
+        with ThreadPoolExecutor(2) as pool:
+            first_id = pool.submit(first)
+            second_id = pool.submit(second)
+            first_inserted.wait(10)
+            # The second insert waits for the first transaction to end
+            time.sleep(0.5)
+            assert not second_id.done()
+            release_first.set()
+            assert second_id.result(10) > first_id.result(10)
+    finally:
+        release_first.set()
+        with engine.begin() as connection:
+            connection.execute(text("DELETE FROM messages WHERE interview_id = :id"), {"id": INTERVIEW_ID})
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import Column, DateTime, Integer, String, create_engine
+from sqlalchemy.orm import Session, declarative_base
+
+from app.pagination import NEXT_CURSOR_HEADER, paginate_keyset
+
+Base = declarative_base()
+
+
+class Row(Base):
+    __tablename__ = "rows"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=True)
+
+
+START = datetime(2026, 10, 18, 9, 30)
+# Ids 3, 5 and 8 have no date; 2 and 6 share one
+DATES = {1: START, 2: START + timedelta(hours=1), 3: None, 4: START - timedelta(hours=1), 5: None,
+         6: START + timedelta(hours=1), 7: START + timedelta(hours=2), 8: None, 9: START}
+
+
+@pytest.fixture(scope="module")
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(Row(id=row_id, name=f"row {row_id}", created_at=date) for row_id, date in DATES.items())
+        session.commit()
+        yield session
+
+
+def read_all_pages(session, column, descending: bool, limit: int):
+    ids, cursor = [], ""
+    while True:
+        response = Response()
+        page = paginate_keyset(
+            session.query(Row), response, cursor, limit, column, Row.id, sort_key=column.key, descending=descending
+        )
+        ids.extend(row.id for row in page)
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4])
+def test_rows_without_a_sort_value_come_last_in_ascending_order(session, limit):
+    assert read_all_pages(session, Row.created_at, False, limit) == [4, 1, 9, 2, 6, 7, 3, 5, 8]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4])
+def test_rows_without_a_sort_value_come_first_in_descending_order(session, limit):
+    assert read_all_pages(session, Row.created_at, True, limit) == [8, 5, 3, 7, 6, 2, 9, 1, 4]
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_id_and_not_null_columns(session, descending):
+    ids = sorted(DATES, reverse=descending)
+    assert read_all_pages(session, Row.id, descending, 2) == ids
+    assert read_all_pages(session, Row.name, descending, 2) == ids
+
+
+def test_cursor_of_another_sort_is_rejected(session):
+    response = Response()
+    paginate_keyset(session.query(Row), response, "", 2, Row.created_at, Row.id, sort_key="created_at")
+    with pytest.raises(HTTPException) as error:
+        paginate_keyset(session.query(Row), Response(), response.headers[NEXT_CURSOR_HEADER], 2, Row.name, Row.id,
+                        sort_key="name")
+    assert error.value.status_code == 400
@@ -0,0 +1,92 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+from fastapi import FastAPI, Response
+
+from app import schemas
+from app.serialization import has_divergent_number, serialize_list
+
+NOW = datetime(2026, 10, 18, 9, 30, tzinfo=timezone.utc)
+
+
+def application_rows():
+    common = dict(job_id=3, cv_url="/api/files/abc", status=schemas.ApplicationStatus.reviewed)
+    return [
+        SimpleNamespace(id=1, candidate_id=10, applied_at=NOW, updated_at=None, score=None, qualified=None,
+                        cover_letter="Motivé, disponible « immédiatement » ", **common),
+        SimpleNamespace(id=2, candidate_id=11, applied_at=datetime(2026, 10, 18, 9, 30, 0, 123456),
+                        updated_at=NOW.astimezone(timezone(timedelta(hours=2))), score=87, qualified=True,
+                        interview_at=NOW, job_title="Développeur", keywords_match="python, sql", **common),
+    ]
+
+
+def interview_rows():
+    return [
+        SimpleNamespace(id=1, candidate_id=10, position="Data Engineer", date=NOW, created_at=NOW,
+                        status=schemas.InterviewStatus.completed, score=7.0,
+                        detailed_scores={"technique": 1e20, "communication": 0.1, "motivation": None},
+                        questions=[{"id": 1, "text": "Pourquoi nous ?"}]),
+        SimpleNamespace(id=2, candidate_id=11, position="Développeur", date=NOW - timedelta(days=1),
+                        created_at=NOW, updated_at=None, status=schemas.InterviewStatus.scheduled,
+                        score=1 / 3, detailed_scores=None),
+    ]
+
+
+def get(app, path: str) -> bytes:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [], "client": ("test", 1), "server": ("test", 80),
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return b"".join(message.get("body", b"") for message in messages if message["type"] == "http.response.body")
+
+
+@pytest.mark.parametrize("schema, make_rows", [
+    (schemas.JobApplication, application_rows),
+    (schemas.Interview, interview_rows),
+])
+def test_serialize_list_returns_the_response_model_bytes(schema, make_rows):
+    app = FastAPI()
+
+    @app.get("/response-model", response_model=List[schema])
+    def with_response_model():
+        return make_rows()
+
+    @app.get("/serialize-list")
+    def with_serialize_list(response: Response):
+        return serialize_list(schema, make_rows(), response)
+
+    expected = get(app, "/response-model")
+    assert b"null" in expected
+    assert get(app, "/serialize-list") == expected
+
+
+def test_serialize_list_keeps_the_headers_of_the_injected_response():
+    response = Response()
+    response.headers["X-Next-Cursor"] = "abc"
+    serialized = serialize_list(schemas.Interview, interview_rows(), response)
+    assert serialized.headers["x-next-cursor"] == "abc"
+    assert serialized.headers["content-type"] == "application/json"
+
+
+@pytest.mark.parametrize("content, divergent", [
+    (b'[{"score":1e20}]', True),
+    (b'[{"score":-2.5e-7}]', True),
+    (b'[0.00001]', True),
+    (b'[{"score":7.5,"ratio":0.0001}]', False),
+    (b'[{"cv_url":"/api/files/3e4f9a","text":"Node 1e5"}]', False),
+])
+def test_has_divergent_number(content, divergent):
+    assert has_divergent_number(content) is divergent
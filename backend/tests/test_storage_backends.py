@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import text
+
+
+@pytest.fixture
+def storage(database):
+    from app import storage_backends
+    return storage_backends
+
+
+def test_incomplete_backends_fail_when_created(storage):
+    class WriteOnlyBackend(storage.StorageBackend):
+        name = "write-only"
+
+        async def open_writer(self, blob_id, sha256, db):
+            return None
+
+    with pytest.raises(TypeError):
+        WriteOnlyBackend()
+
+    class NoWriteWriter(storage.BlobWriter):
+        pass
+
+    with pytest.raises(TypeError):
+        NoWriteWriter()
+
+
+@pytest.mark.parametrize("outcome, kept", [("commit", True), ("rollback", False)])
+def test_files_written_in_a_transaction_follow_its_outcome(database, storage, tmp_path, outcome, kept):
+    path = tmp_path / "blob"
+    path.write_bytes(b"content")
+    session = database.SessionLocal()
+    try:
+        session.execute(text("SELECT 1"))
+        session.info.setdefault(storage.PENDING_WRITES_KEY, []).append(str(path))
+        getattr(session, outcome)()
+        assert path.exists() is kept
+        assert storage.PENDING_WRITES_KEY not in session.info
+    finally:
+        session.close()
+
+
+def test_deleted_files_are_kept_when_the_transaction_rolls_back(database, storage, tmp_path):
+    path = tmp_path / "blob"
+    path.write_bytes(b"content")
+    session = database.SessionLocal()
+    try:
+        session.execute(text("SELECT 1"))
+        session.info.setdefault(storage.PENDING_REMOVALS_KEY, []).append(str(path))
+        session.rollback()
+        assert path.exists()
+    finally:
+        session.close()